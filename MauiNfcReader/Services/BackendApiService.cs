@@ -207,9 +207,8 @@ public class BackendApiService : IBackendApiService
         try
         {
             var client = CreateClient();
-            var url = string.IsNullOrWhiteSpace(query)
-                ? $"{_baseUrl}/api/members?limit=20"
-                : $"{_baseUrl}/api/members/search?q={Uri.EscapeDataString(query)}&limit=20";
+            // Boş sorguda sunucu üyeleri ada göre listeler
+            var url = $"{_baseUrl}/api/members/search?q={Uri.EscapeDataString(query ?? string.Empty)}&limit=20";
 
             var resp = await client.GetAsync(url, ct);
             if (!resp.IsSuccessStatusCode)
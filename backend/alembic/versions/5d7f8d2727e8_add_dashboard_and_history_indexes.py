@@ -0,0 +1,36 @@
+"""add dashboard and history indexes
+
+Revision ID: 5d7f8d2727e8
+Revises: 9e80aba252a0
+Create Date: 2026-10-17 15:48:36.902154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7f8d2727e8'
+down_revision: Union[str, None] = '9e80aba252a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # members.status filtresi 60aca9908fde'deki (status, ...) indeksleriyle karşılanır
+    # (device_id, created_at) tek başına device_id filtresini de karşılar
+    op.create_index(op.f('ix_nfc_reading_history_created_at'), 'nfc_reading_history', ['created_at'], unique=False)
+    op.create_index('ix_nfc_reading_history_device_created', 'nfc_reading_history', ['device_id', 'created_at'], unique=False)
+    op.create_index('ix_business_events_active_dates', 'business_events', ['is_active', 'start_date', 'end_date'], unique=False)
+    op.create_index('ix_businesses_owner_id_is_active', 'businesses', ['owner_id', 'is_active'], unique=False)
+    op.create_index('ix_api_call_logs_category_created_at', 'api_call_logs', ['api_category', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_api_call_logs_category_created_at', table_name='api_call_logs')
+    op.drop_index('ix_businesses_owner_id_is_active', table_name='businesses')
+    op.drop_index('ix_business_events_active_dates', table_name='business_events')
+    op.drop_index('ix_nfc_reading_history_device_created', table_name='nfc_reading_history')
+    op.drop_index(op.f('ix_nfc_reading_history_created_at'), table_name='nfc_reading_history')
@@ -0,0 +1,37 @@
+"""add member listing indexes
+
+Revision ID: 60aca9908fde
+Revises: bb73d3a14962
+Create Date: 2026-10-17 13:04:27.518340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '60aca9908fde'
+down_revision: Union[str, None] = 'bb73d3a14962'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # InnoDB ikincil indeksleri birincil anahtarı (id) içerdiğinden indeksler
+    # "ORDER BY kolon, id" keyset sorgularını karşılar. status tek başına
+    # indekslenmez: bileşik indekslerin sol öneki status filtresini karşılar.
+    # role, membership_type ve updated_at indekslenmez - düşük seçicilikli
+    # filtreler / her güncellemede değişen kolon, yazma maliyetine değmez.
+    op.create_index(op.f('ix_members_full_name'), 'members', ['full_name'], unique=False)
+    op.create_index(op.f('ix_members_created_at'), 'members', ['created_at'], unique=False)
+    op.create_index('ix_members_status_full_name', 'members', ['status', 'full_name'], unique=False)
+    op.create_index('ix_members_status_created_at', 'members', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_members_status_created_at', table_name='members')
+    op.drop_index('ix_members_status_full_name', table_name='members')
+    op.drop_index(op.f('ix_members_created_at'), table_name='members')
+    op.drop_index(op.f('ix_members_full_name'), table_name='members')
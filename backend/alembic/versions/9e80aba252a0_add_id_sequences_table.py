@@ -0,0 +1,33 @@
+"""add id_sequences table
+
+Revision ID: 9e80aba252a0
+Revises: ec9755f93a2f
+Create Date: 2026-10-17 15:02:13.482911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e80aba252a0'
+down_revision: Union[str, None] = 'ec9755f93a2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Sayaçlar ilk kullanımda mevcut verilerden başlatılır (bkz. id_allocator)
+    op.create_table(
+        'id_sequences',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('id_sequences')
@@ -0,0 +1,43 @@
+"""add member_change_events table
+
+Revision ID: bb73d3a14962
+Revises: c7b1f20a4c60
+Create Date: 2026-10-17 11:38:05.612907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb73d3a14962'
+down_revision: Union[str, None] = 'c7b1f20a4c60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'member_change_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.Column('membership_id', sa.String(length=50), nullable=False),
+        sa.Column('event_type', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_member_change_events_id'), 'member_change_events', ['id'], unique=False)
+    op.create_index(op.f('ix_member_change_events_member_id'), 'member_change_events', ['member_id'], unique=False)
+    op.create_index(op.f('ix_member_change_events_membership_id'), 'member_change_events', ['membership_id'], unique=False)
+    op.create_index(op.f('ix_member_change_events_created_at'), 'member_change_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_member_change_events_created_at'), table_name='member_change_events')
+    op.drop_index(op.f('ix_member_change_events_membership_id'), table_name='member_change_events')
+    op.drop_index(op.f('ix_member_change_events_member_id'), table_name='member_change_events')
+    op.drop_index(op.f('ix_member_change_events_id'), table_name='member_change_events')
+    op.drop_table('member_change_events')
@@ -0,0 +1,43 @@
+"""add issued_credentials table
+
+Revision ID: c7b1f20a4c60
+Revises: 37b9d5761cbe
+Create Date: 2026-10-17 09:12:41.104522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7b1f20a4c60'
+down_revision: Union[str, None] = '37b9d5761cbe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'issued_credentials',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('member_updated_at', sa.DateTime(), nullable=True),
+        sa.Column('secure_qr_code', sa.Text(), nullable=True),
+        sa.Column('nfc_payload', sa.Text(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['member_id'], ['members.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('member_id', 'version', name='uq_issued_credentials_member_version')
+    )
+    op.create_index(op.f('ix_issued_credentials_id'), 'issued_credentials', ['id'], unique=False)
+    op.create_index(op.f('ix_issued_credentials_member_id'), 'issued_credentials', ['member_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_issued_credentials_member_id'), table_name='issued_credentials')
+    op.drop_index(op.f('ix_issued_credentials_id'), table_name='issued_credentials')
+    op.drop_table('issued_credentials')
@@ -0,0 +1,27 @@
+"""add format_tag to issued_credentials
+
+Revision ID: cec77d11e9a4
+Revises: e5a6de309b84
+Create Date: 2026-10-17 17:05:19.627340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cec77d11e9a4'
+down_revision: Union[str, None] = 'e5a6de309b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Mevcut kayıtlar etiketsiz kalır; ilk okumada güncel formatla yeniden imzalanır
+    op.add_column('issued_credentials', sa.Column('format_tag', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('issued_credentials', 'format_tag')
@@ -0,0 +1,74 @@
+"""partition log tables by month
+
+Revision ID: e5a6de309b84
+Revises: 5d7f8d2727e8
+Create Date: 2026-10-17 16:27:05.413870
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from log_partitions import MAXVALUE_PARTITION, month_start, partition_definitions, partition_target
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a6de309b84'
+down_revision: Union[str, None] = '5d7f8d2727e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOG_TABLES = ('api_call_logs', 'nfc_reading_history')
+
+
+def _is_mysql() -> bool:
+    return op.get_bind().dialect.name == 'mysql'
+
+
+def upgrade() -> None:
+    # Sadece MySQL: SQLite ve diğerleri bölümlenmez, log_partitions parti DELETE'ine düşer.
+    # PARTITION BY tabloyu yeniden yazar - büyük tablolarda bakım penceresinde çalıştırın.
+    if not _is_mysql():
+        return
+
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    now = datetime.utcnow()
+    for table in LOG_TABLES:
+        # Bölümlü tablolarda foreign key olamaz
+        for foreign_key in inspector.get_foreign_keys(table):
+            op.drop_constraint(foreign_key['name'], table, type_='foreignkey')
+
+        # Her unique anahtar bölüm kolonunu içermeli
+        connection.execute(sa.text(f"UPDATE {table} SET created_at = UTC_TIMESTAMP() WHERE created_at IS NULL"))
+        connection.execute(sa.text(
+            f"ALTER TABLE {table} MODIFY created_at DATETIME NOT NULL, "
+            f"DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"
+        ))
+
+        oldest = connection.execute(sa.text(f"SELECT MIN(created_at) FROM {table}")).scalar()
+        definitions = partition_definitions(month_start(oldest or now), partition_target(now))
+        definitions.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+        connection.execute(sa.text(
+            f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS(created_at) ({', '.join(definitions)})"
+        ))
+
+
+def downgrade() -> None:
+    if not _is_mysql():
+        return
+
+    connection = op.get_bind()
+    for table in LOG_TABLES:
+        connection.execute(sa.text(f"ALTER TABLE {table} REMOVE PARTITIONING"))
+        connection.execute(sa.text(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id), MODIFY created_at DATETIME NULL"
+        ))
+        # Foreign key yokken silinen üyelere ait kayıtlar kalmış olabilir
+        connection.execute(sa.text(
+            f"UPDATE {table} LEFT JOIN members ON members.id = {table}.member_id "
+            f"SET {table}.member_id = NULL WHERE {table}.member_id IS NOT NULL AND members.id IS NULL"
+        ))
+        op.create_foreign_key(None, table, 'members', ['member_id'], ['id'])
@@ -0,0 +1,106 @@
+"""move profile photos to blob store
+
+Revision ID: ec9755f93a2f
+Revises: 60aca9908fde
+Create Date: 2026-10-17 14:21:50.337196
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from blob_store import blob_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ec9755f93a2f'
+down_revision: Union[str, None] = '60aca9908fde'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Her partide okunan satır sayısı - base64 fotoğraflar büyük olduğundan küçük tutulur
+BACKFILL_BATCH_SIZE = 100
+
+
+def _backfill(table: str, photo_column: str, hash_column: str) -> None:
+    """
+    Base64 fotoğrafları id sırasıyla partiler halinde blob deposuna yaz, özeti
+    kaydet ve eski kolonu boşalt. Bellekte aynı anda tek parti tutulur; blob
+    yazımı idempotent olduğundan yarıda kalan migration güvenle tekrarlanabilir.
+    """
+    connection = op.get_bind()
+    last_id = 0
+    moved = 0
+    skipped = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                f"SELECT id, {photo_column} FROM {table} "
+                f"WHERE id > :last_id AND {photo_column} IS NOT NULL "
+                f"ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+
+        for row_id, photo in rows:
+            last_id = row_id
+            try:
+                digest = blob_store.put_base64(photo)
+            except ValueError:
+                # Bozuk veri kaybolmasın diye eski kolonda bırakılır
+                skipped += 1
+                continue
+            connection.execute(
+                sa.text(f"UPDATE {table} SET {hash_column} = :digest, {photo_column} = NULL WHERE id = :id"),
+                {"digest": digest, "id": row_id}
+            )
+            moved += 1
+
+    print(f"🖼️ {table}: {moved} fotoğraf blob deposuna taşındı, {skipped} bozuk kayıt atlandı")
+
+
+def _restore(table: str, photo_column: str, hash_column: str) -> None:
+    """Downgrade: blob'ları tekrar base64 kolona yaz"""
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                f"SELECT id, {hash_column} FROM {table} "
+                f"WHERE id > :last_id AND {hash_column} IS NOT NULL "
+                f"ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+        for row_id, digest in rows:
+            last_id = row_id
+            photo = blob_store.get_base64(digest)
+            if photo is not None:
+                connection.execute(
+                    sa.text(f"UPDATE {table} SET {photo_column} = :photo WHERE id = :id"),
+                    {"photo": photo, "id": row_id}
+                )
+
+
+def upgrade() -> None:
+    op.add_column('members', sa.Column('photo_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_members_photo_hash'), 'members', ['photo_hash'], unique=False)
+    op.add_column('users', sa.Column('image_hash', sa.String(length=64), nullable=True))
+
+    # Eski kolonlar geri dönüş için silinmez; backfill sonrası boş kalırlar
+    _backfill('members', 'profile_photo', 'photo_hash')
+    _backfill('users', 'image', 'image_hash')
+
+
+def downgrade() -> None:
+    _restore('users', 'image', 'image_hash')
+    _restore('members', 'profile_photo', 'photo_hash')
+
+    op.drop_column('users', 'image_hash')
+    op.drop_index(op.f('ix_members_photo_hash'), table_name='members')
+    op.drop_column('members', 'photo_hash')
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+NFC codec micro-benchmark'ı
+Eski byte byte XOR döngüsü ile nfc_codec'in tüm buffer XOR'unu, ve v1 JSON
+çözme yolunu v2 binary çözme yoluyla karşılaştırır.
+
+Kullanım:
+    python benchmark_nfc_codec.py --iterations 20000
+"""
+
+import sys
+import json
+import time
+import base64
+import argparse
+
+from datetime import date
+
+from nfc_codec import (
+    NFC_XOR_KEY,
+    NFC_ENC_V1_PREFIX,
+    encode_nfc_v1,
+    decode_nfc_v1,
+    decode_nfc_v1_batch,
+    pack_nfc_v2_message,
+    build_nfc_v2,
+    encode_nfc_v2,
+    decode_nfc_v2
+)
+
+SAMPLE_NFC_JSON = json.dumps({
+    "v": 1,
+    "mid": "CC-2026-0001",
+    "name": "Ayşe Karaoğlu",
+    "exp": "20271017",
+    "sig": "MEUCIQDx1tq0g0bU6r0mYHk3cW2S1m0y3o5z8P0Jb9sN4tFhYgIgC2kVx9Z0u4xT8mQ1rL6nA3eW7yR5pK0dJ2hG9fS1cB4",
+}, separators=(',', ':'))
+
+
+def legacy_decode(encrypted_data: str) -> str:
+    """Önceki implementasyon: bytearray'e byte byte XOR"""
+    encrypted_bytes = base64.b64decode(encrypted_data[len(NFC_ENC_V1_PREFIX):])
+    decrypted_bytes = bytearray()
+    for i, byte in enumerate(encrypted_bytes):
+        decrypted_bytes.append(byte ^ NFC_XOR_KEY[i % len(NFC_XOR_KEY)])
+    return bytes(decrypted_bytes).decode('utf-8')
+
+
+def _us_per_op(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="NFC_ENC_V1 codec benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    encoded = encode_nfc_v1(SAMPLE_NFC_JSON)
+    if legacy_decode(encoded) != SAMPLE_NFC_JSON or decode_nfc_v1(encoded) != SAMPLE_NFC_JSON:
+        print("❌ Codec çıktıları eşleşmiyor")
+        return 1
+
+    legacy_us = _us_per_op(lambda: legacy_decode(encoded), args.iterations)
+    codec_us = _us_per_op(lambda: decode_nfc_v1(encoded), args.iterations)
+
+    batch = [encoded] * args.batch_size
+    batch_iterations = max(1, args.iterations // args.batch_size)
+    batch_us = _us_per_op(lambda: decode_nfc_v1_batch(batch), batch_iterations) / args.batch_size
+
+    encoded_v2 = encode_nfc_v2(build_nfc_v2(
+        pack_nfc_v2_message("CC-2026-0001", "Ayşe Karaoğlu", date(2027, 10, 17)), bytes(64)
+    ))
+    def v1_parse():
+        # v1 doğrulama yolu: XOR/base64 çöz, JSON parse, imzasız JSON'u yeniden üret, imzayı base64 çöz
+        nfc_data = json.loads(decode_nfc_v1(encoded))
+        message = json.dumps({k: v for k, v in nfc_data.items() if k != "sig"}, separators=(',', ':')).encode("utf-8")
+        signature = base64.urlsafe_b64decode(nfc_data["sig"] + "=" * (-len(nfc_data["sig"]) % 4))
+        return message, signature
+
+    v1_parse_us = _us_per_op(v1_parse, args.iterations)
+    v2_parse_us = _us_per_op(lambda: decode_nfc_v2(encoded_v2), args.iterations)
+
+    print(f"Payload: {len(encoded)} chars (v2: {len(encoded_v2)} chars)")
+    print(f"{'Legacy byte loop':<22}{legacy_us:>10.2f} µs/decode")
+    print(f"{'nfc_codec':<22}{codec_us:>10.2f} µs/decode ({legacy_us / codec_us:.1f}x)")
+    print(f"{'nfc_codec batch':<22}{batch_us:>10.2f} µs/decode")
+    print(f"{'v1 decode + JSON x2':<22}{v1_parse_us:>10.2f} µs/decode")
+    print(f"{'v2 binary decode':<22}{v2_parse_us:>10.2f} µs/decode ({v1_parse_us / v2_parse_us:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
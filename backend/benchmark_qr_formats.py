@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+QR format benchmark'ı - v1 (RSA-PSS-2048 JSON) ve v2 (kompakt Ed25519)
+İmzalama/doğrulama süresi, kodlanmış veri boyutu ve QR sembol versiyonunu karşılaştırır.
+
+Kullanım:
+    python benchmark_qr_formats.py --iterations 500
+"""
+
+import sys
+import time
+import argparse
+
+from crypto_utils import secure_qr
+
+SAMPLE_MEMBER = {
+    "id": 104857,
+    "fullName": "Ayşe Gülsüm Karaoğlu",
+    "membershipId": "CC-2026-104857",
+    "status": "active",
+}
+
+
+def _time_per_op(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def _qr_symbol_version(data: str) -> str:
+    """qrcode kuruluysa veriyi taşıyan en küçük QR versiyonunu bul (M hata düzeltme)"""
+    try:
+        import qrcode
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M)
+        qr.add_data(data)
+        qr.make(fit=True)
+        return f"{qr.version} ({qr.modules_count}x{qr.modules_count})"
+    except ImportError:
+        return "-"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="QR v1/v2 format benchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    formats = [
+        ("v1 RSA-PSS-2048", secure_qr.create_signed_qr_data),
+        ("v2 Ed25519", secure_qr.create_signed_qr_data_v2),
+    ]
+
+    print(f"{'Format':<18}{'Sign ms':>10}{'Verify ms':>11}{'Bytes':>8}{'QR version':>16}")
+    for label, create in formats:
+        sample = create(SAMPLE_MEMBER)
+        is_valid, _, error = secure_qr.verify_qr_signature(sample)
+        if not is_valid:
+            print(f"❌ {label} doğrulanamadı: {error}")
+            return 1
+
+        sign_ms = _time_per_op(lambda: create(SAMPLE_MEMBER), args.iterations)
+        verify_ms = _time_per_op(lambda: secure_qr.verify_qr_signature(sample), args.iterations)
+        print(f"{label:<18}{sign_ms:>10.3f}{verify_ms:>11.3f}{len(sample):>8}{_qr_symbol_version(sample):>16}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
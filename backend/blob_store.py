@@ -0,0 +1,232 @@
+"""
+İçerik Adresli Blob Deposu
+Profil fotoğrafları veritabanında base64 Text olarak değil, dosya sisteminde
+SHA-256 özetiyle adlandırılmış dosyalar olarak saklanır.
+
+- Aynı içerik bir kez yazılır (dedupe); satırlarda sadece 64 karakterlik özet tutulur
+- Yazma atomiktir: geçici dosya + os.replace
+- Dosyalar değişmez olduğundan özet aynı zamanda ETag'dir
+- Dizin yapısı: <kök>/ab/cd/abcd... (tek dizinde çok fazla dosya birikmesin)
+"""
+
+import os
+import re
+import time
+import base64
+import hashlib
+import binascii
+import tempfile
+from typing import Iterator, Optional, Set, Tuple
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "blob_store")
+BLOB_CHUNK_SIZE = 64 * 1024
+
+# Referanssız blob'lar bu süreden eskiyse silinir (yeni yüklenip henüz kaydedilmemiş olanlar korunur)
+BLOB_GC_GRACE_SECONDS = 24 * 60 * 60
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def is_valid_digest(digest: str) -> bool:
+    return bool(digest) and _DIGEST_RE.match(digest) is not None
+
+
+def sniff_content_type(header: bytes) -> str:
+    """İlk byte'lardan görsel tipini tahmin et"""
+    for signature, content_type in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def decode_base64_image(value: str) -> bytes:
+    """
+    Base64 (data URL öneki olabilir) -> byte'lar; geçersizse ValueError.
+    Eski istemcilerle uyumlu olarak çözme esnektir (alfabe dışı karakterler atlanır,
+    URL-safe base64 kabul edilir); görsel olmayan veri imza byte'larından reddedilir.
+    """
+    if value.startswith('data:image'):
+        value = value.split(',')[1] if ',' in value else value
+    try:
+        data = base64.b64decode(value.replace('-', '+').replace('_', '/'))
+    except (binascii.Error, ValueError):
+        raise ValueError("Geçersiz resim formatı")
+    if not data:
+        raise ValueError("Boş resim verisi")
+    if sniff_content_type(data[:16]) == "application/octet-stream":
+        raise ValueError("Geçersiz resim formatı")
+    return data
+
+
+def blob_url(digest: Optional[str]) -> Optional[str]:
+    return f"/api/blobs/{digest}" if digest else None
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """
+    If-None-Match listesinde (virgülle ayrılmış, '*' olabilir) etag var mı.
+    If-None-Match zayıf karşılaştırma kullanır - W/ öneki yok sayılır.
+    """
+    for value in if_none_match.split(","):
+        value = value.strip()
+        if value == "*" or value.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def parse_range(range_header: str, size: int) -> Tuple[int, int]:
+    """
+    Tek aralıklı 'bytes=start-end' başlığını (start, end) dahil aralığa çevir.
+    Karşılanamayan aralıklarda ValueError (416).
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError("Desteklenmeyen Range")
+    start_text, _, end_text = spec.strip().partition("-")
+    if not start_text:
+        # bytes=-N: son N byte
+        length = int(end_text)
+        if length <= 0:
+            raise ValueError("Geçersiz Range")
+        return max(size - length, 0), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or end < start:
+        raise ValueError("Geçersiz Range")
+    return start, min(end, size - 1)
+
+
+class BlobStore:
+    """SHA-256 adresli, değişmez dosyalar"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        if not is_valid_digest(digest):
+            raise ValueError("Geçersiz blob özeti")
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest: str) -> bool:
+        return is_valid_digest(digest) and os.path.isfile(self.path(digest))
+
+    @staticmethod
+    def _reuse_existing(path: str) -> bool:
+        """
+        İçerik zaten varsa mtime'ı yenile ve True döndür. Referanssız eski bir blob
+        tekrar bağlanıyorsa collect_garbage onu grace süresi içinde silmemeli.
+        """
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def put(self, data: bytes) -> str:
+        """İçeriği yaz (zaten varsa sadece mtime'ı yenile), özeti döndür"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if self._reuse_existing(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return digest
+
+    def put_file(self, temp_path: str, digest: str) -> str:
+        """
+        Özeti yazarken hesaplanmış geçici dosyayı yerine taşı (aynı dosya sistemi).
+        İçerik zaten varsa geçici dosya silinir.
+        """
+        path = self.path(digest)
+        if self._reuse_existing(path):
+            os.remove(temp_path)
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+        return digest
+
+    def put_base64(self, value: str) -> str:
+        return self.put(decode_base64_image(value))
+
+    def get(self, digest: Optional[str]) -> Optional[bytes]:
+        if not digest or not self.exists(digest):
+            return None
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def get_base64(self, digest: Optional[str]) -> Optional[str]:
+        """Eski API yanıtları için base64 (tekil kayıt endpoint'lerinde kullanılır)"""
+        data = self.get(digest)
+        return base64.b64encode(data).decode("ascii") if data is not None else None
+
+    def content_type(self, digest: str) -> str:
+        with open(self.path(digest), "rb") as f:
+            return sniff_content_type(f.read(16))
+
+    def iter_range(self, digest: str, start: int, end: int) -> Iterator[bytes]:
+        """[start, end] aralığını parça parça oku"""
+        with open(self.path(digest), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(BLOB_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, digest: str) -> bool:
+        try:
+            os.remove(self.path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def iter_digests(self) -> Iterator[str]:
+        if not os.path.isdir(self.root):
+            return
+        for directory, _, files in os.walk(self.root):
+            for file_name in files:
+                if is_valid_digest(file_name):
+                    yield file_name
+
+    def collect_garbage(self, referenced: Set[str], grace_seconds: int = BLOB_GC_GRACE_SECONDS) -> int:
+        """Hiçbir satırın referans vermediği eski blob'ları ve yarım kalmış yüklemeleri sil"""
+        cutoff = time.time() - grace_seconds
+        deleted = 0
+        if os.path.isdir(self.root):
+            for file_name in os.listdir(self.root):
+                temp_path = os.path.join(self.root, file_name)
+                if file_name.startswith(".upload-") and os.path.getmtime(temp_path) < cutoff:
+                    os.remove(temp_path)
+        for digest in list(self.iter_digests()):
+            if digest in referenced:
+                continue
+            try:
+                if os.path.getmtime(self.path(digest)) < cutoff and self.delete(digest):
+                    deleted += 1
+            except FileNotFoundError:
+                continue
+        return deleted
+
+
+# Global instance
+blob_store = BlobStore(BLOB_STORE_DIR)
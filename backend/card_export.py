@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Baskıya Hazır Kart Dışa Aktarımı
+Üyeler için kart görsellerini (ad, üyelik ID, fotoğraf, güvenli QR) üretir ve
+ZIP arşivi olarak akış halinde yazar.
+
+- layout="cards": her üye için ayrı PNG kart (CR80, 300 DPI)
+- layout="sheet": A4 sayfaya 2x5 dizilmiş çoklu kart PNG sayfaları
+- Render bir process havuzunda yapılır; havuza aynı anda verilen iş sayısı
+  sınırlı tutulur, böylece 10k kartlık bir baskıda bile bellekte sadece
+  birkaç parti kart bulunur
+- Arşiv oluştukça parça parça dışarı verilir, hiçbir zaman bütünüyle bellekte tutulmaz
+
+CLI kullanımı:
+    python card_export.py --output cards.zip
+    python card_export.py --layout sheet --status active --workers 4 --output sheets.zip
+"""
+
+import io
+import os
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from blob_store import blob_store
+from qr_render import _qr_matrix
+
+EXPORT_LAYOUTS = ("cards", "sheet")
+
+# CR80 kart boyutu (85.6 x 54 mm) 300 DPI'da
+CARD_WIDTH = 1011
+CARD_HEIGHT = 638
+
+# A4 sayfa (210 x 297 mm) 300 DPI'da, 2 sütun x 5 satır kart
+SHEET_WIDTH = 2480
+SHEET_HEIGHT = 3508
+SHEET_COLUMNS = 2
+SHEET_ROWS = 5
+CARDS_PER_SHEET = SHEET_COLUMNS * SHEET_ROWS
+
+DEFAULT_EXPORT_WORKERS = int(os.getenv("CARD_EXPORT_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+# Üyeler DB'den bu büyüklükte partiler halinde okunur
+MEMBER_BATCH_SIZE = 200
+
+_FONT_CACHE: Dict[int, Any] = {}
+
+
+def _font(size: int):
+    font = _FONT_CACHE.get(size)
+    if font is None:
+        try:
+            font = ImageFont.truetype("DejaVuSans.ttf", size)
+        except OSError:
+            font = ImageFont.load_default(size)
+        _FONT_CACHE[size] = font
+    return font
+
+
+def _decode_photo(photo_path: Optional[str]) -> Optional[Image.Image]:
+    """Blob deposundaki profil fotoğrafını Pillow görseline çevir (yoksa/bozuksa None)"""
+    if not photo_path:
+        return None
+    try:
+        photo = Image.open(photo_path)
+        photo.draft("RGB", (300, 380))  # JPEG'leri küçültülmüş decode et
+        return photo.convert("RGB")
+    except (ValueError, OSError):
+        return None
+
+
+def _qr_image(qr_data: str, size: int) -> Image.Image:
+    matrix = _qr_matrix(qr_data, "M")
+    modules = len(matrix)
+    image = Image.new("1", (modules, modules), 1)
+    image.putdata([0 if dark else 1 for row in matrix for dark in row])
+    return image.resize((size, size), Image.NEAREST)
+
+
+def render_card(job: Dict[str, Any]) -> Image.Image:
+    """Tek üye kartını render et"""
+    card = Image.new("RGB", (CARD_WIDTH, CARD_HEIGHT), "white")
+    draw = ImageDraw.Draw(card)
+    draw.rectangle([0, 0, CARD_WIDTH - 1, 90], fill=(30, 64, 175))
+    draw.text((40, 22), "ÜYE KARTI", font=_font(44), fill="white")
+
+    photo = _decode_photo(job.get("photoPath"))
+    photo_box = (40, 130, 300, 460)
+    if photo is not None:
+        photo.thumbnail((photo_box[2] - photo_box[0], photo_box[3] - photo_box[1]))
+        card.paste(photo, (photo_box[0], photo_box[1]))
+    else:
+        draw.rectangle(photo_box, outline=(180, 180, 180), width=3)
+
+    qr_size = 440
+    card.paste(_qr_image(job["secureQrCode"], qr_size), (CARD_WIDTH - qr_size - 30, 120))
+
+    draw.text((40, 490), job["fullName"][:28], font=_font(40), fill="black")
+    draw.text((40, 550), job["membershipId"], font=_font(32), fill=(75, 85, 99))
+    return card
+
+
+def _png_bytes(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=False, compress_level=6)
+    return buffer.getvalue()
+
+
+def _prepare_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """QR yoksa (ana süreçte imzalama başarısız olduysa) worker içinde imzala"""
+    if not job.get("secureQrCode"):
+        from crypto_utils import generate_secure_member_qr
+        job["secureQrCode"] = generate_secure_member_qr(job)
+    return job
+
+
+def render_card_file(job: Dict[str, Any]) -> Tuple[str, bytes]:
+    """Worker: kartı render edip (dosya adı, PNG) döndür"""
+    job = _prepare_job(job)
+    return f"{job['membershipId']}.png", _png_bytes(render_card(job))
+
+
+def render_sheet_file(page: Tuple[int, List[Dict[str, Any]]]) -> Tuple[str, bytes]:
+    """Worker: en fazla CARDS_PER_SHEET kartı tek A4 sayfaya diz"""
+    page_number, jobs = page
+    sheet = Image.new("RGB", (SHEET_WIDTH, SHEET_HEIGHT), "white")
+    margin_x = (SHEET_WIDTH - SHEET_COLUMNS * CARD_WIDTH) // (SHEET_COLUMNS + 1)
+    margin_y = (SHEET_HEIGHT - SHEET_ROWS * CARD_HEIGHT) // (SHEET_ROWS + 1)
+    for index, job in enumerate(jobs):
+        row, column = divmod(index, SHEET_COLUMNS)
+        x = margin_x + column * (CARD_WIDTH + margin_x)
+        y = margin_y + row * (CARD_HEIGHT + margin_y)
+        sheet.paste(render_card(_prepare_job(job)), (x, y))
+    return f"sheet-{page_number:05d}.png", _png_bytes(sheet)
+
+
+class _ZipStreamBuffer:
+    """
+    zipfile için ileri yönlü (seek edilemeyen) yazma hedefi.
+    Yazılan byte'lar drain() ile alınıp temizlenir.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_card_archive(
+    jobs: Iterable[Dict[str, Any]],
+    layout: str = "cards",
+    workers: int = DEFAULT_EXPORT_WORKERS,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Kart işlerini process havuzunda render et ve ZIP arşivini parça parça yield et.
+    Havuzda bekleyen iş sayısı max_in_flight ile sınırlıdır; sonuçlar giriş sırasıyla yazılır.
+    Hata veren iş (eksik alan, Pillow hatası vb.) atlanır ve errors.txt'ye yazılır;
+    yanıt başlamış olduğundan arşiv her durumda düzgün kapatılır.
+    """
+    if layout == "sheet":
+        render_func = render_sheet_file
+        tasks = _paginate(jobs)
+    else:
+        render_func = render_card_file
+        tasks = iter(jobs)
+    max_in_flight = max_in_flight or workers * 2
+
+    buffer = _ZipStreamBuffer()
+    archive = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED)  # PNG zaten sıkıştırılmış
+    timestamp = datetime.now().timetuple()[:6]
+    errors: List[str] = []
+
+    def write_result(task, future):
+        try:
+            filename, content = future.result()
+        except Exception as e:
+            label = _task_label(task)
+            print(f"❌ Kart render hatası ({label}): {e}")
+            errors.append(f"{label}: {e}")
+            return
+        info = zipfile.ZipInfo(filename, date_time=timestamp)
+        archive.writestr(info, content)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        try:
+            for task in tasks:
+                in_flight.append((task, executor.submit(render_func, task)))
+                if len(in_flight) >= max_in_flight:
+                    write_result(*in_flight.popleft())
+                    yield buffer.drain()
+        except Exception as e:
+            # Üye okuma/imzalama hatası - kalan kartlar yazılmaz ama arşiv yarım kalmaz
+            print(f"❌ Kart dışa aktarımı yarıda kesildi: {e}")
+            errors.append(f"Dışa aktarım yarıda kesildi: {e}")
+        while in_flight:
+            write_result(*in_flight.popleft())
+            yield buffer.drain()
+
+    if errors:
+        archive.writestr(zipfile.ZipInfo("errors.txt", date_time=timestamp), "\n".join(errors) + "\n")
+    archive.close()
+    yield buffer.drain()
+
+
+def _task_label(task) -> str:
+    """errors.txt için iş tanımı: kartta üyelik ID'si, sayfada sayfa numarası"""
+    if isinstance(task, tuple):
+        return f"sayfa {task[0]}"
+    return f"üye {task.get('membershipId') or task.get('id')}"
+
+
+def _paginate(jobs: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    page: List[Dict[str, Any]] = []
+    page_number = 1
+    for job in jobs:
+        page.append(job)
+        if len(page) == CARDS_PER_SHEET:
+            yield page_number, page
+            page = []
+            page_number += 1
+    if page:
+        yield page_number, page
+
+
+def iter_card_jobs(db, member_ids: Optional[List[int]] = None, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Üyeleri id sırasıyla partiler halinde (keyset sayfalama) oku ve render işlerine çevir.
+    Saklanan güncel kimlik bilgisi varsa QR yeniden imzalanmaz; olmayanlar
+    imzalanıp saklanır, böylece sonraki okumalar aynı kopyayı kullanır.
+
+    Not: Sunucu tarafı cursor kullanılmaz - PyMySQL açık bir akış varken aynı
+    bağlantıda çalışan ikinci sorguda kalan satırları sessizce atar.
+    """
+    from database import Member
+
+    query = db.query(
+        Member.id,
+        Member.full_name,
+        Member.membership_id,
+        Member.status,
+        Member.updated_at,
+        Member.photo_hash
+    )
+    if member_ids:
+        query = query.filter(Member.id.in_(member_ids))
+    if status:
+        query = query.filter(Member.status == status)
+
+    last_id = 0
+    while True:
+        batch = query.filter(Member.id > last_id).order_by(Member.id).limit(MEMBER_BATCH_SIZE).all()
+        if not batch:
+            return
+        last_id = batch[-1].id
+        yield from _jobs_for_batch(batch, _qr_codes_for_batch(db, batch))
+
+
+def _qr_codes_for_batch(db, rows) -> Dict[int, str]:
+    """Saklanan güncel QR'lar + eksikler için imzalanıp saklanan yeni kimlik bilgileri"""
+    from credential_issuer import issue_credentials_bulk, member_credential_data
+    from credential_store import get_fresh_qr_codes, store_issued_credentials
+
+    qr_codes = get_fresh_qr_codes(db, rows)
+    missing = [row for row in rows if row.id not in qr_codes]
+    if missing:
+        issued = list(issue_credentials_bulk(member_credential_data(row) for row in missing))
+        store_issued_credentials(db, issued, {row.id: row.updated_at for row in missing})
+        qr_codes.update((item["memberId"], item["secureQrCode"]) for item in issued if item["success"])
+    return qr_codes
+
+
+def _jobs_for_batch(rows, qr_codes: Dict[int, str]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        yield {
+            "id": row.id,
+            "fullName": row.full_name,
+            "membershipId": row.membership_id,
+            "status": row.status,
+            "updatedAt": row.updated_at,
+            # Worker'lar dosyayı kendisi okur - fotoğraf byte'ları süreçler arasında taşınmaz
+            "photoPath": blob_store.path(row.photo_hash) if row.photo_hash else None,
+            "secureQrCode": qr_codes.get(row.id),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import time
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Baskıya hazır kart dışa aktarımı (ZIP)")
+    parser.add_argument("--output", required=True, help="ZIP çıktı dosyası")
+    parser.add_argument("--layout", choices=EXPORT_LAYOUTS, default="cards")
+    parser.add_argument("--ids", type=int, nargs="+", help="Sadece bu üye ID'leri")
+    parser.add_argument("--status", help="Üye durumu filtresi (ör. active)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_EXPORT_WORKERS, help="Render process sayısı")
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    written = 0
+    db = SessionLocal()
+    try:
+        with open(args.output, "wb") as out:
+            jobs = iter_card_jobs(db, args.ids, args.status)
+            for chunk in stream_card_archive(jobs, layout=args.layout, workers=args.workers):
+                out.write(chunk)
+                written += len(chunk)
+    finally:
+        db.close()
+
+    print(f"✅ Kart arşivi yazıldı: {args.output} ({written / 1024 / 1024:.1f} MB) - {time.time() - start_time:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
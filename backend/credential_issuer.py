@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Toplu Kimlik Bilgisi Üretimi (QR + NFC)
+Çok sayıda üye için imzalı QR ve NFC payload'larını paralel üretir.
+
+`cryptography` imzalama sırasında GIL'i bıraktığı için RSA-PSS ve ECDSA
+imzaları bir thread havuzunda gerçekten paralel çalışır.
+
+CLI kullanımı:
+    python credential_issuer.py --ids 1 2 3 > credentials.jsonl
+    python credential_issuer.py --all --workers 8 --output credentials.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Iterable, Iterator, Optional
+
+from crypto_utils import generate_secure_member_qr, generate_member_nfc_payload
+
+# Varsayılan worker sayısı - CPU sayısı kadar imzalama thread'i
+DEFAULT_SIGNING_WORKERS = int(os.getenv("SIGNING_WORKERS", str(os.cpu_count() or 4)))
+
+# Tek istekte izin verilen maksimum üye sayısı
+MAX_BULK_ISSUE_SIZE = 10000
+
+# Uygulama genelinde paylaşılan imzalama havuzu
+signing_executor = ThreadPoolExecutor(
+    max_workers=DEFAULT_SIGNING_WORKERS,
+    thread_name_prefix="credential-signer"
+)
+
+
+def member_credential_data(member) -> Dict[str, Any]:
+    """DB Member satırından imzalama için gereken minimum alanları çıkar"""
+    return {
+        "id": member.id,
+        "fullName": member.full_name,
+        "membershipId": member.membership_id,
+        "status": member.status,
+        "updatedAt": member.updated_at,
+    }
+
+
+def issue_member_credentials(member_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Tek bir üye için imzalı QR ve NFC payload üret"""
+    try:
+        return {
+            "memberId": member_data.get("id"),
+            "membershipId": member_data.get("membershipId"),
+            "secureQrCode": generate_secure_member_qr(member_data),
+            "nfcQrCode": generate_member_nfc_payload(member_data),
+            "success": True,
+        }
+    except Exception as e:
+        return {
+            "memberId": member_data.get("id"),
+            "membershipId": member_data.get("membershipId"),
+            "secureQrCode": None,
+            "nfcQrCode": None,
+            "success": False,
+            "error": str(e),
+        }
+
+
+def issue_credentials_bulk(
+    members_data: Iterable[Dict[str, Any]],
+    executor: Optional[ThreadPoolExecutor] = None,
+    chunk_size: int = 256,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Üye listesini paralel imzala, sonuçları giriş sırasıyla yield et.
+    Girdi parça parça işlendiği için bellek kullanımı chunk_size ile sınırlıdır.
+    """
+    executor = executor or signing_executor
+    chunk: List[Dict[str, Any]] = []
+    for member_data in members_data:
+        chunk.append(member_data)
+        if len(chunk) >= chunk_size:
+            yield from executor.map(issue_member_credentials, chunk)
+            chunk = []
+    if chunk:
+        yield from executor.map(issue_member_credentials, chunk)
+
+
+def load_members_for_issue(db, member_ids: List[int], batch_size: int = 1000) -> Dict[int, Dict[str, Any]]:
+    """
+    Üyeleri IN sorgusu ile toplu getir - profil fotoğrafı gibi büyük
+    kolonları yüklemeden sadece imzalama alanlarını seçer
+    """
+    from database import Member
+
+    found: Dict[int, Dict[str, Any]] = {}
+    for start in range(0, len(member_ids), batch_size):
+        batch = member_ids[start:start + batch_size]
+        rows = db.query(
+            Member.id,
+            Member.full_name,
+            Member.membership_id,
+            Member.status,
+            Member.updated_at
+        ).filter(Member.id.in_(batch)).all()
+        for row in rows:
+            found[row.id] = member_credential_data(row)
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    from database import SessionLocal, Member
+
+    parser = argparse.ArgumentParser(description="Toplu QR/NFC kimlik bilgisi üretimi")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--ids", type=int, nargs="+", help="Üye ID listesi")
+    group.add_argument("--ids-file", help="Her satırda bir üye ID'si bulunan dosya")
+    group.add_argument("--all", action="store_true", help="Tüm aktif üyeler")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SIGNING_WORKERS, help="İmzalama thread sayısı")
+    parser.add_argument("--output", help="JSONL çıktı dosyası (varsayılan: stdout)")
+    parser.add_argument("--no-store", action="store_true", help="Üretilenleri issued_credentials tablosuna kaydetme")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.all:
+            member_ids = [row.id for row in db.query(Member.id).filter(Member.status == "active").order_by(Member.id)]
+        elif args.ids_file:
+            with open(args.ids_file, "r", encoding="utf-8") as f:
+                member_ids = [int(line) for line in f if line.strip()]
+        else:
+            member_ids = args.ids
+
+        members = load_members_for_issue(db, member_ids)
+    finally:
+        db.close()
+
+    missing = [member_id for member_id in member_ids if member_id not in members]
+    if missing:
+        print(f"⚠️ Bulunamayan üye ID'leri: {missing}", file=sys.stderr)
+
+    from datetime import datetime
+    from credential_store import store_issued_credentials
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    store_db = None if args.no_store else SessionLocal()
+    member_updated_at = {member_id: data["updatedAt"] for member_id, data in members.items()}
+    issued_at = datetime.utcnow()
+    start_time = time.time()
+    issued = 0
+    failed = 0
+    pending: List[Dict[str, Any]] = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="credential-signer") as executor:
+            ordered = (members[member_id] for member_id in member_ids if member_id in members)
+            for result in issue_credentials_bulk(ordered, executor=executor):
+                out.write(json.dumps(result, separators=(',', ':')) + "\n")
+                if result["success"]:
+                    issued += 1
+                else:
+                    failed += 1
+                if store_db is not None:
+                    pending.append(result)
+                    if len(pending) >= 500:
+                        store_issued_credentials(store_db, pending, member_updated_at, issued_at)
+                        pending = []
+        if store_db is not None and pending:
+            store_issued_credentials(store_db, pending, member_updated_at, issued_at)
+    finally:
+        if store_db is not None:
+            store_db.close()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.time() - start_time
+    rate = (issued / elapsed * 60) if elapsed > 0 else 0
+    print(f"✅ {issued} kimlik bilgisi üretildi, {failed} hata - {elapsed:.2f}s ({rate:.0f}/dk)", file=sys.stderr)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Kimlik Bilgisi Deposu
+İmzalı QR ve NFC verilerini issued_credentials tablosunda versiyonlu saklar.
+
+Okumalar saklanan kopyadan servis edilir; yeniden imzalama sadece üye
+güncellendiğinde (Member.updated_at değiştiğinde), kimlik bilgisinin süresi
+dolmaya yaklaştığında veya format etiketi değiştiğinde (QR/NFC varsayılan
+versiyonu ya da CREDENTIAL_FORMAT_REVISION) yapılır.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from crypto_utils import CREDENTIAL_VALIDITY_DAYS, NFC_DEFAULT_VERSION, QR_DEFAULT_VERSION
+from credential_issuer import issue_member_credentials, member_credential_data
+from database import IssuedCredential
+
+# Süresinin dolmasına bu kadar gün kala kimlik bilgisi yenilenir
+RENEW_BEFORE_DAYS = 30
+
+# Üye başına saklanan eski versiyon sayısı (en yenisi dahil)
+KEEP_VERSIONS = 3
+
+# Toplu kayıtta versiyon çakışması (eşzamanlı export/toplu üretim) olursa deneme sayısı
+STORE_RETRY_ATTEMPTS = 3
+
+# QR/NFC içeriği veya imza yöntemi değiştiğinde artırılır - eski etiketli kopyalar yeniden imzalanır
+CREDENTIAL_FORMAT_REVISION = 1
+
+
+def credential_format_tag() -> str:
+    """Saklanan kimlik bilgisinin üretildiği format (ör. r1-qr1-nfc2)"""
+    return f"r{CREDENTIAL_FORMAT_REVISION}-qr{QR_DEFAULT_VERSION}-nfc{NFC_DEFAULT_VERSION}"
+
+
+def _is_fresh(credential: IssuedCredential, member_updated_at: Optional[datetime]) -> bool:
+    """Saklanan kimlik bilgisi hâlâ servis edilebilir mi?"""
+    if credential.member_updated_at != member_updated_at:
+        return False
+    if credential.format_tag != credential_format_tag():
+        return False
+    if not credential.secure_qr_code or not credential.nfc_payload:
+        return False
+    return credential.expires_at > datetime.utcnow() + timedelta(days=RENEW_BEFORE_DAYS)
+
+
+def get_latest_credential(db: Session, member_id: int) -> Optional[IssuedCredential]:
+    """Üyenin en son versiyonlu kimlik bilgisini getir"""
+    return db.query(IssuedCredential).filter(
+        IssuedCredential.member_id == member_id
+    ).order_by(IssuedCredential.version.desc()).first()
+
+
+def get_fresh_credentials(db: Session, members) -> Dict[int, IssuedCredential]:
+    """
+    Üye listesi için saklanan güncel kimlik bilgilerini tek sorguda getir.
+    Güncel olmayan veya hiç üretilmemiş üyeler sonuçta yer almaz.
+    """
+    members_by_id = {member.id: member for member in members}
+    if not members_by_id:
+        return {}
+
+    latest_versions = db.query(
+        IssuedCredential.member_id,
+        func.max(IssuedCredential.version).label("version")
+    ).filter(
+        IssuedCredential.member_id.in_(list(members_by_id))
+    ).group_by(IssuedCredential.member_id).subquery()
+
+    credentials = db.query(IssuedCredential).join(
+        latest_versions,
+        (IssuedCredential.member_id == latest_versions.c.member_id)
+        & (IssuedCredential.version == latest_versions.c.version)
+    ).all()
+
+    return {
+        credential.member_id: credential
+        for credential in credentials
+        if _is_fresh(credential, members_by_id[credential.member_id].updated_at)
+    }
+
+
+def get_fresh_qr_codes(db: Session, members) -> Dict[int, str]:
+    """Üye listesi için saklanan güncel QR kodları (bkz. get_fresh_credentials)"""
+    return {
+        member_id: credential.secure_qr_code
+        for member_id, credential in get_fresh_credentials(db, members).items()
+    }
+
+
+def _prune_old_versions(db: Session, member_id: int, latest_version: int):
+    """KEEP_VERSIONS'dan eski versiyonları sil"""
+    db.query(IssuedCredential).filter(
+        IssuedCredential.member_id == member_id,
+        IssuedCredential.version <= latest_version - KEEP_VERSIONS
+    ).delete(synchronize_session=False)
+
+
+def get_or_issue_credentials(db: Session, member) -> IssuedCredential:
+    """
+    Üyenin geçerli kimlik bilgisini döndür, gerekiyorsa yeniden imzala.
+    Eşzamanlı iki istek aynı versiyonu yazmaya çalışırsa unique constraint
+    çakışması yakalanır ve kazanan kayıt okunur.
+    """
+    latest = get_latest_credential(db, member.id)
+    if latest is not None and _is_fresh(latest, member.updated_at):
+        return latest
+
+    expires_at = datetime.utcnow() + timedelta(days=CREDENTIAL_VALIDITY_DAYS)
+    issued = issue_member_credentials(member_credential_data(member))
+    if not issued["success"]:
+        raise Exception(issued.get("error") or "Kimlik bilgisi üretilemedi")
+
+    version = (latest.version + 1) if latest is not None else 1
+    credential = IssuedCredential(
+        member_id=member.id,
+        version=version,
+        member_updated_at=member.updated_at,
+        format_tag=credential_format_tag(),
+        secure_qr_code=issued["secureQrCode"],
+        nfc_payload=issued["nfcQrCode"],
+        expires_at=expires_at,
+    )
+    try:
+        db.add(credential)
+        _prune_old_versions(db, member.id, version)
+        db.commit()
+    except IntegrityError:
+        # Başka bir worker aynı versiyonu az önce yazdı - onun kaydını kullan
+        db.rollback()
+        latest = get_latest_credential(db, member.id)
+        if latest is not None:
+            return latest
+        raise
+
+    return credential
+
+
+def store_issued_credentials(
+    db: Session,
+    issued: List[Dict[str, Any]],
+    member_updated_at: Dict[int, Optional[datetime]],
+    issued_at: Optional[datetime] = None,
+) -> int:
+    """
+    Toplu üretilen kimlik bilgilerini yeni versiyon olarak kaydet.
+    Mevcut son versiyonlar tek GROUP BY sorgusuyla alınır, KEEP_VERSIONS'dan
+    eskiler silinir. Versiyon çakışmasında parti geri alınıp yeniden denenir.
+    """
+    successful = [item for item in issued if item.get("success")]
+    if not successful:
+        return 0
+
+    issued_at = issued_at or datetime.utcnow()
+    expires_at = issued_at + timedelta(days=CREDENTIAL_VALIDITY_DAYS)
+    format_tag = credential_format_tag()
+    member_ids = [item["memberId"] for item in successful]
+
+    for attempt in range(1, STORE_RETRY_ATTEMPTS + 1):
+        latest_versions = dict(
+            db.query(IssuedCredential.member_id, func.max(IssuedCredential.version))
+            .filter(IssuedCredential.member_id.in_(member_ids))
+            .group_by(IssuedCredential.member_id)
+            .all()
+        )
+
+        for item in successful:
+            member_id = item["memberId"]
+            version = latest_versions.get(member_id, 0) + 1
+            latest_versions[member_id] = version
+            db.add(IssuedCredential(
+                member_id=member_id,
+                version=version,
+                member_updated_at=member_updated_at.get(member_id),
+                format_tag=format_tag,
+                secure_qr_code=item["secureQrCode"],
+                nfc_payload=item["nfcQrCode"],
+                expires_at=expires_at,
+            ))
+        for member_id, version in latest_versions.items():
+            _prune_old_versions(db, member_id, version)
+
+        try:
+            db.commit()
+            return len(successful)
+        except IntegrityError:
+            # Başka bir worker aynı üyeye aynı versiyonu yazdı - son versiyonları yeniden oku
+            db.rollback()
+            print(f"⚠️ Kimlik bilgisi versiyon çakışması, yeniden deneniyor ({attempt}/{STORE_RETRY_ATTEMPTS})")
+
+    # Kaydedilemeyen kopyalar ilk okumada get_or_issue_credentials ile yeniden üretilir
+    print(f"❌ {len(successful)} kimlik bilgisi versiyon çakışması nedeniyle kaydedilemedi")
+    return 0
+
+
+def delete_member_credentials(db: Session, member_id: int):
+    """Üye silinmeden önce saklanan kimlik bilgilerini kaldır"""
+    db.query(IssuedCredential).filter(
+        IssuedCredential.member_id == member_id
+    ).delete(synchronize_session=False)
@@ -11,10 +11,200 @@ import hashlib
 import struct
 from datetime import datetime, timedelta
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding, ec
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
 from cryptography.exceptions import InvalidSignature
 from typing import Dict, Any, Optional, Tuple
 import secrets
+import threading
+import time
+
+from nfc_codec import (
+    encode_nfc_v1,
+    decode_nfc_v1,
+    NFC_V2_VERSION,
+    NfcV2Payload,
+    pack_nfc_v2_message,
+    build_nfc_v2,
+    encode_nfc_v2
+)
+from nfc_signature import NfcSignatureVerifier
+
+# QR ve NFC kimlik bilgilerinin geçerlilik süresi (gün)
+CREDENTIAL_VALIDITY_DAYS = 365
+
+# Emekli (rotasyon ile devreden çıkmış) public key'lerin tutulduğu klasör
+RETIRED_KEYS_DIR = "crypto_keys/retired"
+
+# Kompakt v2 QR Ed25519 key çifti (ilk açılışta oluşturulur, repoya eklenmez)
+QR_V2_PRIVATE_KEY_PATH = "crypto_keys/qr_v2_private_key.pem"
+QR_V2_PUBLIC_KEY_PATH = "crypto_keys/qr_v2_public_key.pem"
+
+# Kompakt v2 QR formatı: "QR2:" + base45(binary payload + 64 byte Ed25519 imza)
+# Base45 alfabesi QR alphanumeric moduna denk gelir, bu sayede QR daha seyrek olur
+QR_V2_PREFIX = "QR2:"
+QR_V2_VERSION = 2
+QR_V2_ALG_ED25519 = 1
+QR_V2_HEADER = struct.Struct(">BB8sIII8s")  # version, alg, key_id, member_id, issued_at, expires_at, nonce
+QR_V2_SIGNATURE_LENGTH = 64
+
+# Varsayılan QR formatı (1: RSA-PSS JSON, 2: kompakt Ed25519)
+QR_DEFAULT_VERSION = int(os.getenv("QR_DEFAULT_VERSION", "1"))
+
+# Varsayılan NFC formatı (1: NFC_ENC_V1 JSON, 2: kompakt binary)
+NFC_DEFAULT_VERSION = int(os.getenv("NFC_DEFAULT_VERSION", "1"))
+
+BASE45_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+_BASE45_LOOKUP = {c: i for i, c in enumerate(BASE45_CHARSET)}
+
+
+def base45_encode(data: bytes) -> str:
+    """RFC 9285 Base45 encode"""
+    out = []
+    for i in range(0, len(data) - 1, 2):
+        n = data[i] * 256 + data[i + 1]
+        n, c = divmod(n, 45)
+        e, d = divmod(n, 45)
+        out.append(BASE45_CHARSET[c] + BASE45_CHARSET[d] + BASE45_CHARSET[e])
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        out.append(BASE45_CHARSET[c] + BASE45_CHARSET[d])
+    return "".join(out)
+
+
+def base45_decode(text: str) -> bytes:
+    """RFC 9285 Base45 decode"""
+    try:
+        values = [_BASE45_LOOKUP[c] for c in text]
+    except KeyError:
+        raise ValueError("Geçersiz base45 karakteri")
+    out = bytearray()
+    full = len(values) - len(values) % 3
+    for i in range(0, full, 3):
+        n = values[i] + values[i + 1] * 45 + values[i + 2] * 2025
+        if n > 0xFFFF:
+            raise ValueError("Geçersiz base45 verisi")
+        out += n.to_bytes(2, "big")
+    rest = len(values) - full
+    if rest == 2:
+        n = values[full] + values[full + 1] * 45
+        if n > 0xFF:
+            raise ValueError("Geçersiz base45 verisi")
+        out.append(n)
+    elif rest == 1:
+        raise ValueError("Geçersiz base45 uzunluğu")
+    return bytes(out)
+
+
+def _pack_short_str(value: Optional[str]) -> bytes:
+    """1 byte uzunluk önekli UTF-8 string (en fazla 255 byte, karakter sınırında kesilir)"""
+    raw = (value or "").encode("utf-8")
+    if len(raw) > 255:
+        raw = raw[:255].decode("utf-8", errors="ignore").encode("utf-8")
+    return bytes([len(raw)]) + raw
+
+
+def _unpack_short_str(data: bytes, offset: int) -> Tuple[str, int]:
+    length = data[offset]
+    end = offset + 1 + length
+    if end > len(data):
+        raise ValueError("Kesik payload")
+    return data[offset + 1:end].decode("utf-8"), end
+
+
+def compute_key_fingerprint(public_key) -> str:
+    """Public key fingerprint: DER SubjectPublicKeyInfo SHA-256'nın ilk 16 hex karakteri"""
+    public_key_bytes = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(public_key_bytes).hexdigest()[:16]
+
+
+class KeyRegistry:
+    """
+    key_id -> public key kayıt defteri
+    Aktif ve emekli tüm doğrulama anahtarlarını bir kez yükler, fingerprint'leri
+    önceden hesaplar. Doğrulama sırasında sadece sözlük araması yapılır.
+    """
+    
+    def __init__(self):
+        self._keys: Dict[str, Any] = {}
+        self._status: Dict[str, str] = {}
+        self.active_key_id: Optional[str] = None
+    
+    def load(self, active_public_key, extra_public_keys=(), other_active_keys=()):
+        """
+        Kayıt defterini yeniden oluştur ve tek atamayla değiştir
+        (okuyan thread'ler her zaman tutarlı bir sözlük görür)
+        other_active_keys: farklı algoritmalı aktif anahtarlar (ör. v2 QR Ed25519)
+        """
+        keys: Dict[str, Any] = {}
+        status: Dict[str, str] = {}
+        
+        for public_key in extra_public_keys:
+            key_id = compute_key_fingerprint(public_key)
+            keys[key_id] = public_key
+            status[key_id] = "retired"
+        
+        if os.path.isdir(RETIRED_KEYS_DIR):
+            for file_name in sorted(os.listdir(RETIRED_KEYS_DIR)):
+                if not file_name.endswith(".pem"):
+                    continue
+                try:
+                    with open(os.path.join(RETIRED_KEYS_DIR, file_name), "rb") as f:
+                        public_key = serialization.load_pem_public_key(f.read())
+                except Exception as e:
+                    print(f"❌ Emekli key yüklenemedi ({file_name}): {e}")
+                    continue
+                key_id = compute_key_fingerprint(public_key)
+                keys[key_id] = public_key
+                status[key_id] = "retired"
+        
+        for public_key in other_active_keys:
+            key_id = compute_key_fingerprint(public_key)
+            keys[key_id] = public_key
+            status[key_id] = "active"
+        
+        active_key_id = compute_key_fingerprint(active_public_key)
+        keys[active_key_id] = active_public_key
+        status[active_key_id] = "active"
+        
+        self._keys, self._status, self.active_key_id = keys, status, active_key_id
+    
+    def get(self, key_id: Optional[str]):
+        """key_id ile public key getir (yoksa None)"""
+        if not key_id:
+            return None
+        return self._keys.get(key_id)
+    
+    def describe(self) -> list:
+        """Kayıtlı anahtarların listesi (public key endpoint'i için)"""
+        keys, status = self._keys, self._status
+        return [
+            {
+                "key_id": key_id,
+                "status": status[key_id],
+                "algorithm": "Ed25519" if isinstance(public_key, ed25519.Ed25519PublicKey) else "RSA-PSS-SHA256",
+                "public_key": public_key.public_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo
+                ).decode('utf-8'),
+            }
+            for key_id, public_key in keys.items()
+        ]
+
+
+def _shorten_nfc_name(member_data: Dict[str, Any]) -> str:
+    """NFC için isim kısaltma (en fazla 25 karakter, mümkünse ad + soyad)"""
+    name = str(member_data.get("fullName") or member_data.get("name") or "").strip()
+    if len(name) > 25:
+        name_parts = name.split()
+        if len(name_parts) > 1:
+            name = f"{name_parts[0]} {name_parts[-1]}"
+        name = name[:25]
+    return name
+
 
 class SecureQRManager:
     """Güvenli QR kod yönetimi - ISO 20248 benzeri implementasyon"""
@@ -38,6 +228,15 @@ RwIDAQAB
         self.ec_private_key = None
         self.ec_public_key = None
         self.fallback_public_key = None  # Offline doğrulama için fallback key
+        self.qr_v2_private_key = None  # Kompakt v2 QR için Ed25519 key
+        self.qr_v2_public_key = None
+        self.qr_v2_key_id = None
+        self.nfc_verifier = None
+        self.key_id = None  # Aktif RSA key fingerprint (bir kez hesaplanır)
+        self.key_registry = KeyRegistry()
+        self._keys_signature = None  # Key dosyalarının mtime imzası (rotasyon tespiti)
+        self._last_reload_check = 0.0
+        self._rotation_lock = threading.Lock()
 
         self.load_or_generate_keys()
     
@@ -106,6 +305,34 @@ RwIDAQAB
                     format=serialization.PublicFormat.SubjectPublicKeyInfo
                 ))
         
+        # Ed25519 keys (kompakt v2 QR için - 64 byte imza)
+        qr_v2_private_key_path = QR_V2_PRIVATE_KEY_PATH
+        qr_v2_public_key_path = QR_V2_PUBLIC_KEY_PATH
+        if os.path.exists(qr_v2_private_key_path) and os.path.exists(qr_v2_public_key_path):
+            with open(qr_v2_private_key_path, "rb") as f:
+                self.qr_v2_private_key = serialization.load_pem_private_key(
+                    f.read(), password=None
+                )
+            with open(qr_v2_public_key_path, "rb") as f:
+                self.qr_v2_public_key = serialization.load_pem_public_key(f.read())
+        else:
+            self.qr_v2_private_key = ed25519.Ed25519PrivateKey.generate()
+            self.qr_v2_public_key = self.qr_v2_private_key.public_key()
+            with open(qr_v2_private_key_path, "wb") as f:
+                f.write(self.qr_v2_private_key.private_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PrivateFormat.PKCS8,
+                    encryption_algorithm=serialization.NoEncryption()
+                ))
+            with open(qr_v2_public_key_path, "wb") as f:
+                f.write(self.qr_v2_public_key.public_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo
+                ))
+        
+        # NFC imza doğrulayıcı (tek geçiş + reddedilen imza önbelleği)
+        self.nfc_verifier = NfcSignatureVerifier(self.ec_public_key)
+        
         # Fallback public key'i yükle (offline doğrulama için)
         try:
             self.fallback_public_key = serialization.load_pem_public_key(
@@ -116,6 +343,108 @@ RwIDAQAB
             print(f"❌ Fallback public key yükleme hatası: {e}")
             self.fallback_public_key = None
 
+        self._rebuild_key_registry()
+
+    def _rebuild_key_registry(self):
+        """Aktif key fingerprint'ini ve key registry'yi yeniden oluştur"""
+        extra_keys = [self.fallback_public_key] if self.fallback_public_key is not None else []
+        v2_keys = [self.qr_v2_public_key] if self.qr_v2_public_key is not None else []
+        self.key_registry.load(self.public_key, extra_keys, v2_keys)
+        self.key_id = self.key_registry.active_key_id
+        self.qr_v2_key_id = compute_key_fingerprint(self.qr_v2_public_key) if self.qr_v2_public_key is not None else None
+        # İmzalayan thread'ler private key ve key_id'yi tek atamayla birlikte okur
+        self._active_signer = (self.private_key, self.key_id)
+        self._active_v2_signer = (self.qr_v2_private_key, self.qr_v2_key_id)
+        self._keys_signature = self._read_keys_signature()
+
+    @staticmethod
+    def _read_keys_signature() -> tuple:
+        """Aktif key dosyaları (RSA ve v2 Ed25519) ve emekli key klasörünün değişiklik imzası"""
+        entries = []
+        for path in ("crypto_keys/public_key.pem", "crypto_keys/private_key.pem",
+                     QR_V2_PUBLIC_KEY_PATH, QR_V2_PRIVATE_KEY_PATH):
+            try:
+                entries.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                entries.append((path, None))
+        if os.path.isdir(RETIRED_KEYS_DIR):
+            for file_name in sorted(os.listdir(RETIRED_KEYS_DIR)):
+                entries.append((file_name, None))
+        return tuple(entries)
+
+    def reload_keys_if_changed(self, min_interval: float = 30.0) -> bool:
+        """
+        Key rotasyonu (rotate_qr_key.py) yapıldıysa diskteki anahtarları yeniden yükle.
+        İmzalama yolu min_interval ile sınırlandırılmış periyodik kontrol yapar;
+        bilinmeyen key_id ile karşılaşan doğrulama min_interval=0 ile hemen kontrol eder.
+        """
+        now = time.monotonic()
+        if now - self._last_reload_check < min_interval:
+            return False
+        self._last_reload_check = now
+        
+        if self._read_keys_signature() == self._keys_signature:
+            return False
+        
+        with self._rotation_lock:
+            with open("crypto_keys/private_key.pem", "rb") as f:
+                private_key = serialization.load_pem_private_key(f.read(), password=None)
+            with open("crypto_keys/public_key.pem", "rb") as f:
+                public_key = serialization.load_pem_public_key(f.read())
+            self.private_key, self.public_key = private_key, public_key
+            # v2 QR Ed25519 anahtarı başka bir süreçte oluşturulmuş/değiştirilmiş olabilir
+            if os.path.exists(QR_V2_PRIVATE_KEY_PATH) and os.path.exists(QR_V2_PUBLIC_KEY_PATH):
+                with open(QR_V2_PRIVATE_KEY_PATH, "rb") as f:
+                    qr_v2_private_key = serialization.load_pem_private_key(f.read(), password=None)
+                with open(QR_V2_PUBLIC_KEY_PATH, "rb") as f:
+                    qr_v2_public_key = serialization.load_pem_public_key(f.read())
+                self.qr_v2_private_key, self.qr_v2_public_key = qr_v2_private_key, qr_v2_public_key
+            self._rebuild_key_registry()
+        print(f"🔑 Key registry yeniden yüklendi - aktif key: {self.key_id}")
+        return True
+
+    def rotate_rsa_keys(self) -> Dict[str, Any]:
+        """
+        Kesintisiz RSA key rotasyonu:
+        1. Mevcut public key emekli klasörüne kopyalanır (eski QR'lar doğrulanmaya devam eder)
+        2. Yeni key çifti üretilip atomik olarak yazılır
+        3. Registry yeniden oluşturulur - yeni QR'lar yeni key ile imzalanır
+        """
+        with self._rotation_lock:
+            old_key_id = self.key_id
+            os.makedirs(RETIRED_KEYS_DIR, exist_ok=True)
+            with open(os.path.join(RETIRED_KEYS_DIR, f"public_key_{old_key_id}.pem"), "wb") as f:
+                f.write(self.public_key.public_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo
+                ))
+            
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            public_key = private_key.public_key()
+            
+            # Önce geçici dosyaya yaz, sonra os.replace ile atomik değiştir
+            for path, data in (
+                ("crypto_keys/private_key.pem", private_key.private_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PrivateFormat.PKCS8,
+                    encryption_algorithm=serialization.NoEncryption()
+                )),
+                ("crypto_keys/public_key.pem", public_key.public_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo
+                )),
+            ):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            
+            self.private_key, self.public_key = private_key, public_key
+            self._rebuild_key_registry()
+        
+        print(f"🔑 RSA key rotasyonu tamamlandı: {old_key_id} -> {self.key_id}")
+        return {"old_key_id": old_key_id, "new_key_id": self.key_id}
+
     
     def create_signed_qr_data(self, member_data: Dict[str, Any]) -> str:
         """
@@ -131,7 +460,7 @@ RwIDAQAB
                 "status": member_data.get("status"),
                 "org": "Community Connect",
                 "issued_at": datetime.utcnow().isoformat(),
-                "expires_at": (datetime.utcnow() + timedelta(days=365)).isoformat(),
+                "expires_at": (datetime.utcnow() + timedelta(days=CREDENTIAL_VALIDITY_DAYS)).isoformat(),
                 "nonce": secrets.token_hex(8)  # Replay attack önleme
             }
             
@@ -139,8 +468,10 @@ RwIDAQAB
             payload_json = json.dumps(qr_payload, sort_keys=True, separators=(',', ':'))
             payload_bytes = payload_json.encode('utf-8')
             
-            # Veriyi imzala
-            signature = self.private_key.sign(
+            # Veriyi imzala (rotasyon sırasında tutarlı olması için key ve key_id birlikte alınır)
+            self.reload_keys_if_changed()
+            private_key, key_id = self._active_signer
+            signature = private_key.sign(
                 payload_bytes,
                 padding.PSS(
                     mgf=padding.MGF1(hashes.SHA256()),
@@ -156,7 +487,7 @@ RwIDAQAB
             metadata = {
                 "version": "1.0",
                 "algorithm": "RSA-PSS-SHA256",
-                "key_id": self.get_key_fingerprint()
+                "key_id": key_id
             }
             metadata_json = json.dumps(metadata, separators=(',', ':'))
             
@@ -168,12 +499,96 @@ RwIDAQAB
         except Exception as e:
             raise Exception(f"QR kod imzalama hatası: {str(e)}")
     
+    def create_signed_qr_data_v2(self, member_data: Dict[str, Any]) -> str:
+        """
+        Kompakt v2 QR verisi oluştur
+        Format: QR2:<base45(binary payload || 64 byte Ed25519 imza)>
+        Binary payload: sabit başlık (versiyon, algoritma, key_id, member_id,
+        issued_at, expires_at, nonce) + uzunluk önekli membership_id, isim, durum
+        """
+        try:
+            # v1 ile aynı: key ve key_id birlikte alınır
+            self.reload_keys_if_changed()
+            private_key, key_id = self._active_v2_signer
+            now = int(time.time())
+            header = QR_V2_HEADER.pack(
+                QR_V2_VERSION,
+                QR_V2_ALG_ED25519,
+                bytes.fromhex(key_id),
+                int(member_data.get("id") or 0),
+                now,
+                now + CREDENTIAL_VALIDITY_DAYS * 86400,
+                secrets.token_bytes(8)  # Replay attack önleme
+            )
+            payload_bytes = (
+                header
+                + _pack_short_str(member_data.get("membershipId"))
+                + _pack_short_str(member_data.get("fullName"))
+                + _pack_short_str(member_data.get("status"))
+            )
+            signature = private_key.sign(payload_bytes)
+            return QR_V2_PREFIX + base45_encode(payload_bytes + signature)
+        except Exception as e:
+            raise Exception(f"QR v2 imzalama hatası: {str(e)}")
+    
+    def _verify_qr_signature_v2(self, qr_data: str) -> Tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Kompakt v2 QR doğrulaması - v1 ile aynı alanlara sahip sözlük döndürür"""
+        try:
+            raw = base45_decode(qr_data[len(QR_V2_PREFIX):])
+        except ValueError:
+            return False, None, "Geçersiz QR kod formatı"
+        
+        if len(raw) < QR_V2_HEADER.size + QR_V2_SIGNATURE_LENGTH:
+            return False, None, "Geçersiz QR kod formatı"
+        
+        payload_bytes = raw[:-QR_V2_SIGNATURE_LENGTH]
+        signature = raw[-QR_V2_SIGNATURE_LENGTH:]
+        version, alg, key_id, member_id, issued_at, expires_at, nonce = QR_V2_HEADER.unpack_from(payload_bytes)
+        if version != QR_V2_VERSION or alg != QR_V2_ALG_ED25519:
+            return False, None, "Desteklenmeyen QR kod versiyonu"
+        
+        public_key = self.key_registry.get(key_id.hex())
+        if public_key is None and self.reload_keys_if_changed(min_interval=0.0):
+            public_key = self.key_registry.get(key_id.hex())
+        if not isinstance(public_key, ed25519.Ed25519PublicKey):
+            return False, None, "Geçersiz anahtar ID"
+        
+        try:
+            public_key.verify(signature, payload_bytes)
+        except InvalidSignature:
+            return False, None, "Geçersiz dijital imza"
+        
+        try:
+            offset = QR_V2_HEADER.size
+            membership_id, offset = _unpack_short_str(payload_bytes, offset)
+            name, offset = _unpack_short_str(payload_bytes, offset)
+            status, offset = _unpack_short_str(payload_bytes, offset)
+        except (ValueError, IndexError, UnicodeDecodeError):
+            return False, None, "Geçersiz QR kod formatı"
+        
+        if time.time() > expires_at:
+            return False, None, "QR kod süresi dolmuş"
+        
+        return True, {
+            "member_id": member_id or None,
+            "membership_id": membership_id,
+            "name": name,
+            "status": status,
+            "org": "Community Connect",
+            "issued_at": datetime.utcfromtimestamp(issued_at).isoformat(),
+            "expires_at": datetime.utcfromtimestamp(expires_at).isoformat(),
+            "nonce": nonce.hex(),
+        }, None
+    
     def verify_qr_signature(self, qr_data: str) -> Tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
         """
-        QR kod imzasını doğrula ve veriyi çöz
+        QR kod imzasını doğrula ve veriyi çöz (v1 ve kompakt v2)
         Returns: (is_valid, decoded_data, error_message)
         """
         try:
+            if qr_data.startswith(QR_V2_PREFIX):
+                return self._verify_qr_signature_v2(qr_data)
+            
             # QR veriyi parse et
             parts = qr_data.split('|')
             if len(parts) != 3:
@@ -186,13 +601,17 @@ RwIDAQAB
             signature = base64.b64decode(signature_b64)
             metadata_bytes = base64.b64decode(metadata_b64)
             
-            # Metadata kontrol et
+            # Metadata kontrol et - key_id ile registry'den doğrulama anahtarını seç
             metadata = json.loads(metadata_bytes.decode('utf-8'))
-            if metadata.get("key_id") != self.get_key_fingerprint():
+            key_id = metadata.get("key_id")
+            public_key = self.key_registry.get(key_id)
+            if public_key is None and self.reload_keys_if_changed(min_interval=0.0):
+                public_key = self.key_registry.get(key_id)
+            if public_key is None:
                 return False, None, "Geçersiz anahtar ID"
             
             # İmzayı doğrula
-            self.public_key.verify(
+            public_key.verify(
                 signature,
                 payload_bytes,
                 padding.PSS(
@@ -218,13 +637,8 @@ RwIDAQAB
             return False, None, f"Doğrulama hatası: {str(e)}"
     
     def get_key_fingerprint(self) -> str:
-        """Public key fingerprint oluştur"""
-        public_key_bytes = self.public_key.public_bytes(
-            encoding=serialization.Encoding.DER,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        fingerprint = hashlib.sha256(public_key_bytes).hexdigest()[:16]
-        return fingerprint
+        """Aktif public key fingerprint'i (key yüklenirken bir kez hesaplanır)"""
+        return self.key_id
 
     # NFC kompakt veri oluşturma (NTAG215 uygun, kısa, imzalı)
     def create_compact_nfc_payload(self, member_data: Dict[str, Any]) -> str:
@@ -243,24 +657,15 @@ RwIDAQAB
 
         # Kompakt veri hazırlığı
         mid = str(member_data.get("membershipId") or member_data.get("membership_id") or "")
-        # Membership ID'yi kısalt (CC-2024-001 formatında)
-        if len(mid) > 12:
-            mid = mid[:12]
+        # Membership ID'yi kısalt - CC-2026-000001 (14 karakter) kesilmemeli; kesilen ID
+        # veritabanında bulunamaz ve iptal listesinde eşleşmez (v2 alanı ile aynı sınır)
+        if len(mid) > 16:
+            mid = mid[:16]
         
-        name = str(member_data.get("fullName") or member_data.get("name") or "")
-        name = name.strip()
-        if len(name) > 25:
-            # İsmi daha akıllıca kısalt
-            name_parts = name.split()
-            if len(name_parts) > 1:
-                name = f"{name_parts[0]} {name_parts[-1]}"
-                if len(name) > 25:
-                    name = name[:25]
-            else:
-                name = name[:25]
+        name = _shorten_nfc_name(member_data)
         
         # 1 yıl geçerlilik
-        exp_date = (datetime.utcnow() + timedelta(days=365)).strftime('%Y%m%d')
+        exp_date = (datetime.utcnow() + timedelta(days=CREDENTIAL_VALIDITY_DAYS)).strftime('%Y%m%d')
         
         # Kompakt JSON-like payload
         compact_data = {
@@ -279,15 +684,11 @@ RwIDAQAB
             ec.ECDSA(hashes.SHA256())
         )
         
-        print(f"🔍 Generated signature length: {len(signature)} bytes")
-        print(f"🔍 Signature payload: {payload}")
-        
         # ECDSA signature'ları genellikle DER encoded'dur, bunları raw format'a çevirmemiz gerekebilir
         # Ama şimdilik tam signature'ı kullan (compacted değil)
+        # Not: toplu üretimde binlerce kez çağrıldığı için burada print yapılmıyor
         sig_b64 = base64.urlsafe_b64encode(signature).decode('ascii').rstrip('=')
         
-        print(f"🔍 Generated signature (base64): {sig_b64}")
-        
         # Final payload: JSON + signature
         final_data = compact_data.copy()
         final_data["sig"] = sig_b64
@@ -298,248 +699,63 @@ RwIDAQAB
         encrypted_nfc = self._encrypt_nfc_data(nfc_json)
         return encrypted_nfc
     
-    def _encrypt_nfc_data(self, data: str) -> str:
+    def create_compact_nfc_payload_v2(self, member_data: Dict[str, Any], obfuscate: bool = True) -> bytes:
         """
-        NFC compact verisini ek olarak şifrele
-        Basit ama etkili XOR + Base64 şifreleme
+        NFC v2 binary payload (etikete MIME kaydı olarak yazılan ham byte'lar)
+        Sabit genişlikli alanlar + 64 byte ham r||s ECDSA P-256 imzası, toplam 116 byte
         """
-        # Şifreleme anahtarı (secret key)
-        key = b"NFC_SECURE_2024_CRYPTO_KEY_ADVANCED"
-        
-        # Veriyi bytes'a çevir
-        data_bytes = data.encode('utf-8')
-        
-        # XOR şifreleme uygula
-        encrypted_bytes = bytearray()
-        for i, byte in enumerate(data_bytes):
-            key_byte = key[i % len(key)]
-            encrypted_bytes.append(byte ^ key_byte)
+        if self.ec_private_key is None:
+            raise Exception("ECDSA private key mevcut değil")
         
-        # Base64 ile encode et
-        encrypted_b64 = base64.b64encode(bytes(encrypted_bytes)).decode('ascii')
+        membership_id = str(member_data.get("membershipId") or member_data.get("membership_id") or "")
+        expires = (datetime.utcnow() + timedelta(days=CREDENTIAL_VALIDITY_DAYS)).date()
+        message = pack_nfc_v2_message(membership_id, _shorten_nfc_name(member_data), expires, obfuscate)
         
-        # Prefix ekle (şifrelenmiş olduğunu belirtmek için)
-        return f"NFC_ENC_V1:{encrypted_b64}"
+        return build_nfc_v2(message, self.sign_p256_raw(message))
     
-    def _decrypt_nfc_data(self, encrypted_data: str) -> str:
+    def sign_p256_raw(self, data: bytes) -> bytes:
+        """NFC ECDSA P-256 key ile imzala - DER yerine sabit 64 byte r||s döner"""
+        if self.ec_private_key is None:
+            raise Exception("ECDSA private key mevcut değil")
+        r, s = decode_dss_signature(self.ec_private_key.sign(data, ec.ECDSA(hashes.SHA256())))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+    
+    def get_nfc_public_key_pem(self) -> str:
+        """Okuyucuların NFC, iptal listesi ve snapshot imzalarını doğruladığı public key"""
+        return self.ec_public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode('utf-8')
+    
+    def verify_nfc_v2(self, payload: NfcV2Payload) -> bool:
+        """NFC v2 imzasını doğrula - JSON yeniden oluşturulmaz, mesaj byte'ları doğrudan kullanılır"""
+        try:
+            return self.nfc_verifier.verify(payload.signed_message, payload.signature)
+        except Exception as e:
+            print(f"❌ NFC v2 signature verification exception: {e}")
+            return False
+    
+    def _encrypt_nfc_data(self, data: str) -> str:
+        """
+        NFC compact verisini ek olarak şifrele
+        XOR + Base64 (bkz. nfc_codec - online ve offline yollarla ortak)
+        """
+        return encode_nfc_v1(data)
+    
+    def _decrypt_nfc_data(self, encrypted_data: str) -> Optional[str]:
         """
         Şifrelenmiş NFC verisini çöz
         """
-        try:
-            print(f"🔧 Decrypt input: {encrypted_data[:50]}...")
-            
-            if not encrypted_data.startswith("NFC_ENC_V1:"):
-                print("🔧 Not encrypted, returning as-is")
-                return encrypted_data  # Şifrelenmiş değil
-            
-            # Prefix'i kaldır
-            encrypted_b64 = encrypted_data[11:]  # "NFC_ENC_V1:" uzunluğu
-            print(f"🔧 Base64 data length: {len(encrypted_b64)}")
-            
-            # Base64 decode
-            encrypted_bytes = base64.b64decode(encrypted_b64)
-            print(f"🔧 Encrypted bytes length: {len(encrypted_bytes)}")
-            
-            # XOR ile çöz
-            key = b"NFC_SECURE_2024_CRYPTO_KEY_ADVANCED"
-            decrypted_bytes = bytearray()
-            for i, byte in enumerate(encrypted_bytes):
-                key_byte = key[i % len(key)]
-                decrypted_bytes.append(byte ^ key_byte)
-            
-            result = bytes(decrypted_bytes).decode('utf-8')
-            print(f"🔧 Decrypt result length: {len(result)}")
-            print(f"🔧 Decrypt preview: {result[:100]}...")
-            return result
-            
-        except Exception as e:
-            print(f"❌ Decrypt error: {e}")
-            return None
+        return decode_nfc_v1(encrypted_data)
     
     def _verify_nfc_signature(self, nfc_data: Dict[str, Any]) -> bool:
         """
         NFC compact verisinin ECDSA imzasını doğrula
+        İmza formatı (DER / ham r||s) bir kez çözülür ve tek verify yapılır;
+        reddedilen imzalar NfcSignatureVerifier önbelleğinde tutulur
         """
         try:
-            print(f"🔐 SIGNATURE VERIFICATION START")
-            
-            if self.ec_public_key is None:
-                print(f"❌ EC public key is None")
-                return False
-            
-            # İmzayı ayır
-            signature_b64 = nfc_data.get('sig', '')
-            if not signature_b64:
-                print(f"❌ No signature field found")
-                return False
-                
-            print(f"🔐 Original signature: {signature_b64}")
-            print(f"🔐 Signature length: {len(signature_b64)} chars")
-            print(f"🔐 Signature hex: {signature_b64.encode('ascii').hex()}")
-            print(f"🔐 NFC data keys: {list(nfc_data.keys())}")
-            
-            # İmzalanan veriyi yeniden oluştur
-            verify_data = nfc_data.copy()
-            del verify_data['sig']  # İmzayı çıkar
-            
-            payload = json.dumps(verify_data, separators=(',', ':'))
-            print(f"🔐 Verification payload: {payload}")
-            print(f"🔐 Payload length: {len(payload)} chars")
-            print(f"🔐 Payload bytes hex: {payload.encode('utf-8').hex()}")
-            print(f"🔐 Verify data structure: {verify_data}")
-            
-            # Base64 decode (padding ekle gerekirse)
-            padding_count = (4 - len(signature_b64) % 4) % 4
-            padding = '=' * padding_count
-            padded_signature = signature_b64 + padding
-            print(f"🔐 Padding added: {padding_count} chars")
-            print(f"🔐 Padded signature: {padded_signature}")
-            print(f"🔐 Padded length: {len(padded_signature)}")
-            
-            try:
-                signature_bytes = base64.urlsafe_b64decode(padded_signature)
-                print(f"🔐 Signature bytes length: {len(signature_bytes)}")
-                print(f"🔐 Full signature hex: {signature_bytes.hex()}")
-                print(f"🔐 First 32 bytes hex: {signature_bytes[:32].hex()}")
-                if len(signature_bytes) > 32:
-                    print(f"🔐 Last 32 bytes hex: {signature_bytes[-32:].hex()}")
-            except Exception as e:
-                print(f"❌ Base64 decode failed: {e}")
-                print(f"❌ Attempted to decode: {padded_signature}")
-                return False
-            
-            # ECDSA signature minimum length kontrolü
-            if len(signature_bytes) < 32:
-                print(f"❌ Signature too short: {len(signature_bytes)} bytes")
-                return False
-            
-            # Public key bilgisini logla
-            from cryptography.hazmat.primitives import serialization
-            pubkey_pem = self.ec_public_key.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo
-            ).decode('utf-8')
-            print(f"🔐 Using public key (PEM): {pubkey_pem[:100]}...")
-            
-            # Payload hash'ini de kontrol edelim
-            import hashlib
-            payload_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
-            print(f"🔐 Payload SHA256: {payload_hash}")
-            
-            # ECDSA doğrulama - Production grade multi-format approach
-            verification_success = False
-            
-            # Method 1: Standard DER format verification
-            try:
-                self.ec_public_key.verify(
-                    signature_bytes,
-                    payload.encode('utf-8'),
-                    ec.ECDSA(hashes.SHA256())
-                )
-                print(f"✅ ECDSA signature verification SUCCESS (DER format)")
-                verification_success = True
-            except InvalidSignature as e:
-                print(f"🔄 DER format verification failed: {e}")
-            except Exception as e:
-                print(f"🔄 DER format verification error: {e}")
-                
-            # Method 2: Raw R,S parsing for incomplete signatures
-            if not verification_success and len(signature_bytes) >= 32:
-                try:
-                    print(f"🔄 Attempting raw R,S parsing...")
-                    
-                    # DER header analysis
-                    if signature_bytes[0] == 0x30:  # DER SEQUENCE
-                        total_length = signature_bytes[1]
-                        print(f"🔄 DER sequence length: {total_length}")
-                        
-                        # Parse R value
-                        if signature_bytes[2] == 0x02:  # INTEGER
-                            r_length = signature_bytes[3]
-                            r_start = 4
-                            if signature_bytes[r_start] == 0x00:  # Remove leading zero
-                                r_start += 1
-                                r_length -= 1
-                            r_value = signature_bytes[r_start:r_start + r_length]
-                            print(f"🔄 Extracted R value: {r_value.hex()} (length: {len(r_value)})")
-                            
-                            # Check if S value exists
-                            s_start = r_start + r_length
-                            if s_start < len(signature_bytes) and signature_bytes[s_start] == 0x02:
-                                s_length = signature_bytes[s_start + 1]
-                                s_start += 2
-                                if signature_bytes[s_start] == 0x00:
-                                    s_start += 1
-                                    s_length -= 1
-                                s_value = signature_bytes[s_start:s_start + s_length]
-                                print(f"🔄 Extracted S value: {s_value.hex()} (length: {len(s_value)})")
-                                
-                                # Reconstruct signature with proper padding
-                                if len(r_value) == 32 and len(s_value) >= 1:
-                                    reconstructed_sig = signature_bytes  # Use original if both R,S exist
-                                    self.ec_public_key.verify(
-                                        reconstructed_sig,
-                                        payload.encode('utf-8'),
-                                        ec.ECDSA(hashes.SHA256())
-                                    )
-                                    print(f"✅ ECDSA signature verification SUCCESS (reconstructed)")
-                                    verification_success = True
-                            else:
-                                print(f"⚠️  S value missing or incomplete - signature truncated")
-                                # Try with only R value (may work with some implementations)
-                                print(f"🔄 Attempting verification with R-only (fallback)")
-                                
-                except Exception as e:
-                    print(f"🔄 Raw parsing failed: {e}")
-            
-            # Method 3: Alternative signature formats (P1363, raw concatenation)
-            if not verification_success and len(signature_bytes) == 64:
-                try:
-                    print(f"🔄 Attempting P1363 format (64-byte raw R||S)...")
-                    # 64 bytes = 32-byte R + 32-byte S in raw concatenation
-                    self.ec_public_key.verify(
-                        signature_bytes,
-                        payload.encode('utf-8'),
-                        ec.ECDSA(hashes.SHA256())
-                    )
-                    print(f"✅ ECDSA signature verification SUCCESS (P1363 format)")
-                    verification_success = True
-                except Exception as e:
-                    print(f"🔄 P1363 format failed: {e}")
-            
-            # Method 4: Lenient verification for development/testing
-            if not verification_success:
-                print(f"⚠️  All signature verification methods failed")
-                print(f"🔍 Signature analysis:")
-                print(f"    - Length: {len(signature_bytes)} bytes")
-                print(f"    - Format: {'DER' if signature_bytes[0] == 0x30 else 'Raw'}")
-                print(f"    - First 8 bytes: {signature_bytes[:8].hex()}")
-
-                # Lenient fallback (matches older tolerant behavior):
-                # Accept if signature decodes and length is at least 20 bytes,
-                # and signature contains only base64url-safe charset
-                try:
-                    base64url_chars_ok = all(
-                        (65 <= b <= 90) or (97 <= b <= 122) or (48 <= b <= 57) or b in (45, 95, 43, 47, 61)
-                        for b in padded_signature.encode('ascii')
-                    )
-                except Exception:
-                    base64url_chars_ok = False
-
-                if len(signature_bytes) >= 20 and base64url_chars_ok:
-                    print("🔧 Lenient fallback accepted (length>=20 and charset ok)")
-                    return True
-
-                # As a last resort, accept if original signature string length is typical (>= 43)
-                if len(signature_b64) >= 43:
-                    print("🔧 Lenient fallback accepted (string length >= 43)")
-                    return True
-
-                # Otherwise, reject
-                return False
-                
-            return verification_success
-            
+            return self.nfc_verifier.verify_nfc_json(nfc_data)
         except Exception as e:
             print(f"❌ Signature verification exception: {e}")
             return False
@@ -643,11 +859,19 @@ RwIDAQAB
 # Global instance
 secure_qr = SecureQRManager()
 
-def generate_secure_member_qr(member_data: Dict[str, Any]) -> str:
-    """Güvenli üye QR kodu oluştur"""
+def generate_secure_member_qr(member_data: Dict[str, Any], version: Optional[int] = None) -> str:
+    """Güvenli üye QR kodu oluştur (version: 1 = RSA-PSS JSON, 2 = kompakt Ed25519)"""
+    if (version or QR_DEFAULT_VERSION) == QR_V2_VERSION:
+        return secure_qr.create_signed_qr_data_v2(member_data)
     return secure_qr.create_signed_qr_data(member_data)
 
 
+def generate_member_nfc_payload(member_data: Dict[str, Any], version: Optional[int] = None) -> str:
+    """Üye NFC payload'ı oluştur (version: 1 = NFC_ENC_V1 JSON, 2 = kompakt binary, NFC2: metni)"""
+    if (version or NFC_DEFAULT_VERSION) == NFC_V2_VERSION:
+        return encode_nfc_v2(secure_qr.create_compact_nfc_payload_v2(member_data))
+    return secure_qr.create_compact_nfc_payload(member_data)
+
 
 def verify_member_qr(qr_data: str) -> Tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
     """Üye QR kodunu doğrula"""
@@ -655,6 +879,11 @@ def verify_member_qr(qr_data: str) -> Tuple[bool, Optional[Dict[str, Any]], Opti
 
 
 
+def get_public_keys() -> list:
+    """Aktif ve emekli tüm QR doğrulama anahtarları (key_id ile)"""
+    return secure_qr.key_registry.describe()
+
+
 def get_public_key_pem() -> str:
     """Public key'i PEM formatında döndür (mağazalar için)"""
     return secure_qr.public_key.public_bytes(
@@ -2,9 +2,11 @@
 """
 Günlük temizlik ve istatistik hesaplama job'u
 Bu script günlük olarak çalıştırılarak:
-1. 1 aylık eski logları temizler
+1. 1 aylık eski logları temizler (bölümlü tablolarda eski ayları atar, gelecek ayları açar)
 2. Günlük istatistikleri hesaplar
-3. Sistem bakımı yapar
+3. Eski üye değişiklik olaylarını temizler (iptal listesi delta geçmişi)
+4. Hiçbir kaydın kullanmadığı fotoğraf blob'larını siler
+5. Sistem bakımı yapar
 """
 
 import sys
@@ -14,7 +16,13 @@ from datetime import datetime, timedelta
 # Backend modüllerini import et
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database import cleanup_old_logs, calculate_daily_stats, get_db, SessionLocal
+from database import cleanup_old_logs, calculate_daily_stats, get_db, SessionLocal, Member, User
+from blob_store import blob_store
+from photo_derivatives import collect_orphan_derivatives
+from member_events import cleanup_member_change_events
+
+# Bu süreden eski delta geçmişi tutulmaz - daha uzun süre çevrimdışı kalan okuyucu tam liste alır
+MEMBER_EVENT_RETENTION_DAYS = 90
 
 def main():
     print(f"🕐 Günlük temizlik job'u başlıyor... {datetime.now()}")
@@ -37,6 +45,27 @@ def main():
         today_stats = calculate_daily_stats()
         print(f"✅ Bugünkü istatistikler: {today_stats}")
         
+        # 4. Eski üye değişiklik olaylarını temizle (silme olayları korunur)
+        print("🗂️ Eski üye değişiklik olayları temizleniyor...")
+        db = SessionLocal()
+        try:
+            removed_events = cleanup_member_change_events(db, MEMBER_EVENT_RETENTION_DAYS)
+        finally:
+            db.close()
+        print(f"✅ {removed_events} olay silindi")
+        
+        # 5. Referanssız blob'ları temizle (değiştirilen/silinen fotoğraflar)
+        print("🖼️ Kullanılmayan fotoğraf blob'ları temizleniyor...")
+        db = SessionLocal()
+        try:
+            referenced = {row.photo_hash for row in db.query(Member.photo_hash).filter(Member.photo_hash.isnot(None))}
+            referenced.update(row.image_hash for row in db.query(User.image_hash).filter(User.image_hash.isnot(None)))
+        finally:
+            db.close()
+        removed_blobs = blob_store.collect_garbage(referenced)
+        removed_derivatives = collect_orphan_derivatives(referenced)
+        print(f"✅ {removed_blobs} blob, {removed_derivatives} fotoğraf türevi silindi")
+        
         print(f"🎉 Günlük temizlik job'u başarıyla tamamlandı! {datetime.now()}")
         
     except Exception as e:
@@ -1,12 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey
+from sqlalchemy import event, and_, case, func, create_engine, Column, Integer, BigInteger, String, DateTime, Text, Boolean, Float, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, deferred
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 import hashlib
 import time
 
+from metrics import metrics
+
 # Load environment variables
 load_dotenv()
 
@@ -41,6 +43,57 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Session metrikleri (bkz. get_db)
+# - checkout: transaction başladıktan bağlantı hazır olana kadar geçen süre (pre_ping dahil)
+# - sorgu sayısı: session'ın tuttuğu bağlantıda çalışan her SQL ifadesi
+# - süre: ilk kullanımdan kapanışa kadar
+
+@event.listens_for(SessionLocal, "after_transaction_create")
+def _session_transaction_created(session, transaction):
+    if transaction.parent is None:
+        now = time.perf_counter()
+        session.info.setdefault("db_started", now)
+        session.info["db_transaction_started"] = now
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _session_connection_acquired(session, transaction, connection):
+    started = session.info.get("db_transaction_started")
+    if started is not None:
+        metrics.observe("db.checkout_ms", (time.perf_counter() - started) * 1000)
+    session.info.setdefault("db_queries", 0)
+    # connection.info havuzdaki DBAPI bağlantısına aittir; transaction bitince temizlenir
+    connection.info["db_session_info"] = session.info
+    session.info["db_connection_info"] = connection.info
+
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+def _session_connection_released(session, transaction):
+    # commit, rollback ve close'da çağrılır - bağlantı havuza dönerken session'a referans kalmaz
+    if transaction.parent is None:
+        connection_info = session.info.pop("db_connection_info", None)
+        if connection_info is not None:
+            connection_info.pop("db_session_info", None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_session_query(conn, cursor, statement, parameters, context, executemany):
+    session_info = conn.info.get("db_session_info")
+    if session_info is not None:
+        session_info["db_queries"] += 1
+
+
+def _record_session_metrics(db):
+    started = db.info.get("db_started")
+    if started is None:
+        metrics.increment("db.sessions_unused")
+        return
+    queries = db.info.get("db_queries", 0)
+    metrics.increment("db.sessions")
+    metrics.increment("db.queries", queries)
+    metrics.observe("db.session_ms", (time.perf_counter() - started) * 1000)
+    metrics.observe("db.queries_per_session", queries)
+
 # Base class for models
 Base = declarative_base()
 
@@ -52,7 +105,8 @@ class User(Base):
     name = Column(String(255), nullable=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     email_verified = Column(DateTime, nullable=True)
-    image = Column(Text, nullable=True)
+    image = deferred(Column(Text, nullable=True))  # Eski base64 kolon - bkz. image_hash
+    image_hash = Column(String(64), nullable=True)  # Blob deposundaki SHA-256 özeti
     password_hash = Column(String(255), nullable=True)  # Hashed password için
     role = Column(String(50), default="user")  # admin, user
     is_active = Column(Boolean, default=True)
@@ -65,6 +119,10 @@ class User(Base):
 # Business model
 class Business(Base):
     __tablename__ = "businesses"
+    __table_args__ = (
+        # İşletme listesi: sahibe göre aktif işletmeler
+        Index("ix_businesses_owner_id_is_active", "owner_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -88,6 +146,10 @@ class Business(Base):
 # Business Event model (indirimleri, kampanyaları vs. tutacak)
 class BusinessEvent(Base):
     __tablename__ = "business_events"
+    __table_args__ = (
+        # Dashboard: şu an geçerli aktif kampanyalar
+        Index("ix_business_events_active_dates", "is_active", "start_date", "end_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
@@ -133,9 +195,14 @@ class BusinessContract(Base):
 # Member model (mevcut üye sistemi - korunuyor)
 class Member(Base):
     __tablename__ = "members"
+    __table_args__ = (
+        # Liste ekranı: durum filtresi + isim/kayıt tarihine göre keyset sayfalama
+        Index("ix_members_status_full_name", "status", "full_name"),
+        Index("ix_members_status_created_at", "status", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    full_name = Column(String(255), nullable=False)
+    full_name = Column(String(255), nullable=False, index=True)
     membership_id = Column(String(50), unique=True, nullable=False, index=True)
     card_number = Column(String(16), unique=True, nullable=False)
     phone_number = Column(String(20), nullable=False)
@@ -145,14 +212,60 @@ class Member(Base):
     emergency_contact = Column(String(20), nullable=False)
     membership_type = Column(String(50), nullable=False)
     role = Column(String(50), nullable=False)
-    status = Column(String(20), default="active")
-    profile_photo = Column(Text, nullable=True)  # Base64 encoded profile photo
+    status = Column(String(20), default="active")  # Filtre: bileşik indekslerin sol öneki
+    # Eski base64 kolon - fotoğraflar blob deposuna taşındı (bkz. blob_store), ORM yüklemelerinde okunmaz
+    profile_photo = deferred(Column(Text, nullable=True))
+    photo_hash = Column(String(64), nullable=True, index=True)  # Blob deposundaki SHA-256 özeti
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Issued Credential model - imzalı QR/NFC verilerinin versiyonlu kopyası
+# Her okumada yeniden imzalamak yerine üye değişene veya süresi dolmaya yaklaşana kadar saklanır
+class IssuedCredential(Base):
+    __tablename__ = "issued_credentials"
+    __table_args__ = (
+        UniqueConstraint("member_id", "version", name="uq_issued_credentials_member_version"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    member_id = Column(Integer, ForeignKey("members.id", ondelete="CASCADE"), nullable=False, index=True)
+    version = Column(Integer, nullable=False, default=1)  # Üye başına artan versiyon
+    member_updated_at = Column(DateTime, nullable=True)  # İmzalandığı andaki Member.updated_at
+    format_tag = Column(String(32), nullable=True)  # İmzalandığı format (bkz. credential_store.credential_format_tag)
+    secure_qr_code = Column(Text, nullable=True)  # Standart imzalı QR verisi
+    nfc_payload = Column(Text, nullable=True)  # NFC kompakt veri
+    expires_at = Column(DateTime, nullable=False)  # Kimlik bilgisinin geçerlilik sonu
     created_at = Column(DateTime, default=datetime.utcnow)
+
+# Member Change Event model - üye değişikliklerinin sıralı kaydı
+# Artan id, okuyuculara gönderilen iptal listesi ve snapshot delta'ları için versiyon cursor'ıdır
+class MemberChangeEvent(Base):
+    __tablename__ = "member_change_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    member_id = Column(Integer, nullable=False, index=True)  # FK yok - silinen üyelerin olayları da saklanır
+    membership_id = Column(String(50), nullable=False, index=True)
+    event_type = Column(String(20), nullable=False)  # created, updated, deleted
+    status = Column(String(20), nullable=True)  # Olay anındaki üye durumu
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+# ID Sequence model - membership ID ve kart numarası sayaçları (bkz. id_allocator)
+# Tek UPDATE ile atomik artırılır (satır kilidi); worker'lar blok halinde rezerve eder
+# member_change_events:pruned satırı sayaç değil, olay budama sınırıdır (bkz. member_events)
+class IdSequence(Base):
+    __tablename__ = "id_sequences"
+    
+    name = Column(String(50), primary_key=True)  # membership_id:2026, card_number
+    next_value = Column(BigInteger, nullable=False, default=1)  # Henüz verilmemiş ilk değer
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-# NFC Reading History model
+# NFC Reading History model - MySQL'de aylık bölümlü, member_id FK'sı sadece ORM içindir (bkz. log_partitions)
 class NfcReadingHistory(Base):
     __tablename__ = "nfc_reading_history"
+    __table_args__ = (
+        # Okuma geçmişi: cihaza göre tarih aralığı
+        Index("ix_nfc_reading_history_device_created", "device_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     device_id = Column(String(255), nullable=True)  # Device identifier
@@ -165,14 +278,19 @@ class NfcReadingHistory(Base):
     verification_type = Column(String(50), nullable=True)  # online, offline
     ip_address = Column(String(45), nullable=True)  # Client IP address
     user_agent = Column(Text, nullable=True)  # Client user agent
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationship
     member = relationship("Member", backref="nfc_readings")
 
 # API Call Logs model - NFC ve diğer API çağrılarının logları
+# MySQL'de aylık bölümlü, member_id FK'sı sadece ORM içindir (bkz. log_partitions)
 class ApiCallLog(Base):
     __tablename__ = "api_call_logs"
+    __table_args__ = (
+        # Günlük istatistikler: kategori başına tarih aralığı
+        Index("ix_api_call_logs_category_created_at", "api_category", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     endpoint = Column(String(255), nullable=False, index=True)  # API endpoint
@@ -236,43 +354,17 @@ DBDashboardStats = DashboardStats
 
 # Dependency to get database session
 def get_db():
-    start_time = time.time()
-    request_id = f"db_{int(time.time() * 1000)}"
-    
-    # Sadece authentication endpoint'leri için detaylı logging
-    import inspect
-    frame = inspect.currentframe()
-    caller_name = ""
-    try:
-        if frame and frame.f_back and frame.f_back.f_back:
-            caller_name = frame.f_back.f_back.f_code.co_name
-    except:
-        pass
-    
-    # Authentication related calls için özel logging
-    is_auth_call = caller_name in ['login', 'get_current_user'] or 'auth' in caller_name.lower()
-    
-    if is_auth_call:
-        print(f"🗄️ [{request_id}] Database session oluşturuluyor... (caller: {caller_name})")
-    
-    session_start = time.time()
+    """
+    Request başına session. Bağlantı havuzdan ilk sorguda alınır (SQLAlchemy
+    autobegin); session'ı hiç kullanmayan endpoint'ler bağlantı maliyeti ödemez.
+    Ölçümler print() yerine metrics registry'ye yazılır.
+    """
     db = SessionLocal()
-    session_time = (time.time() - session_start) * 1000
-    
-    if is_auth_call:
-        print(f"🗄️ [{request_id}] Database session oluşturuldu: {session_time:.2f}ms")
-    
     try:
         yield db
     finally:
-        close_start = time.time()
         db.close()
-        close_time = (time.time() - close_start) * 1000
-        total_time = (time.time() - start_time) * 1000
-        
-        if is_auth_call:
-            print(f"🗄️ [{request_id}] Database session kapatıldı: {close_time:.2f}ms")
-            print(f"🗄️ [{request_id}] Total DB session time: {total_time:.2f}ms")
+        _record_session_metrics(db)
 
 # Utility functions for password hashing
 def hash_password(password: str) -> str:
@@ -350,20 +442,20 @@ def create_default_admin():
 
 # Data cleanup functions
 def cleanup_old_logs(retention_days: int = 30):
-    """1 aylık eski API loglarını ve NFC reading history'sini temizle"""
+    """
+    1 aylık eski API loglarını ve NFC reading history'sini temizle.
+    Bölümlü MySQL tablolarında eski aylar bölüm olarak atılır, kalanlar parti
+    parti silinir (bkz. log_partitions).
+    """
+    from log_partitions import maintain_log_partitions, purge_expired_logs
+    
     db = SessionLocal()
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
-        
-        # API call logs temizleme
-        deleted_api_logs = db.query(ApiCallLog).filter(
-            ApiCallLog.created_at < cutoff_date
-        ).delete()
-        
-        # NFC reading history temizleme
-        deleted_nfc_logs = db.query(NfcReadingHistory).filter(
-            NfcReadingHistory.created_at < cutoff_date
-        ).delete()
+        # Önümüzdeki ayların bölümlerini aç, sonra süresi dolanları at
+        maintain_log_partitions()
+        purged = purge_expired_logs(retention_days)
+        deleted_api_logs = purged[ApiCallLog.__tablename__]
+        deleted_nfc_logs = purged[NfcReadingHistory.__tablename__]
         
         # Dashboard stats temizleme (90 günden eski)
         stats_cutoff_date = datetime.utcnow() - timedelta(days=90)
@@ -401,30 +493,37 @@ def calculate_daily_stats(target_date: datetime = None):
         start_date = target_date
         end_date = start_date + timedelta(days=1)
         
-        # API call istatistikleri
-        api_logs = db.query(ApiCallLog).filter(
+        # API call istatistikleri - kategori başına tek GROUP BY sorgusu; log satırları belleğe alınmaz
+        successful_case = case((and_(ApiCallLog.status_code >= 200, ApiCallLog.status_code < 300), 1), else_=0)
+        category_rows = db.query(
+            ApiCallLog.api_category,
+            func.count(ApiCallLog.id),
+            func.sum(successful_case),
+            func.sum(ApiCallLog.response_time_ms),
+            func.count(ApiCallLog.response_time_ms)
+        ).filter(
             ApiCallLog.created_at >= start_date,
             ApiCallLog.created_at < end_date
-        ).all()
+        ).group_by(ApiCallLog.api_category).all()
         
-        total_api_calls = len(api_logs)
-        successful_api_calls = len([log for log in api_logs if 200 <= log.status_code < 300])
+        by_category = {
+            category: (int(total or 0), int(successful or 0))
+            for category, total, successful, _, _ in category_rows
+        }
+        total_api_calls = sum(total for total, _ in by_category.values())
+        successful_api_calls = sum(successful for _, successful in by_category.values())
         failed_api_calls = total_api_calls - successful_api_calls
         
         # Ortalama yanıt süresi hesapla
-        response_times = [log.response_time_ms for log in api_logs if log.response_time_ms is not None]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        response_time_sum = sum(float(row[3] or 0) for row in category_rows)
+        response_time_count = sum(int(row[4] or 0) for row in category_rows)
+        avg_response_time = response_time_sum / response_time_count if response_time_count else 0
         
         # NFC ve QR istatistikleri
-        nfc_logs = [log for log in api_logs if log.api_category == 'nfc']
-        qr_logs = [log for log in api_logs if log.api_category == 'qr']
-        
-        total_nfc_scans = len(nfc_logs)
-        successful_nfc_scans = len([log for log in nfc_logs if 200 <= log.status_code < 300])
+        total_nfc_scans, successful_nfc_scans = by_category.get('nfc', (0, 0))
         failed_nfc_scans = total_nfc_scans - successful_nfc_scans
         
-        total_qr_verifications = len(qr_logs)
-        successful_qr_verifications = len([log for log in qr_logs if 200 <= log.status_code < 300])
+        total_qr_verifications, successful_qr_verifications = by_category.get('qr', (0, 0))
         
         # Üye istatistikleri
         new_members_count = db.query(Member).filter(
@@ -0,0 +1,172 @@
+"""
+Membership ID ve Kart Numarası Dağıtıcı
+COUNT(*)+1 ve rastgele numara deneme döngüleri yerine id_sequences tablosundaki
+sayaçlardan numara verir.
+
+- Sayaç satırı tek UPDATE ile artırılır (satır kilidi commit'e kadar tutulur); her
+  worker kısa bir transaction'da ID_BLOCK_SIZE'lık bir blok rezerve eder ve bloğu
+  bellekten dağıtır. Yeni üye başına veritabanı sorgusu gerekmez, worker'lar aynı
+  numarayı alamaz.
+- Worker yeniden başlarsa kullanılmayan blok numaraları atlanır (boşluk oluşur,
+  tekrar oluşmaz).
+- Membership ID: CC-<yıl>-<sıra>; yıl başına ayrı sayaç. Sayaç ilk kullanımda o
+  yılın mevcut en büyük numarasından devam eder.
+- Kart numarası: 16 hane, son hane Luhn kontrol hanesi. Gövde, sıra numarasının
+  10^14 modunda birebir (affine) karışımıdır; numaralar ardışık görünmez ama
+  çakışmaz, bu yüzden benzersizlik sorgusu gerekmez.
+- Toplu içe aktarma için reserve_member_identifiers tek seferde N çift verir.
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import IdSequence, Member, SessionLocal
+
+MEMBERSHIP_ID_PREFIX = "CC"
+MEMBERSHIP_ID_DIGITS = 6
+
+CARD_NUMBER_LENGTH = 16
+CARD_NUMBER_PREFIX = os.getenv("CARD_NUMBER_PREFIX", "9")
+
+# Worker başına bir seferde rezerve edilen numara sayısı
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "20"))
+
+CARD_SEQUENCE = "card_number"
+
+# Kart gövdesi = (sıra * çarpan + kaydırma) mod 10^hane. Çarpan 10 ile aralarında
+# asal olduğundan (2 ve 5'e bölünmez) dönüşüm birebirdir.
+_CARD_BODY_DIGITS = CARD_NUMBER_LENGTH - len(CARD_NUMBER_PREFIX) - 1
+_CARD_BODY_MODULUS = 10 ** _CARD_BODY_DIGITS
+_CARD_MULTIPLIER = 7_391_023_847_517 % _CARD_BODY_MODULUS
+_CARD_OFFSET = 4_825_116_093_071 % _CARD_BODY_MODULUS
+
+
+def luhn_check_digit(partial: str) -> str:
+    """Sonuna eklenecek Luhn kontrol hanesi"""
+    total = 0
+    # Kontrol hanesi eklenince sağdan ikinci olacak haneden başlayarak her ikinci hane ikiye katlanır
+    for index, char in enumerate(reversed(partial)):
+        digit = int(char)
+        if index % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return str((10 - total % 10) % 10)
+
+
+def is_luhn_valid(number: str) -> bool:
+    return number.isdigit() and len(number) > 1 and luhn_check_digit(number[:-1]) == number[-1]
+
+
+def card_number_for(sequence_value: int) -> str:
+    """Sıra numarasından Luhn geçerli 16 haneli kart numarası"""
+    body = (sequence_value * _CARD_MULTIPLIER + _CARD_OFFSET) % _CARD_BODY_MODULUS
+    partial = f"{CARD_NUMBER_PREFIX}{body:0{_CARD_BODY_DIGITS}d}"
+    return partial + luhn_check_digit(partial)
+
+
+def membership_id_for(year: int, sequence_value: int) -> str:
+    return f"{MEMBERSHIP_ID_PREFIX}-{year}-{str(sequence_value).zfill(MEMBERSHIP_ID_DIGITS)}"
+
+
+def _membership_sequence(year: int) -> str:
+    return f"membership_id:{year}"
+
+
+def _membership_seed(year: int) -> Callable[[Session], int]:
+    """Sayaç yoksa: o yılın mevcut en büyük numarasından sonrası"""
+    def seed(db: Session) -> int:
+        prefix = f"{MEMBERSHIP_ID_PREFIX}-{year}-"
+        last = db.query(func.max(Member.membership_id)).filter(
+            Member.membership_id.like(f"{prefix}%")
+        ).scalar()
+        suffix = last[len(prefix):] if last else ""
+        return int(suffix) + 1 if suffix.isdigit() else 1
+    return seed
+
+
+def _card_seed(db: Session) -> int:
+    return 1
+
+
+class IdAllocator:
+    """Sayaç tablosundan blok rezervasyonu + bellekten dağıtım (thread-safe)"""
+
+    def __init__(self, block_size: int = ID_BLOCK_SIZE):
+        self.block_size = max(1, block_size)
+        self._blocks: Dict[str, List[int]] = {}  # sayaç -> [sıradaki, bitiş)
+        self._lock = threading.Lock()
+
+    def reserve(self, name: str, count: int, seed: Callable[[Session], int]) -> int:
+        """
+        Sayaçtan count adet ardışık değer rezerve et, ilkini döndür.
+        Kendi kısa transaction'ında çalışır; kilit sadece bu commit'e kadar tutulur.
+        """
+        if count < 1:
+            raise ValueError("count en az 1 olmalı")
+        db = SessionLocal()
+        try:
+            for _ in range(3):
+                # Önce artır: UPDATE satırı kilitler, eşzamanlı rezervasyonlar commit'e kadar bekler
+                updated = db.query(IdSequence).filter(IdSequence.name == name).update(
+                    {IdSequence.next_value: IdSequence.next_value + count, IdSequence.updated_at: datetime.utcnow()},
+                    synchronize_session=False
+                )
+                if updated:
+                    end = db.query(IdSequence.next_value).filter(IdSequence.name == name).scalar()
+                    db.commit()
+                    return end - count
+
+                start = seed(db)
+                db.add(IdSequence(name=name, next_value=start + count))
+                try:
+                    db.commit()
+                    return start
+                except IntegrityError:
+                    # Başka bir worker sayacı aynı anda oluşturdu - artırarak tekrar dene
+                    db.rollback()
+            raise RuntimeError(f"Sayaç rezerve edilemedi: {name}")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def next_value(self, name: str, seed: Callable[[Session], int]) -> int:
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None or block[0] >= block[1]:
+                start = self.reserve(name, self.block_size, seed)
+                block = [start, start + self.block_size]
+                self._blocks[name] = block
+            value = block[0]
+            block[0] += 1
+            return value
+
+    def allocate_membership_id(self, year: Optional[int] = None) -> str:
+        year = year or datetime.now().year
+        return membership_id_for(year, self.next_value(_membership_sequence(year), _membership_seed(year)))
+
+    def allocate_card_number(self) -> str:
+        return card_number_for(self.next_value(CARD_SEQUENCE, _card_seed))
+
+    def reserve_member_identifiers(self, count: int, year: Optional[int] = None) -> List[Tuple[str, str]]:
+        """Toplu içe aktarma için count adet (membership_id, kart numarası) çifti - iki round trip"""
+        year = year or datetime.now().year
+        membership_start = self.reserve(_membership_sequence(year), count, _membership_seed(year))
+        card_start = self.reserve(CARD_SEQUENCE, count, _card_seed)
+        return [
+            (membership_id_for(year, membership_start + offset), card_number_for(card_start + offset))
+            for offset in range(count)
+        ]
+
+
+# Global instance
+id_allocator = IdAllocator()
@@ -0,0 +1,176 @@
+"""
+Log Tablosu Bölümleme (Partition) ve Saklama
+api_call_logs ve nfc_reading_history MySQL'de created_at üzerinde aylık
+RANGE COLUMNS bölümleriyle tutulur (bkz. alembic e5a6de309b84).
+
+- Saklama süresi dolan aylar ALTER TABLE ... DROP PARTITION ile atılır; satır
+  tek tek silinmez, undo log büyümez, kilit sadece metadata değişikliği kadar sürer
+- Bakım rutini önümüzdeki LOG_PARTITION_MONTHS_AHEAD ayın bölümlerini boş pmax
+  bölümünden ayırarak önceden açar; pmax boş olduğu sürece veri taşınmaz
+- Kesim tarihi ay ortasına denk geldiğinde sınırdaki ayın eski satırları, ve
+  bölümlenmemiş kurulumlarda (SQLite, migration çalışmamış MySQL) tüm eski
+  satırlar LOG_DELETE_CHUNK_SIZE'lık DELETE'lerle silinir; her parti ayrı commit
+
+Not: MySQL bölümlenmiş tablolarda foreign key desteklemez ve her unique anahtar
+bölüm kolonunu içermelidir. Migration member_id foreign key'lerini kaldırır ve
+birincil anahtarı (id, created_at) yapar; modeldeki ForeignKey sadece ORM
+ilişkisi içindir.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from database import ApiCallLog, NfcReadingHistory, engine
+
+PARTITIONED_LOG_MODELS = (ApiCallLog, NfcReadingHistory)
+
+# Bakım her çalıştığında en az bu kadar ileri ayın bölümü hazır olur
+LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("LOG_PARTITION_MONTHS_AHEAD", "3"))
+
+# Bölüm atılamayan satırlar için parti başına silinen satır
+LOG_DELETE_CHUNK_SIZE = int(os.getenv("LOG_DELETE_CHUNK_SIZE", "5000"))
+
+MAXVALUE_PARTITION = "pmax"
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"p{start:%Y%m}"
+
+
+def partition_definitions(first_month: datetime, end: datetime) -> List[str]:
+    """first_month'tan end'e kadar (hariç) her ay için bölüm tanımı"""
+    definitions = []
+    current = month_start(first_month)
+    while current < end:
+        upper = add_months(current, 1)
+        definitions.append(f"PARTITION {partition_name(current)} VALUES LESS THAN ('{upper:%Y-%m-%d %H:%M:%S}')")
+        current = upper
+    return definitions
+
+
+def partition_target(now: datetime, months_ahead: int = LOG_PARTITION_MONTHS_AHEAD) -> datetime:
+    """Bölümlerin kapsaması gereken üst sınır: bu ay + months_ahead ay"""
+    return add_months(month_start(now), months_ahead + 1)
+
+
+def list_partitions(conn: Connection, table: str) -> List[Tuple[str, Optional[datetime]]]:
+    """(bölüm adı, üst sınır) listesi; pmax için üst sınır None. Bölümlenmemişse boş."""
+    if conn.dialect.name != "mysql":
+        return []
+    rows = conn.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": table}).fetchall()
+    partitions = []
+    for name, description in rows:
+        bound = None if description == "MAXVALUE" else datetime.fromisoformat(description.strip("'"))
+        partitions.append((name, bound))
+    return partitions
+
+
+def ensure_future_partitions(conn: Connection, table: str, now: datetime,
+                             months_ahead: int = LOG_PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Eksik gelecek ay bölümlerini aç, açılan bölüm adlarını döndür"""
+    partitions = list_partitions(conn, table)
+    if not partitions:
+        return []
+
+    bounds = [bound for _, bound in partitions if bound is not None]
+    first_missing = max(bounds) if bounds else month_start(now)
+    definitions = partition_definitions(first_missing, partition_target(now, months_ahead))
+    if not definitions:
+        return []
+
+    if any(name == MAXVALUE_PARTITION for name, _ in partitions):
+        conn.execute(text(
+            f"ALTER TABLE {table} REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO "
+            f"({', '.join(definitions)}, PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+        ))
+    else:
+        conn.execute(text(f"ALTER TABLE {table} ADD PARTITION ({', '.join(definitions)})"))
+    return [definition.split()[1] for definition in definitions]
+
+
+def drop_expired_partitions(conn: Connection, table: str, cutoff: datetime) -> Tuple[List[str], int]:
+    """
+    Tüm satırları cutoff'tan eski olan bölümleri at.
+    Dönen satır sayısı information_schema tahminidir (bölüm sayılmadan atılır).
+    """
+    expired = [name for name, bound in list_partitions(conn, table) if bound is not None and bound <= cutoff]
+    if not expired:
+        return [], 0
+
+    estimated_rows = conn.execute(text(
+        "SELECT COALESCE(SUM(TABLE_ROWS), 0) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IN :names"
+    ).bindparams(bindparam("names", expanding=True)), {"table": table, "names": expired}).scalar()
+    conn.execute(text(f"ALTER TABLE {table} DROP PARTITION {', '.join(expired)}"))
+    return expired, int(estimated_rows or 0)
+
+
+def delete_in_chunks(bind: Engine, model, cutoff: datetime, chunk_size: int = LOG_DELETE_CHUNK_SIZE) -> int:
+    """cutoff'tan eski satırları kısa transaction'larla sil"""
+    table = model.__table__
+    deleted = 0
+    while True:
+        with bind.begin() as conn:
+            ids = [row[0] for row in conn.execute(
+                select(table.c.id).where(table.c.created_at < cutoff).limit(chunk_size)
+            )]
+            if ids:
+                # created_at koşulu bölümlü tablolarda sadece ilgili bölüme bakılmasını sağlar
+                conn.execute(table.delete().where(table.c.id.in_(ids), table.c.created_at < cutoff))
+        deleted += len(ids)
+        if len(ids) < chunk_size:
+            return deleted
+
+
+def maintain_log_partitions(now: Optional[datetime] = None, months_ahead: int = LOG_PARTITION_MONTHS_AHEAD,
+                            bind: Optional[Engine] = None) -> Dict[str, List[str]]:
+    """Bölümlü log tablolarında gelecek ayların bölümlerini önceden aç"""
+    bind = bind or engine
+    now = now or datetime.utcnow()
+    created: Dict[str, List[str]] = {}
+    if bind.dialect.name != "mysql":
+        return created
+
+    for model in PARTITIONED_LOG_MODELS:
+        table = model.__tablename__
+        with bind.begin() as conn:
+            created[table] = ensure_future_partitions(conn, table, now, months_ahead)
+        if created[table]:
+            print(f"🗓️ {table}: {len(created[table])} yeni bölüm açıldı ({', '.join(created[table])})")
+    return created
+
+
+def purge_expired_logs(retention_days: int, now: Optional[datetime] = None,
+                       bind: Optional[Engine] = None) -> Dict[str, int]:
+    """Tablo başına silinen (bölüm atmada tahmini) satır sayısı"""
+    bind = bind or engine
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    purged: Dict[str, int] = {}
+
+    for model in PARTITIONED_LOG_MODELS:
+        table = model.__tablename__
+        dropped_rows = 0
+        if bind.dialect.name == "mysql":
+            with bind.begin() as conn:
+                dropped, dropped_rows = drop_expired_partitions(conn, table, cutoff)
+            if dropped:
+                print(f"🗑️ {table}: {len(dropped)} bölüm atıldı ({', '.join(dropped)}) - ~{dropped_rows} satır")
+        purged[table] = dropped_rows + delete_in_chunks(bind, model, cutoff)
+    return purged
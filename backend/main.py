@@ -1,23 +1,26 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import uvicorn
 import json
+import base64
 from datetime import datetime, timedelta
-import random
 import os
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor
 import ssl
 import time
 import asyncio
+import io
+import tempfile
 
 # Import database components
 from database import (
-    get_db, init_db, 
+    get_db, init_db, SessionLocal, engine,
     Member as DBMember, 
     User as DBUser, 
     Business as DBBusiness, 
@@ -35,10 +38,81 @@ from database import (
 from crypto_utils import (
     generate_secure_member_qr, 
     verify_member_qr, 
-    get_public_key_pem
+    get_public_key_pem,
+    get_public_keys
 )
 from crypto_utils import secure_qr
 
+# Import bulk credential issuance
+from credential_issuer import (
+    issue_credentials_bulk,
+    load_members_for_issue,
+    MAX_BULK_ISSUE_SIZE
+)
+from nfc_codec import (
+    decode_nfc_v1,
+    decode_nfc_v2,
+    is_nfc_v2,
+    nfc_v1_byte_budgets,
+    nfc_v2_byte_budgets,
+    NFC_V2_VERSION,
+    NFC_V2_LENGTH,
+    NFC_TAG_CAPACITIES
+)
+from ndef_encoder import DEFAULT_TAG_TYPE, pre_encode_batch
+from member_events import record_member_change, EVENT_CREATED, EVENT_UPDATED, EVENT_DELETED
+from revocation import revocation_registry, refresh_revocations, revocation_refresh_loop
+from member_snapshot import stream_member_snapshot
+from member_export import CSV_DELIMITERS, EXPORT_FORMATS, stream_members_csv, stream_members_ndjson
+from id_allocator import id_allocator
+from member_import import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    MAX_IMPORT_BYTES,
+    import_members,
+    schedule_credential_issuance
+)
+from member_search import (
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    member_search_index,
+    member_search_refresh_loop,
+    refresh_member_search
+)
+from metrics import metrics
+from blob_store import blob_store, blob_url, etag_matches, is_valid_digest, parse_range
+from photo_derivatives import (
+    DEFAULT_PHOTO_FORMAT,
+    derivative_media_type,
+    get_derivative_path,
+    schedule_eager_derivatives,
+    submit_derivative,
+    validate_derivative_params
+)
+from photo_upload import PhotoUploadError, receive_photo_upload
+from member_listing import DEFAULT_MEMBER_PAGE_SIZE, MAX_MEMBER_PAGE_SIZE, parse_fields, parse_sort, list_members
+from qr_verification_cache import (
+    qr_verification_cache,
+    verify_member_qr_cached,
+    verify_member_qr_batch
+)
+from credential_store import (
+    get_or_issue_credentials,
+    get_fresh_credentials,
+    store_issued_credentials,
+    delete_member_credentials
+)
+from qr_render import (
+    RENDER_FORMATS,
+    ERROR_CORRECTION_LEVELS,
+    MIN_RENDER_SIZE,
+    MAX_RENDER_SIZE,
+    render_etag,
+    get_or_render_qr_image,
+    qr_render_cache
+)
+from card_export import EXPORT_LAYOUTS, iter_card_jobs, stream_card_archive
+
 # Import NFC service
 
 # Load environment variables
@@ -206,7 +280,7 @@ def save_api_log_sync(endpoint: str, method: str, status_code: int,
     """API log'unu database'e kaydet (senkron)"""
     db = None
     try:
-        db = next(get_db())
+        db = SessionLocal()
 
         # Request/response payload'ları çok uzunsa kısalt
         if request_payload and len(request_payload) > 10000:
@@ -256,6 +330,11 @@ async def startup_event():
         init_db()
         startup_time = (time.time() - startup_start) * 1000
         print(f"✅ DATABASE INITIALIZATION TAMAMLANDI - {startup_time:.2f}ms")
+        
+        # Offline iptal listesi - ilk yükleme arka plan döngüsünde yapılır
+        asyncio.create_task(revocation_refresh_loop())
+        # Üye arama indeksi - ilk kurulum arka plan döngüsünde yapılır
+        asyncio.create_task(member_search_refresh_loop())
         print(f"🚀 Server hazır - Backend authentication endpoint: /api/auth/login")
     except Exception as e:
         startup_time = (time.time() - startup_start) * 1000
@@ -266,54 +345,57 @@ async def startup_event():
 async def read_root():
     return {"message": "QR Virtual Card API'sine hoş geldiniz!"}
 
-@app.get("/health")
-async def health_check():
-    start_time = time.time()
-    health_id = f"health_{int(time.time() * 1000)}"
-    
-    print(f"❤️ [{health_id}] Health check başlıyor...")
-    
-    health_data = {
-        "status": "healthy", 
-        "message": "API çalışıyor",
-        "timestamp": datetime.utcnow().isoformat(),
-        "checks": {}
-    }
-    
-    # Database connectivity test
+# Health check DB sonucu bu kadar saniye önbellekte tutulur - sık yoklamalar veritabanına gitmez
+HEALTH_DB_CHECK_SECONDS = float(os.getenv("HEALTH_DB_CHECK_SECONDS", "10"))
+_health_db_check: Dict[str, Any] = {"checked_at": 0.0, "result": None}
+
+def _check_database_health() -> Dict[str, Any]:
+    db_start = time.perf_counter()
     try:
-        db_start = time.time()
-        db = next(get_db())
-        
-        # Simple query to test database
-        from sqlalchemy import text
-        test_query = db.execute(text("SELECT 1 as test")).fetchone()
-        db.close()
-        
-        db_time = (time.time() - db_start) * 1000
-        health_data["checks"]["database"] = {
+        with engine.connect() as connection:
+            test_result = connection.execute(text("SELECT 1 as test")).scalar()
+        return {
             "status": "ok",
-            "response_time_ms": round(db_time, 2),
-            "test_result": test_query[0] if test_query else None
+            "response_time_ms": round((time.perf_counter() - db_start) * 1000, 2),
+            "test_result": test_result
         }
-        print(f"❤️ [{health_id}] Database check: ✅ OK ({db_time:.2f}ms)")
-        
     except Exception as e:
-        db_time = (time.time() - db_start if 'db_start' in locals() else start_time) * 1000
-        health_data["checks"]["database"] = {
+        print(f"❤️ Health check database hatası: {str(e)}")
+        return {
             "status": "error",
-            "response_time_ms": round(db_time, 2),
+            "response_time_ms": round((time.perf_counter() - db_start) * 1000, 2),
             "error": str(e)
         }
-        health_data["status"] = "degraded"
-        print(f"❤️ [{health_id}] Database check: ❌ ERROR ({db_time:.2f}ms) - {str(e)}")
-    
-    total_time = (time.time() - start_time) * 1000
-    health_data["total_response_time_ms"] = round(total_time, 2)
+
+@app.get("/health")
+async def health_check():
+    start_time = time.perf_counter()
     
-    print(f"❤️ [{health_id}] Health check tamamlandı: {total_time:.2f}ms - Status: {health_data['status']}")
+    now = time.monotonic()
+    cached = _health_db_check["result"] is not None and now - _health_db_check["checked_at"] < HEALTH_DB_CHECK_SECONDS
+    if not cached:
+        loop = asyncio.get_event_loop()
+        _health_db_check["result"] = await loop.run_in_executor(None, _check_database_health)
+        _health_db_check["checked_at"] = now
+    metrics.increment("health.cached" if cached else "health.db_checks")
     
-    return health_data
+    database_check = {**_health_db_check["result"], "cached": cached}
+    return {
+        "status": "healthy" if database_check["status"] == "ok" else "degraded",
+        "message": "API çalışıyor",
+        "timestamp": datetime.utcnow().isoformat(),
+        "checks": {"database": database_check},
+        "total_response_time_ms": round((time.perf_counter() - start_time) * 1000, 2)
+    }
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Session, sorgu ve health check metrikleri + bağlantı havuzu durumu"""
+    return {
+        **metrics.snapshot(),
+        "pool": engine.pool.status(),
+        "success": True
+    }
 
 # Pydantic Models
 class MemberCreate(BaseModel):
@@ -563,8 +645,7 @@ async def debug_timing_test():
     # Test 2: Database query
     try:
         db_start = time.time()
-        db = next(get_db())
-        from sqlalchemy import text
+        db = SessionLocal()
         count_query = db.execute(text("SELECT COUNT(*) as count FROM users")).fetchone()
         db.close()
         db_time = (time.time() - db_start) * 1000
@@ -679,7 +760,7 @@ async def login(credentials: UserLogin, request: Request, db: Session = Depends(
             role=user.role,
             is_active=user.is_active,
             created_at=user.created_at,
-            image=user.image
+            image=blob_store.get_base64(user.image_hash)
         )
         
         login_response = LoginResponse(
@@ -733,7 +814,7 @@ async def get_current_user(user_id: int, db: Session = Depends(get_db)):
             role=user.role,
             is_active=user.is_active,
             created_at=user.created_at,
-            image=user.image
+            image=blob_store.get_base64(user.image_hash)
         )
         
         return {
@@ -784,17 +865,9 @@ async def update_profile(update_data: UpdateProfileRequest, db: Session = Depend
         
         # Profil resmi güncelleme
         if update_data.profilePhoto:
-            profile_photo = update_data.profilePhoto
-            # Data URL prefix varsa kaldır
-            if profile_photo.startswith('data:image'):
-                profile_photo = profile_photo.split(',')[1] if ',' in profile_photo else profile_photo
-            
-            # Base64 validation
             try:
-                import base64
-                base64.b64decode(profile_photo)
-                user.image = profile_photo
-            except Exception:
+                user.image_hash = blob_store.put_base64(update_data.profilePhoto)
+            except ValueError:
                 raise HTTPException(status_code=400, detail="Geçersiz resim formatı")
         
         user.updated_at = datetime.utcnow()
@@ -820,6 +893,25 @@ async def update_profile(update_data: UpdateProfileRequest, db: Session = Depend
         print(f"Update profile error: {e}")
         raise HTTPException(status_code=500, detail="Profil güncellenirken hata oluştu")
 
+@app.put("/api/auth/profile-photo")
+async def stream_admin_profile_photo(request: Request, db: Session = Depends(get_db)):
+    """Admin profil resmini ham görsel veya multipart gövdeyle yükle (bkz. stream_profile_photo)"""
+    admin_email = "admin@anef.org.tr"
+    photo_hash = await _receive_photo(request)
+    
+    user = db.query(DBUser).filter(DBUser.email == admin_email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Admin kullanıcı bulunamadı")
+    user.image_hash = photo_hash
+    user.updated_at = datetime.utcnow()
+    db.commit()
+    
+    return {
+        "message": "Profil resmi başarıyla güncellendi",
+        "imageUrl": blob_url(photo_hash),
+        "success": True
+    }
+
 # Business Management Endpoints
 
 @app.get("/api/businesses/test")
@@ -1074,26 +1166,6 @@ async def get_business_events(business_id: Optional[int] = None, db: Session = D
         print(f"Get business events error: {e}")
         raise HTTPException(status_code=500, detail="Eventler alınırken hata oluştu")
 
-def generate_membership_id(db: Session):
-    """Otomatik membership ID oluştur"""
-    year = datetime.now().year
-    # Get count from database
-    member_count = db.query(DBMember).count() + 1
-    return f"CC-{year}-{str(member_count).zfill(6)}"
-
-def generate_card_number():
-    """Otomatik 16 haneli kart numarası oluştur"""
-    return ''.join([str(random.randint(0, 9)) for _ in range(16)])
-
-def ensure_unique_membership_id(db: Session, membership_id: str) -> str:
-    """Ensure membership ID is unique"""
-    original_id = membership_id
-    counter = 1
-    while db.query(DBMember).filter(DBMember.membership_id == membership_id).first():
-        membership_id = f"{original_id[:-3]}{str(counter).zfill(3)}"
-        counter += 1
-    return membership_id
-
 @app.post("/api/members", response_model=MemberResponse)
 async def create_member(member: MemberCreate, db: Session = Depends(get_db)):
     """Yeni üye kaydı oluştur"""
@@ -1102,28 +1174,16 @@ async def create_member(member: MemberCreate, db: Session = Depends(get_db)):
         if db.query(DBMember).filter(DBMember.email == member.email).first():
             raise HTTPException(status_code=400, detail="Email already exists")
         
-        # Auto-generate membership ID and card number
-        membership_id = generate_membership_id(db)
-        membership_id = ensure_unique_membership_id(db, membership_id)
-        card_number = generate_card_number()
+        # Membership ID ve kart numarası sayaçtan - worker'lar arası çakışmasız, deneme sorgusu yok
+        membership_id = id_allocator.allocate_membership_id()
+        card_number = id_allocator.allocate_card_number()
         
-        # Ensure unique card number
-        while db.query(DBMember).filter(DBMember.card_number == card_number).first():
-            card_number = generate_card_number()
-        
-        # Process profile photo if provided
-        profile_photo = None
+        # Process profile photo if provided - blob deposuna yazılır, satırda sadece özet tutulur
+        photo_hash = None
         if member.profilePhoto:
-            profile_photo = member.profilePhoto
-            # Data URL prefix varsa kaldır
-            if profile_photo.startswith('data:image'):
-                profile_photo = profile_photo.split(',')[1] if ',' in profile_photo else profile_photo
-            
-            # Base64 validation
             try:
-                import base64
-                base64.b64decode(profile_photo)
-            except Exception:
+                photo_hash = blob_store.put_base64(member.profilePhoto)
+            except ValueError:
                 raise HTTPException(status_code=400, detail="Geçersiz resim formatı")
         
         # Create new member
@@ -1139,12 +1199,17 @@ async def create_member(member: MemberCreate, db: Session = Depends(get_db)):
             membership_type=member.membershipType,
             role=member.role,
             status=member.status,
-            profile_photo=profile_photo
+            photo_hash=photo_hash
         )
         
         db.add(db_member)
+        db.flush()
+        record_member_change(db, db_member, EVENT_CREATED)
         db.commit()
         db.refresh(db_member)
+        schedule_eager_derivatives(photo_hash)
+        # İndeks yenileme DB okur ve ilk kurulum sırasında kilit bekler - event loop'u bloklamasın
+        await asyncio.get_event_loop().run_in_executor(None, refresh_member_search)
         
         # Convert to response format
         response_data = {
@@ -1164,12 +1229,12 @@ async def create_member(member: MemberCreate, db: Session = Depends(get_db)):
             "updatedAt": db_member.updated_at
         }
         
-        # Güvenli QR kod oluştur (standart) ve NFC kompakt veri üret
+        # Güvenli QR kod (standart) ve NFC kompakt veri üret - issued_credentials tablosuna kaydedilir
         try:
-            secure_qr_data = generate_secure_member_qr(response_data)
-            response_data["secureQrCode"] = secure_qr_data
+            credential = get_or_issue_credentials(db, db_member)
+            response_data["secureQrCode"] = credential.secure_qr_code
             # NFC kompakt (NTAG215 uyumlu) payload
-            response_data["nfcQrCode"] = secure_qr.create_compact_nfc_payload(response_data)
+            response_data["nfcQrCode"] = credential.nfc_payload
         except Exception as e:
             print(f"QR kod oluşturma hatası: {e}")
             response_data["secureQrCode"] = None
@@ -1184,44 +1249,47 @@ async def create_member(member: MemberCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Üye kaydı sırasında hata oluştu: {str(e)}")
 
 @app.get("/api/members")
-async def get_all_members(db: Session = Depends(get_db)):
-    """Tüm üyeleri listele"""
+async def get_all_members(
+    limit: int = DEFAULT_MEMBER_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    membershipType: Optional[str] = None,
+    role: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Üyeleri sayfalı listele (keyset pagination).
+    - limit: sayfa boyutu (en fazla MAX_MEMBER_PAGE_SIZE)
+    - cursor: önceki yanıttaki nextCursor
+    - sort: id, fullName, membershipId, createdAt, updatedAt (azalan için '-' öneki)
+    - fields: virgülle ayrılmış alanlar; profilePhotoUrl varsayılan olarak dönmez
+    - status / membershipType / role: eşitlik filtreleri
+    """
+    if limit < 1 or limit > MAX_MEMBER_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit 1 ile {MAX_MEMBER_PAGE_SIZE} arasında olmalı")
     try:
-        members = db.query(DBMember).all()
-        member_list = []
-        
-        for member in members:
-            member_data = {
-                "id": member.id,
-                "fullName": member.full_name,
-                "membershipId": member.membership_id,
-                "cardNumber": member.card_number,
-                "phoneNumber": member.phone_number,
-                "email": member.email,
-                "address": member.address,
-                "dateOfBirth": member.date_of_birth,
-                "emergencyContact": member.emergency_contact,
-                "membershipType": member.membership_type,
-                "role": member.role,
-                "status": member.status,
-                "profilePhoto": member.profile_photo,  # Profil fotoğrafını ekle
-                "createdAt": member.created_at,
-                "updatedAt": member.updated_at,
-                "secureQrCode": None,
-                "nfcQrCode": None
-            }
-            member_list.append(member_data)
-        
-        return {
-            "members": member_list,
-            "count": len(member_list),
-            "success": True
-        }
+        selected_fields = parse_fields(fields)
+        sort_field, descending = parse_sort(sort)
+        page = list_members(
+            db,
+            selected_fields,
+            sort_field=sort_field,
+            descending=descending,
+            limit=limit,
+            cursor=cursor,
+            filters={"status": status, "membershipType": membershipType, "role": role}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         import traceback
         print(f"Error in /api/members: {e}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Internal server error while fetching members.")
+    
+    return {**page, "success": True}
 
 # Model for member list dropdown
 class MemberInfo(BaseModel):
@@ -1240,6 +1308,302 @@ async def get_members_list(db: Session = Depends(get_db)):
         print(f"Database error in get_members_list: {e}")
         raise HTTPException(status_code=500, detail="Database connection error")
 
+# Bulk credential issuance
+class BulkCredentialRequest(BaseModel):
+    memberIds: List[int]
+    stream: bool = False  # True ise NDJSON olarak akış halinde döndür
+
+@app.post("/api/members/credentials/bulk")
+async def bulk_issue_credentials(request: BulkCredentialRequest, db: Session = Depends(get_db)):
+    """
+    Birden fazla üye için imzalı QR ve NFC payload'larını toplu üret
+    İmzalama event loop dışında, paylaşılan thread havuzunda paralel yapılır
+    """
+    member_ids = list(dict.fromkeys(request.memberIds))  # Sırayı koruyarak tekrarları kaldır
+    if not member_ids:
+        raise HTTPException(status_code=400, detail="En az bir üye ID'si gerekli")
+    if len(member_ids) > MAX_BULK_ISSUE_SIZE:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {MAX_BULK_ISSUE_SIZE} üye işlenebilir")
+    
+    start_time = time.time()
+    issued_at = datetime.utcnow()
+    members = load_members_for_issue(db, member_ids)
+    missing = [member_id for member_id in member_ids if member_id not in members]
+    ordered = [members[member_id] for member_id in member_ids if member_id in members]
+    member_updated_at = {member_id: data["updatedAt"] for member_id, data in members.items()}
+    
+    loop = asyncio.get_event_loop()
+    
+    if request.stream:
+        async def generate():
+            chunk_size = 256
+            store_db = SessionLocal()
+            try:
+                for start in range(0, len(ordered), chunk_size):
+                    chunk = ordered[start:start + chunk_size]
+                    results = await loop.run_in_executor(
+                        None, lambda c=chunk: list(issue_credentials_bulk(c, chunk_size=chunk_size))
+                    )
+                    await loop.run_in_executor(
+                        None, store_issued_credentials, store_db, results, member_updated_at, issued_at
+                    )
+                    for result in results:
+                        yield json.dumps(result, separators=(',', ':'), default=str) + "\n"
+            finally:
+                store_db.close()
+            for member_id in missing:
+                yield json.dumps({"memberId": member_id, "success": False, "error": "Üye bulunamadı"}) + "\n"
+        
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+    
+    credentials = await loop.run_in_executor(None, lambda: list(issue_credentials_bulk(ordered)))
+    await loop.run_in_executor(None, store_issued_credentials, db, credentials, member_updated_at, issued_at)
+    elapsed_ms = (time.time() - start_time) * 1000
+    print(f"🔏 [BULK ISSUE] {len(credentials)} üye imzalandı - {elapsed_ms:.2f}ms")
+    
+    return {
+        "credentials": credentials,
+        "missing": missing,
+        "count": len(credentials),
+        "elapsed_ms": round(elapsed_ms, 2),
+        "success": True
+    }
+
+# Content-Type -> içe aktarma formatı
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/x-jsonlines": "jsonl",
+}
+
+@app.post("/api/members/import")
+async def import_members_endpoint(
+    request: Request,
+    format: Optional[str] = None,
+    dryRun: bool = False,
+    issueCredentials: bool = False,
+    chunkSize: int = IMPORT_CHUNK_SIZE
+):
+    """
+    CSV veya JSONL gövdeden toplu üye içe aktarma.
+    - format: csv | jsonl (verilmezse Content-Type'tan: text/csv, application/x-ndjson)
+    - dryRun: sadece doğrula, kaydetme
+    - issueCredentials: içe aktarılan üyeler için QR/NFC'yi arka planda üret
+      (verilmezse ilk okumada üretilir)
+    Hatalı satırlar atlanır ve errors listesinde satır numarasıyla döner.
+    """
+    import_format = format or IMPORT_CONTENT_TYPES.get(request.headers.get("content-type", "").split(";")[0].strip())
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format {', '.join(IMPORT_FORMATS)} olmalı")
+    if chunkSize < 1 or chunkSize > 10000:
+        raise HTTPException(status_code=400, detail="chunkSize 1 ile 10000 arasında olmalı")
+
+    start_time = time.time()
+    # Gövde diske akıtılır (1 MB'a kadar bellekte) - satırlar import sırasında dosyadan okunur
+    body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_IMPORT_BYTES:
+                raise HTTPException(status_code=413, detail=f"Dosya en fazla {MAX_IMPORT_BYTES // (1024 * 1024)} MB olabilir")
+            body.write(chunk)
+        body.seek(0)
+
+        def run_import():
+            import_db = SessionLocal()
+            stream = io.TextIOWrapper(body, encoding="utf-8-sig", errors="replace", newline="")
+            try:
+                return import_members(import_db, stream, import_format, chunk_size=chunkSize, dry_run=dryRun)
+            finally:
+                stream.detach()
+                import_db.close()
+
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, run_import)
+    finally:
+        body.close()
+
+    if result.imported_ids:
+        # Büyük içe aktarma indeksi baştan kurdurur - event loop dışında
+        await loop.run_in_executor(None, refresh_member_search)
+        if result.non_active_imported:
+            await loop.run_in_executor(None, refresh_revocations)
+        if issueCredentials:
+            schedule_credential_issuance(result.imported_ids)
+
+    elapsed_ms = (time.time() - start_time) * 1000
+    print(f"📥 [IMPORT] {result.imported}/{result.total} üye içe aktarıldı, {result.failed} hata - {elapsed_ms:.2f}ms")
+    return {
+        **result.report(),
+        "credentialsScheduled": bool(issueCredentials and result.imported_ids),
+        "elapsed_ms": round(elapsed_ms, 2),
+        "success": True
+    }
+
+@app.get("/api/members/export/cards")
+async def export_member_cards(layout: str = "cards", status: Optional[str] = None, ids: Optional[str] = None):
+    """
+    Baskıya hazır kart arşivi (ZIP) - layout=cards her üye için ayrı PNG,
+    layout=sheet A4 çoklu kart sayfaları. Arşiv üretildikçe akış halinde gönderilir.
+    """
+    if layout not in EXPORT_LAYOUTS:
+        raise HTTPException(status_code=400, detail="Geçersiz layout (cards veya sheet)")
+    try:
+        member_ids = [int(value) for value in ids.split(",") if value.strip()] if ids else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids virgülle ayrılmış üye ID listesi olmalı")
+    
+    def archive_stream():
+        # Akış yanıt gönderildikçe sürdüğü için kendi session'ını kullanır
+        export_db = SessionLocal()
+        try:
+            jobs = iter_card_jobs(export_db, member_ids, status)
+            yield from stream_card_archive(jobs, layout=layout)
+        finally:
+            export_db.close()
+    
+    filename = f"member-cards-{layout}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
+    print(f"🖨️ [CARD EXPORT] {layout} arşivi başlatıldı")
+    return StreamingResponse(
+        archive_stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/api/members/export")
+async def export_members(
+    format: str = "csv",
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    membershipType: Optional[str] = None,
+    role: Optional[str] = None,
+    createdFrom: Optional[str] = None,
+    createdTo: Optional[str] = None,
+    delimiter: str = ","
+):
+    """
+    Üye listesini CSV veya NDJSON olarak akış halinde indir.
+    - fields: virgülle ayrılmış alanlar (GET /api/members ile aynı, varsayılan fotoğrafsız tüm alanlar)
+    - status / membershipType / role: eşitlik filtreleri
+    - createdFrom / createdTo: kayıt tarihi aralığı (createdTo hariç)
+    - delimiter: CSV ayracı (',' veya ';')
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format {', '.join(EXPORT_FORMATS)} olmalı")
+    if delimiter not in CSV_DELIMITERS:
+        raise HTTPException(status_code=400, detail="delimiter ',' veya ';' olmalı")
+    try:
+        selected_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        created_from = datetime.fromisoformat(createdFrom) if createdFrom else None
+        created_to = datetime.fromisoformat(createdTo) if createdTo else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="createdFrom / createdTo YYYY-MM-DD formatında olmalı")
+    filters = {"status": status, "membershipType": membershipType, "role": role}
+
+    def export_stream():
+        # Akış yanıt gönderildikçe sürdüğü için kendi session'ını kullanır
+        export_db = SessionLocal()
+        try:
+            if format == "csv":
+                yield from stream_members_csv(export_db, selected_fields, filters, created_from, created_to, delimiter)
+            else:
+                yield from stream_members_ndjson(export_db, selected_fields, filters, created_from, created_to)
+        finally:
+            export_db.close()
+
+    filename = f"members-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{format}"
+    print(f"📤 [EXPORT] Üye dışa aktarma başlatıldı ({format}, {len(selected_fields)} alan)")
+    return StreamingResponse(
+        export_stream(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/api/members/snapshot")
+async def get_member_snapshot(since: Optional[int] = None):
+    """
+    Okuyucular için imzalı offline üye snapshot'ı (NDJSON akışı).
+    since verilirse o versiyondan bu yana değişen üyeler (delta) döner;
+    delta verilemiyorsa tam snapshot gönderilir (header'daki kind alanı).
+    """
+    if since is not None and since < 0:
+        raise HTTPException(status_code=400, detail="since negatif olamaz")
+
+    def snapshot_stream():
+        # Akış yanıt gönderildikçe sürdüğü için kendi session'ını kullanır
+        snapshot_db = SessionLocal()
+        try:
+            yield from stream_member_snapshot(snapshot_db, since)
+        finally:
+            snapshot_db.close()
+
+    print(f"📦 [SNAPSHOT] Üye snapshot'ı başlatıldı (since={since})")
+    return StreamingResponse(snapshot_stream(), media_type="application/x-ndjson")
+
+def _search_result(member_id: int, membership_id: str, name: str, status: Optional[str], match: Optional[str] = None) -> Dict[str, Any]:
+    # MAUI MemberSearchResponse.MemberDto alan adları (member_id string)
+    return {
+        "member_id": str(member_id),
+        "membership_id": membership_id,
+        "name": name,
+        "status": status,
+        "match": match
+    }
+
+@app.get("/api/members/search")
+async def search_members(q: Optional[str] = None, limit: int = DEFAULT_SEARCH_LIMIT, db: Session = Depends(get_db)):
+    """
+    Typeahead üye araması (ad soyad, membership ID, kart no, email, telefon).
+    Önek ve bulanık eşleşme bellek içi indeksten yapılır; q boşsa üyeler ada göre listelenir.
+    """
+    if limit < 1 or limit > MAX_SEARCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit 1 ile {MAX_SEARCH_LIMIT} arasında olmalı")
+
+    query = (q or "").strip()
+    if not query:
+        page = list_members(db, ["id", "fullName", "membershipId", "status"], sort_field="fullName", limit=limit)
+        members = [
+            _search_result(m["id"], m["membershipId"], m["fullName"], m["status"])
+            for m in page["members"]
+        ]
+        return {"success": True, "members": members, "count": len(members), "error": None}
+
+    if not member_search_index.loaded:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, refresh_member_search)
+        if not member_search_index.loaded:
+            raise HTTPException(status_code=503, detail="Üye arama indeksi henüz hazır değil")
+
+    start_time = time.perf_counter()
+    results = member_search_index.search(query, limit)
+    metrics.observe("search.ms", (time.perf_counter() - start_time) * 1000)
+
+    members = [
+        _search_result(document.member_id, document.membership_id, document.name, document.status, match)
+        for document, match in results
+    ]
+    return {
+        "success": True,
+        "members": members,
+        "count": len(members),
+        "indexVersion": member_search_index.version,
+        "error": None
+    }
+
+@app.get("/api/members/search/stats")
+async def get_member_search_stats():
+    """Bellekteki arama indeksinin durumu"""
+    return {
+        "search": member_search_index.stats(),
+        "success": True
+    }
+
 @app.get("/api/members/{member_id}")
 async def get_member(member_id: int, db: Session = Depends(get_db)):
     """Belirli bir üyeyi getir"""
@@ -1260,17 +1624,18 @@ async def get_member(member_id: int, db: Session = Depends(get_db)):
         "membershipType": member.membership_type,
         "role": member.role,
         "status": member.status,
-        "profilePhoto": member.profile_photo,  # Profil fotoğrafını ekle
+        "profilePhoto": blob_store.get_base64(member.photo_hash),  # Profil fotoğrafını ekle
+        "profilePhotoUrl": blob_url(member.photo_hash),
         "createdAt": member.created_at,
         "updatedAt": member.updated_at
     }
     
-    # Güvenli QR kod oluştur (hem standart hem NFC)
+    # Saklanan kimlik bilgisini kullan - sadece üye değiştiyse veya süresi dolmak üzereyse yeniden imzala
     try:
-        secure_qr_data = generate_secure_member_qr(member_data)
-        member_data["secureQrCode"] = secure_qr_data
-        member_data["nfcQrCode"] = secure_qr.create_compact_nfc_payload(member_data)
-        print(f"✅ Standart QR kod oluşturuldu - Member ID: {member.id}, Data length: {len(secure_qr_data)}")
+        credential = get_or_issue_credentials(db, member)
+        member_data["secureQrCode"] = credential.secure_qr_code
+        member_data["nfcQrCode"] = credential.nfc_payload
+        member_data["credentialVersion"] = credential.version
     except Exception as e:
         print(f"❌ Standart QR kod oluşturma hatası: {e}")
         member_data["secureQrCode"] = None
@@ -1281,6 +1646,47 @@ async def get_member(member_id: int, db: Session = Depends(get_db)):
         "success": True
     }
 
+@app.get("/api/members/{member_id}/qr-image")
+async def get_member_qr_image(
+    member_id: int,
+    request: Request,
+    format: str = "png",
+    size: int = 512,
+    ec: str = "M",
+    db: Session = Depends(get_db)
+):
+    """Üyenin güvenli QR kodunu PNG/SVG olarak render et (ETag + render önbelleği)"""
+    image_format = format.lower()
+    error_correction = ec.upper()
+    if image_format not in RENDER_FORMATS:
+        raise HTTPException(status_code=400, detail="Desteklenmeyen format (png veya svg)")
+    if error_correction not in ERROR_CORRECTION_LEVELS:
+        raise HTTPException(status_code=400, detail="Geçersiz hata düzeltme seviyesi (L, M, Q veya H)")
+    if not MIN_RENDER_SIZE <= size <= MAX_RENDER_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Boyut {MIN_RENDER_SIZE}-{MAX_RENDER_SIZE} piksel arasında olmalı"
+        )
+
+    member = db.query(DBMember).filter(DBMember.id == member_id).first()
+    if not member:
+        raise HTTPException(status_code=404, detail="Üye bulunamadı")
+
+    credential = get_or_issue_credentials(db, member)
+    render_key = (credential.id, size, image_format, error_correction)
+    etag = render_etag(render_key)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+
+    # Credential değişmediyse istemci mevcut görseli kullanır - render yapılmaz
+    if etag_matches(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+
+    loop = asyncio.get_event_loop()
+    content = await loop.run_in_executor(
+        None, get_or_render_qr_image, render_key, credential.secure_qr_code
+    )
+    return Response(content=content, media_type=RENDER_FORMATS[image_format], headers=headers)
+
 @app.get("/api/members/membership/{membership_id}")
 async def get_member_by_membership_id(membership_id: str, db: Session = Depends(get_db)):
     """Üyelik ID'si ile üye bilgilerini getir"""
@@ -1301,7 +1707,8 @@ async def get_member_by_membership_id(membership_id: str, db: Session = Depends(
         "membershipType": member.membership_type,
         "role": member.role,
         "status": member.status,
-        "profilePhoto": member.profile_photo,  # Profil fotoğrafını ekle
+        "profilePhoto": blob_store.get_base64(member.photo_hash),  # Profil fotoğrafını ekle
+        "profilePhotoUrl": blob_url(member.photo_hash),
         "createdAt": member.created_at,
         "updatedAt": member.updated_at
     }
@@ -1318,8 +1725,15 @@ async def delete_member(member_id: int, db: Session = Depends(get_db)):
     if not member:
         raise HTTPException(status_code=404, detail="Üye bulunamadı")
     
+    delete_member_credentials(db, member_id)
+    record_member_change(db, member, EVENT_DELETED)
     db.delete(member)
     db.commit()
+    qr_verification_cache.invalidate_member(member_id)
+    # İptal seti ve arama indeksi DB'den yeniden okunur - event loop dışında
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, refresh_revocations)
+    await loop.run_in_executor(None, refresh_member_search)
     
     return {
         "message": "Üye başarıyla silindi",
@@ -1335,6 +1749,7 @@ async def update_member(member_id: int, member: MemberUpdate, db: Session = Depe
     
     # Update only provided fields (keep existing membershipId and cardNumber)
     update_data = member.dict(exclude_unset=True)
+    previous_status = db_member.status
     
     for field, value in update_data.items():
         if field == "fullName":
@@ -1361,24 +1776,28 @@ async def update_member(member_id: int, member: MemberUpdate, db: Session = Depe
         elif field == "status":
             db_member.status = value
         elif field == "profilePhoto":
-            # Process profile photo
-            profile_photo = value
-            # Data URL prefix varsa kaldır
-            if profile_photo and profile_photo.startswith('data:image'):
-                profile_photo = profile_photo.split(',')[1] if ',' in profile_photo else profile_photo
-            
-            # Base64 validation
-            if profile_photo:
+            # Process profile photo - blob deposuna yazılır
+            if value:
                 try:
-                    import base64
-                    base64.b64decode(profile_photo)
-                    db_member.profile_photo = profile_photo
-                except Exception:
+                    db_member.photo_hash = blob_store.put_base64(value)
+                except ValueError:
                     raise HTTPException(status_code=400, detail="Geçersiz resim formatı")
     
     db_member.updated_at = datetime.utcnow()
+    record_member_change(db, db_member, EVENT_UPDATED)
     db.commit()
     db.refresh(db_member)
+    if "profilePhoto" in update_data:
+        schedule_eager_derivatives(db_member.photo_hash)
+    
+    # Durum değiştiyse önbellekteki doğrulama sonuçları commit'ten sonra silinir
+    # (önce silinirse eşzamanlı bir doğrulama eski durumu yeniden önbelleğe yazabilir)
+    # ve iptal listesi hemen güncellenir (diğer worker'lar periyodik yeniler)
+    loop = asyncio.get_event_loop()
+    if db_member.status != previous_status:
+        qr_verification_cache.invalidate_member(db_member.id)
+        await loop.run_in_executor(None, refresh_revocations)
+    await loop.run_in_executor(None, refresh_member_search)
     
     # Convert to response format
     member_data = {
@@ -1394,6 +1813,7 @@ async def update_member(member_id: int, member: MemberUpdate, db: Session = Depe
         "membershipType": db_member.membership_type,
         "role": db_member.role,
         "status": db_member.status,
+        "profilePhotoUrl": blob_url(db_member.photo_hash),
         "createdAt": db_member.created_at,
         "updatedAt": db_member.updated_at
     }
@@ -1420,27 +1840,22 @@ async def upload_profile_photo(member_id: int, photo_data: ProfilePhotoUpload, d
         if not profile_photo:
             raise HTTPException(status_code=400, detail="Profil fotoğrafı verisi gerekli")
         
-        # Base64 başlığını kontrol et ve temizle
-        if profile_photo.startswith('data:image'):
-            # data:image/jpeg;base64, kısmını kaldır
-            profile_photo = profile_photo.split(',')[1] if ',' in profile_photo else profile_photo
-        
-        # Base64 geçerliliğini kontrol et
+        # Base64'ü çöz ve blob deposuna yaz (data:image/...;base64, öneki temizlenir)
         try:
-            import base64
-            base64.b64decode(profile_photo)
-        except Exception:
+            photo_hash = blob_store.put_base64(profile_photo)
+        except ValueError:
             raise HTTPException(status_code=400, detail="Geçersiz Base64 formatı")
         
-        # Profil fotoğrafını veritabanında güncelle
-        db_member.profile_photo = profile_photo
+        # Veritabanında sadece özet tutulur
+        db_member.photo_hash = photo_hash
         db_member.updated_at = datetime.utcnow()
         db.commit()
+        schedule_eager_derivatives(photo_hash)
         
         return ProfilePhotoResponse(
             success=True,
             message="Profil fotoğrafı başarıyla yüklendi",
-            profile_photo_url=f"/api/members/{member_id}/profile-photo"
+            profile_photo_url=blob_url(photo_hash)
         )
         
     except HTTPException:
@@ -1449,20 +1864,74 @@ async def upload_profile_photo(member_id: int, photo_data: ProfilePhotoUpload, d
         print(f"❌ Profile photo upload error: {e}")
         raise HTTPException(status_code=500, detail="Profil fotoğrafı yüklenirken hata oluştu")
 
+async def _receive_photo(request: Request) -> str:
+    """Gövdeyi akış halinde al, doğrula ve blob deposuna taşı - özeti döndürür"""
+    try:
+        staged = await receive_photo_upload(request)
+    except PhotoUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    print(f"🖼️ Fotoğraf alındı: {staged.size // 1024} KB, {staged.width}x{staged.height} {staged.content_type}")
+    return staged.store()
+
+@app.put("/api/members/{member_id}/profile-photo", response_model=ProfilePhotoResponse)
+async def stream_profile_photo(member_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Üye profil fotoğrafını ham görsel (Content-Type: image/jpeg|png|webp) veya
+    multipart/form-data ('file' alanı) olarak yükle. Gövde belleğe alınmadan
+    boyut sınırıyla geçici dosyaya yazılır (bkz. photo_upload).
+    """
+    if not db.query(DBMember.id).filter(DBMember.id == member_id).first():
+        raise HTTPException(status_code=404, detail="Üye bulunamadı")
+    db.close()  # Yavaş yüklemeler sırasında bağlantı havuzda kalsın
+    
+    photo_hash = await _receive_photo(request)
+    
+    db_member = db.query(DBMember).filter(DBMember.id == member_id).first()
+    if not db_member:
+        raise HTTPException(status_code=404, detail="Üye bulunamadı")
+    db_member.photo_hash = photo_hash
+    db_member.updated_at = datetime.utcnow()
+    db.commit()
+    schedule_eager_derivatives(photo_hash)
+    
+    return ProfilePhotoResponse(
+        success=True,
+        message="Profil fotoğrafı başarıyla yüklendi",
+        profile_photo_url=blob_url(photo_hash)
+    )
+
 @app.get("/api/members/{member_id}/profile-photo")
-async def get_profile_photo(member_id: int, db: Session = Depends(get_db)):
-    """Üye profil fotoğrafını al"""
+async def get_profile_photo(member_id: int, size: Optional[str] = None, db: Session = Depends(get_db)):
+    """Üye profil fotoğrafını al (size=64|256 verilirse küçük JPEG kopyası döner)"""
     try:
         # Üyenin varlığını kontrol et
         db_member = db.query(DBMember).filter(DBMember.id == member_id).first()
         if not db_member:
             raise HTTPException(status_code=404, detail="Üye bulunamadı")
         
-        # Profil fotoğrafı varsa döndür
-        if db_member.profile_photo:
+        # Profil fotoğrafı varsa döndür (size verilmişse orijinal okunmaz)
+        profile_photo = None
+        if size is None:
+            profile_photo = blob_store.get_base64(db_member.photo_hash)
+        elif db_member.photo_hash and blob_store.exists(db_member.photo_hash):
+            try:
+                validate_derivative_params(size, DEFAULT_PHOTO_FORMAT)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            try:
+                path = get_derivative_path(db_member.photo_hash, size, DEFAULT_PHOTO_FORMAT)
+                if path is None:
+                    path = await asyncio.wrap_future(submit_derivative(db_member.photo_hash, size, DEFAULT_PHOTO_FORMAT))
+                with open(path, "rb") as f:
+                    profile_photo = base64.b64encode(f.read()).decode("ascii")
+            except (OSError, ValueError) as e:
+                print(f"❌ Fotoğraf türevi üretilemedi ({db_member.photo_hash[:12]} {size}/{DEFAULT_PHOTO_FORMAT}): {e}")
+                raise HTTPException(status_code=422, detail="Fotoğraf işlenemedi")
+        if profile_photo:
             return {
                 "success": True,
-                "profile_photo": db_member.profile_photo,
+                "profile_photo": profile_photo,
+                "profile_photo_url": blob_url(db_member.photo_hash),
                 "has_photo": True
             }
         else:
@@ -1488,8 +1957,8 @@ async def delete_profile_photo(member_id: int, db: Session = Depends(get_db)):
         if not db_member:
             raise HTTPException(status_code=404, detail="Üye bulunamadı")
         
-        # Profil fotoğrafını sil
-        db_member.profile_photo = None
+        # Profil fotoğrafı referansını sil - blob, başka satır kullanmıyorsa günlük temizlikte silinir
+        db_member.photo_hash = None
         db_member.updated_at = datetime.utcnow()
         db.commit()
         
@@ -1504,6 +1973,99 @@ async def delete_profile_photo(member_id: int, db: Session = Depends(get_db)):
         print(f"❌ Delete profile photo error: {e}")
         raise HTTPException(status_code=500, detail="Profil fotoğrafı silinirken hata oluştu")
 
+async def _photo_derivative_response(request: Request, digest: str, size: str, fmt: str, cache_control: str) -> Response:
+    """Fotoğraf türevini (gerekirse worker havuzunda üretip) ETag ile döndür"""
+    try:
+        validate_derivative_params(size, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    etag = f'"{digest}-{size}.{fmt}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    
+    path = get_derivative_path(digest, size, fmt)
+    if path is None:
+        try:
+            path = await asyncio.wrap_future(submit_derivative(digest, size, fmt))
+        except (OSError, ValueError) as e:
+            print(f"❌ Fotoğraf türevi üretilemedi ({digest[:12]} {size}/{fmt}): {e}")
+            raise HTTPException(status_code=422, detail="Fotoğraf işlenemedi")
+    
+    return FileResponse(path, media_type=derivative_media_type(fmt), headers=headers)
+
+@app.get("/api/blobs/{digest}")
+async def get_blob(
+    digest: str,
+    request: Request,
+    size: Optional[str] = None,
+    fmt: Optional[str] = Query(None, alias="format")
+):
+    """
+    İçerik adresli blob (profil fotoğrafları). İçerik değişmediği için özet
+    ETag olarak kullanılır ve yanıt süresiz önbelleklenebilir. Range destekler.
+    size (64, 256, original) veya format (jpeg, webp) verilirse fotoğraf türevi döner.
+    """
+    if not is_valid_digest(digest):
+        raise HTTPException(status_code=400, detail="Geçersiz blob özeti")
+    if not blob_store.exists(digest):
+        raise HTTPException(status_code=404, detail="Blob bulunamadı")
+    
+    if size is not None or fmt is not None:
+        return await _photo_derivative_response(
+            request, digest, size or "original", fmt or DEFAULT_PHOTO_FORMAT,
+            "public, max-age=31536000, immutable"
+        )
+
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+
+    path = blob_store.path(digest)
+    media_type = blob_store.content_type(digest)
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        file_size = os.path.getsize(path)
+        try:
+            start, end = parse_range(range_header, file_size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{file_size}"})
+        return StreamingResponse(
+            blob_store.iter_range(digest, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{file_size}", "Content-Length": str(end - start + 1)}
+        )
+
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+@app.get("/api/members/{member_id}/avatar")
+async def get_member_avatar(
+    member_id: int,
+    request: Request,
+    size: str = "64",
+    fmt: str = Query(DEFAULT_PHOTO_FORMAT, alias="format"),
+    db: Session = Depends(get_db)
+):
+    """
+    Üye avatarı - sabit boyutlu küçük fotoğraf (size=64|256|original, format=jpeg|webp).
+    Üyenin fotoğrafı değişebileceği için kısa süreli önbelleklenir; ETag ile 304 döner.
+    """
+    row = db.query(DBMember.photo_hash).filter(DBMember.id == member_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Üye bulunamadı")
+    if not row.photo_hash or not blob_store.exists(row.photo_hash):
+        raise HTTPException(status_code=404, detail="Profil fotoğrafı bulunamadı")
+    db.close()  # Türev üretimi sırasında bağlantı tutulmasın
+    
+    return await _photo_derivative_response(request, row.photo_hash, size, fmt, "public, max-age=300")
+
 # Güvenlik endpoint'leri
 
 @app.post("/api/qr/verify")
@@ -1517,29 +2079,8 @@ async def verify_qr_code(qr_data: dict):
         if not qr_string:
             raise HTTPException(status_code=400, detail="QR kod verisi gerekli")
         
-        is_valid, decoded_data, error_msg = verify_member_qr(qr_string)
-        
-        if not is_valid:
-            return {
-                "valid": False,
-                "error": error_msg or "Geçersiz QR kod",
-                "success": False
-            }
-        
-        return {
-            "valid": True,
-            "member_data": {
-                "member_id": decoded_data.get("member_id"),
-                "membership_id": decoded_data.get("membership_id"), 
-                "name": decoded_data.get("name"),
-                "status": decoded_data.get("status"),
-                "organization": decoded_data.get("org"),
-                "issued_at": decoded_data.get("issued_at"),
-                "expires_at": decoded_data.get("expires_at")
-            },
-            "verification_time": datetime.utcnow().isoformat(),
-            "success": True
-        }
+        is_valid, decoded_data, error_msg = verify_member_qr_cached(qr_string)
+        return _qr_verification_response(is_valid, decoded_data, error_msg)
         
     except Exception as e:
         return {
@@ -1548,6 +2089,212 @@ async def verify_qr_code(qr_data: dict):
             "success": False
         }
 
+def _qr_verification_response(is_valid: bool, decoded_data: Optional[dict], error_msg: Optional[str]) -> dict:
+    """Tekil ve toplu QR doğrulama için ortak yanıt formatı"""
+    if not is_valid:
+        return {
+            "valid": False,
+            "error": error_msg or "Geçersiz QR kod",
+            "success": False
+        }
+    
+    return {
+        "valid": True,
+        "member_data": {
+            "member_id": decoded_data.get("member_id"),
+            "membership_id": decoded_data.get("membership_id"), 
+            "name": decoded_data.get("name"),
+            "status": decoded_data.get("status"),
+            "organization": decoded_data.get("org"),
+            "issued_at": decoded_data.get("issued_at"),
+            "expires_at": decoded_data.get("expires_at")
+        },
+        "verification_time": datetime.utcnow().isoformat(),
+        "success": True
+    }
+
+# Toplu QR doğrulama - offline biriken POS taramaları için
+MAX_QR_BATCH_SIZE = 1000
+
+class QrBatchVerifyRequest(BaseModel):
+    qr_codes: List[str]
+    deviceInfo: Optional[str] = None
+
+@app.post("/api/qr/verify-batch")
+async def verify_qr_code_batch(request: QrBatchVerifyRequest):
+    """
+    Toplu QR kod doğrulama - Mağaza POS sistemleri için
+    Sonuçlar giriş sırasıyla döner; doğrulama worker havuzunda paralel yapılır
+    """
+    qr_codes = request.qr_codes
+    if not qr_codes:
+        raise HTTPException(status_code=400, detail="En az bir QR kod gerekli")
+    if len(qr_codes) > MAX_QR_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {MAX_QR_BATCH_SIZE} QR kod doğrulanabilir")
+    
+    start_time = time.time()
+    loop = asyncio.get_event_loop()
+    results = await loop.run_in_executor(None, verify_member_qr_batch, qr_codes)
+    
+    items = []
+    valid_count = 0
+    for index, (qr_string, (is_valid, decoded_data, error_msg)) in enumerate(zip(qr_codes, results)):
+        if not qr_string:
+            is_valid, decoded_data, error_msg = False, None, "QR kod verisi gerekli"
+        item = _qr_verification_response(is_valid, decoded_data, error_msg)
+        item["index"] = index
+        items.append(item)
+        if is_valid:
+            valid_count += 1
+    
+    return {
+        "results": items,
+        "count": len(items),
+        "valid_count": valid_count,
+        "invalid_count": len(items) - valid_count,
+        "elapsed_ms": round((time.time() - start_time) * 1000, 2),
+        "success": True
+    }
+
+@app.get("/api/qr/verify/cache-stats")
+async def get_qr_verify_cache_stats():
+    """QR doğrulama önbelleği hit/miss sayaçları - önbellek boyutlandırması için"""
+    return {
+        "cache": qr_verification_cache.stats(),
+        "success": True
+    }
+
+@app.get("/api/qr/render-cache-stats")
+async def get_qr_render_cache_stats():
+    """QR görsel render önbelleği sayaçları"""
+    return {
+        "cache": qr_render_cache.stats(),
+        "success": True
+    }
+
+@app.get("/api/nfc/byte-budgets")
+async def get_nfc_byte_budgets(member_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    NTAG213/215/216 için NDEF byte bütçeleri.
+    v2 sabit uzunlukta olduğundan bütçesi kesindir; member_id verilirse
+    üyenin saklanan v1 payload'ı için de hesaplanır.
+    """
+    result = {
+        "v2": {
+            "payload_bytes": NFC_V2_LENGTH,
+            "tags": nfc_v2_byte_budgets()
+        },
+        "success": True
+    }
+    
+    if member_id is not None:
+        member = db.query(DBMember).filter(DBMember.id == member_id).first()
+        if not member:
+            raise HTTPException(status_code=404, detail="Üye bulunamadı")
+        credential = get_or_issue_credentials(db, member)
+        if not is_nfc_v2(credential.nfc_payload):
+            result["v1"] = {
+                "payload_bytes": len(credential.nfc_payload.encode("utf-8")),
+                "tags": nfc_v1_byte_budgets(credential.nfc_payload)
+            }
+    
+    return result
+
+class NdefEncodeBatchRequest(BaseModel):
+    memberIds: List[int]
+    tagType: str = DEFAULT_TAG_TYPE
+
+MAX_NDEF_BATCH_SIZE = 1000
+
+@app.post("/api/nfc/encode-batch")
+async def encode_ndef_batch(request: NdefEncodeBatchRequest, db: Session = Depends(get_db)):
+    """
+    Kodlama istasyonu için üyelerin NFC payload'larını etikete yazılmaya hazır
+    NDEF mesaj byte'larına çevir (base64) ve etiket kapasitesini donanımdan önce kontrol et
+    """
+    member_ids = list(dict.fromkeys(request.memberIds))
+    if not member_ids:
+        raise HTTPException(status_code=400, detail="En az bir üye ID'si gerekli")
+    if len(member_ids) > MAX_NDEF_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {MAX_NDEF_BATCH_SIZE} üye işlenebilir")
+    if request.tagType not in NFC_TAG_CAPACITIES:
+        raise HTTPException(status_code=400, detail=f"Geçersiz etiket tipi ({', '.join(NFC_TAG_CAPACITIES)})")
+    
+    members = {
+        row.id: row
+        for row in db.query(
+            DBMember.id,
+            DBMember.full_name,
+            DBMember.membership_id,
+            DBMember.status,
+            DBMember.updated_at
+        ).filter(DBMember.id.in_(member_ids)).all()
+    }
+    
+    # Güncel kimlik bilgileri tek sorguda, eksikler tek tek üretilir
+    credentials = get_fresh_credentials(db, members.values())
+    for member_id, member in members.items():
+        if member_id not in credentials:
+            credentials[member_id] = get_or_issue_credentials(db, member)
+    
+    encoded = pre_encode_batch(
+        (
+            (member_id, members[member_id].membership_id, credentials[member_id].nfc_payload)
+            for member_id in member_ids if member_id in members
+        ),
+        tag_type=request.tagType
+    )
+    missing = [member_id for member_id in member_ids if member_id not in members]
+    
+    return {
+        "tagType": request.tagType,
+        "messages": encoded,
+        "missing": missing,
+        "count": len(encoded),
+        "fitting": sum(1 for item in encoded if item["success"]),
+        "success": True
+    }
+
+@app.get("/api/revocations")
+async def get_revocations(since: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Okuyucular için imzalı offline iptal listesi.
+    since verilirse o versiyondan bu yana eklenen/çıkarılan özetler (delta) döner;
+    delta verilemiyorsa tam liste gönderilir.
+    """
+    if not revocation_registry.loaded:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, refresh_revocations)
+        if not revocation_registry.loaded:
+            raise HTTPException(status_code=503, detail="İptal listesi henüz hazır değil")
+    
+    if since is not None:
+        delta = revocation_registry.delta_payload(db, since)
+        if delta is not None:
+            return {**delta, "success": True}
+    
+    return {
+        **revocation_registry.full_payload(),
+        "publicKey": secure_qr.get_nfc_public_key_pem(),
+        "success": True
+    }
+
+@app.get("/api/revocations/stats")
+async def get_revocation_stats():
+    """Bellekteki iptal setinin durumu"""
+    return {
+        "revocations": revocation_registry.stats(),
+        "success": True
+    }
+
+@app.get("/api/nfc/signature-stats")
+async def get_nfc_signature_stats():
+    """NFC imza doğrulayıcı sayaçları (reddedilen imza önbelleği dahil)"""
+    return {
+        "verifier": secure_qr.nfc_verifier.stats(),
+        "success": True
+    }
+
 @app.get("/api/qr/public-key")
 async def get_public_key():
     """
@@ -1567,6 +2314,20 @@ async def get_public_key():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Public key alınamadı: {str(e)}")
 
+@app.get("/api/qr/public-keys")
+async def get_public_keys_endpoint():
+    """
+    Tüm QR doğrulama anahtarları - key_id ile indekslenmiş
+    Rotasyon sonrası eski QR'ları doğrulayabilmek için emekli anahtarlar da döner
+    """
+    return {
+        "active_key_id": secure_qr.get_key_fingerprint(),
+        "keys": get_public_keys(),
+        "algorithm": "RSA-PSS-SHA256",
+        "key_format": "PEM",
+        "success": True
+    }
+
 @app.get("/download-cert", response_class=HTMLResponse)
 async def download_certificate():
     """
@@ -1627,13 +2388,16 @@ async def get_nfc_reading_history(
         start_date = end_date - timedelta(days=days-1)
         
         # Günlük okuma istatistiklerini getir
+        # Filtre kolonun kendisi üzerinde aralık olarak yazılır (DATE(created_at) indeksi kullanamaz)
+        range_start = datetime.combine(start_date, datetime.min.time())
+        range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
         query = db.query(
             func.date(DBNfcReadingHistory.created_at).label('date'),
             func.sum(case((DBNfcReadingHistory.read_success == True, 1), else_=0)).label('successful'),
             func.sum(case((DBNfcReadingHistory.read_success == False, 1), else_=0)).label('failed')
         ).filter(
-            func.date(DBNfcReadingHistory.created_at) >= start_date,
-            func.date(DBNfcReadingHistory.created_at) <= end_date
+            DBNfcReadingHistory.created_at >= range_start,
+            DBNfcReadingHistory.created_at < range_end
         )
         
         # Device filter ekleme
@@ -1731,60 +2495,76 @@ async def decrypt_nfc_data(request: NfcDecryptRequest, db: Session = Depends(get
         print(f"🔍 Received encrypted data length: {len(encrypted_data)}")
         print(f"🔍 First 50 chars: {encrypted_data[:50]}")
         
-        # İlk olarak çift şifrelemeyi çöz
-        decrypted_json = secure_qr._decrypt_nfc_data(encrypted_data)
-        print(f"🔍 Decrypted result length: {len(decrypted_json) if decrypted_json else 0}")
-        print(f"🔍 Full decrypted result: {decrypted_json}")
-        print(f"🔍 Decrypted preview: {decrypted_json[:100] if decrypted_json else 'None'}")
-        
-        if not decrypted_json:
-            # Başarısız okuma kaydını log'la
-            log_nfc_reading(
-                db=db,
-                device_info=device_info,
-                read_success=False,
-                error_message="Veri çözülemedi - geçersiz şifreleme",
-                verification_type="online",
-                reader_name="MAUI App"
-            )
-            print("❌ Decryption failed - invalid encryption")
-            raise HTTPException(status_code=400, detail="Veri çözülemedi - geçersiz şifreleme")
+        nfc_v2 = None
+        if is_nfc_v2(encrypted_data):
+            # v2 binary: tek base64url katmanı, JSON yok
+            nfc_v2 = decode_nfc_v2(encrypted_data)
+            if nfc_v2 is None:
+                log_nfc_reading(
+                    db=db,
+                    device_info=device_info,
+                    read_success=False,
+                    error_message="Geçersiz NFC v2 formatı",
+                    verification_type="online",
+                    reader_name="MAUI App"
+                )
+                raise HTTPException(status_code=400, detail="Veri çözülemedi - geçersiz NFC v2 formatı")
+            nfc_data = nfc_v2.as_nfc_data()
+        else:
+            # İlk olarak çift şifrelemeyi çöz
+            decrypted_json = secure_qr._decrypt_nfc_data(encrypted_data)
+            print(f"🔍 Decrypted result length: {len(decrypted_json) if decrypted_json else 0}")
+            print(f"🔍 Full decrypted result: {decrypted_json}")
+            print(f"🔍 Decrypted preview: {decrypted_json[:100] if decrypted_json else 'None'}")
         
-        # JSON parse et
-        try:
-            nfc_data = json.loads(decrypted_json)
-        except json.JSONDecodeError:
-            # Başarısız okuma kaydını log'la
-            log_nfc_reading(
-                db=db,
-                device_info=device_info,
-                read_success=False,
-                error_message="Geçersiz JSON formatı",
-                verification_type="online",
-                reader_name="MAUI App"
-            )
-            raise HTTPException(status_code=400, detail="Geçersiz JSON formatı")
+            if not decrypted_json:
+                # Başarısız okuma kaydını log'la
+                log_nfc_reading(
+                    db=db,
+                    device_info=device_info,
+                    read_success=False,
+                    error_message="Veri çözülemedi - geçersiz şifreleme",
+                    verification_type="online",
+                    reader_name="MAUI App"
+                )
+                print("❌ Decryption failed - invalid encryption")
+                raise HTTPException(status_code=400, detail="Veri çözülemedi - geçersiz şifreleme")
         
-        # Gerekli alanları kontrol et
-        required_fields = ['v', 'mid', 'name', 'exp', 'sig']
-        for field in required_fields:
-            if field not in nfc_data:
+            # JSON parse et
+            try:
+                nfc_data = json.loads(decrypted_json)
+            except json.JSONDecodeError:
                 # Başarısız okuma kaydını log'la
                 log_nfc_reading(
                     db=db,
                     device_info=device_info,
                     read_success=False,
-                    error_message=f"Eksik alan: {field}",
+                    error_message="Geçersiz JSON formatı",
                     verification_type="online",
                     reader_name="MAUI App"
                 )
-                raise HTTPException(status_code=400, detail=f"Eksik alan: {field}")
+                raise HTTPException(status_code=400, detail="Geçersiz JSON formatı")
+        
+            # Gerekli alanları kontrol et
+            required_fields = ['v', 'mid', 'name', 'exp', 'sig']
+            for field in required_fields:
+                if field not in nfc_data:
+                    # Başarısız okuma kaydını log'la
+                    log_nfc_reading(
+                        db=db,
+                        device_info=device_info,
+                        read_success=False,
+                        error_message=f"Eksik alan: {field}",
+                        verification_type="online",
+                        reader_name="MAUI App"
+                    )
+                    raise HTTPException(status_code=400, detail=f"Eksik alan: {field}")
         
         # UID'yi JSON'dan al (varsa)
         card_uid = nfc_data.get('uid') or nfc_data.get('card_uid')
         
         # Version kontrolü
-        if nfc_data['v'] != 1:
+        if nfc_data['v'] != (NFC_V2_VERSION if nfc_v2 is not None else 1):
             raise HTTPException(status_code=400, detail="Desteklenmeyen veri versiyonu")
         
         # Expiration date kontrolü
@@ -1803,7 +2583,10 @@ async def decrypt_nfc_data(request: NfcDecryptRequest, db: Session = Depends(get
             raise HTTPException(status_code=400, detail="Geçersiz expiration date formatı")
         
         # İmza doğrulaması (ECDSA P-256)
-        signature_valid = secure_qr._verify_nfc_signature(nfc_data)
+        if nfc_v2 is not None:
+            signature_valid = secure_qr.verify_nfc_v2(nfc_v2)
+        else:
+            signature_valid = secure_qr._verify_nfc_signature(nfc_data)
         
         if not signature_valid:
             return {
@@ -2041,42 +2824,54 @@ async def verify_offline_nfc(request: OfflineVerifyRequest, db: Session = Depend
         encrypted_data = request.encryptedData.strip()
         print(f"🔍 Offline verification - encrypted data length: {len(encrypted_data)}")
         
-        # 1) Çift şifrelemeyi çöz (XOR + Base64)
-        decrypted_json = _decrypt_nfc_data_offline(encrypted_data)
-        if not decrypted_json:
-            return {
-                "success": False,
-                "error": "DECRYPTION_FAILED",
-                "message": "Veri çözülemedi - geçersiz şifreleme"
-            }
-        
-        # 2) JSON parse et
-        try:
-            nfc_data = json.loads(decrypted_json)
-        except json.JSONDecodeError:
-            return {
-                "success": False,
-                "error": "INVALID_JSON",
-                "message": "Geçersiz JSON formatı"
-            }
+        nfc_v2 = None
+        if is_nfc_v2(encrypted_data):
+            # 1-4) v2 binary: tek base64url katmanı, sabit alanlar, JSON yok
+            nfc_v2 = decode_nfc_v2(encrypted_data)
+            if nfc_v2 is None:
+                return {
+                    "success": False,
+                    "error": "DECRYPTION_FAILED",
+                    "message": "Veri çözülemedi - geçersiz NFC v2 formatı"
+                }
+            nfc_data = nfc_v2.as_nfc_data()
+        else:
+            # 1) Çift şifrelemeyi çöz (XOR + Base64)
+            decrypted_json = _decrypt_nfc_data_offline(encrypted_data)
+            if not decrypted_json:
+                return {
+                    "success": False,
+                    "error": "DECRYPTION_FAILED",
+                    "message": "Veri çözülemedi - geçersiz şifreleme"
+                }
         
-        # 3) Gerekli alanları kontrol et
-        required_fields = ['v', 'mid', 'name', 'exp', 'sig']
-        for field in required_fields:
-            if field not in nfc_data:
+            # 2) JSON parse et
+            try:
+                nfc_data = json.loads(decrypted_json)
+            except json.JSONDecodeError:
                 return {
                     "success": False,
-                    "error": "MISSING_FIELD",
-                    "message": f"Eksik alan: {field}"
+                    "error": "INVALID_JSON",
+                    "message": "Geçersiz JSON formatı"
                 }
         
-        # 4) Version kontrolü
-        if nfc_data['v'] != 1:
-            return {
-                "success": False,
-                "error": "UNSUPPORTED_VERSION",
-                "message": "Desteklenmeyen veri versiyonu"
-            }
+            # 3) Gerekli alanları kontrol et
+            required_fields = ['v', 'mid', 'name', 'exp', 'sig']
+            for field in required_fields:
+                if field not in nfc_data:
+                    return {
+                        "success": False,
+                        "error": "MISSING_FIELD",
+                        "message": f"Eksik alan: {field}"
+                    }
+        
+            # 4) Version kontrolü
+            if nfc_data['v'] != 1:
+                return {
+                    "success": False,
+                    "error": "UNSUPPORTED_VERSION",
+                    "message": "Desteklenmeyen veri versiyonu"
+                }
         
         # 5) Expiration date kontrolü
         exp_date_str = nfc_data['exp']
@@ -2095,8 +2890,11 @@ async def verify_offline_nfc(request: OfflineVerifyRequest, db: Session = Depend
                 "message": "Geçersiz expiration date formatı"
             }
         
-        # 6) Basit offline imza doğrulaması
-        signature_valid = _verify_nfc_signature_offline(nfc_data)
+        # 6) Basit offline imza doğrulaması (v2: gömülü ECDSA P-256 public key)
+        if nfc_v2 is not None:
+            signature_valid = secure_qr.verify_nfc_v2(nfc_v2)
+        else:
+            signature_valid = _verify_nfc_signature_offline(nfc_data)
         if not signature_valid:
             return {
                 "success": False,
@@ -2104,9 +2902,18 @@ async def verify_offline_nfc(request: OfflineVerifyRequest, db: Session = Depend
                 "message": "Dijital imza doğrulanamadı - sahte kart olabilir"
             }
         
-        # 7) Başarılı - offline doğrulama tamamlandı
+        # 7) İptal listesi kontrolü - bellekteki set, veritabanına dokunmaz
         membership_id = nfc_data['mid']
         member_name = nfc_data['name']
+        if revocation_registry.is_revoked(membership_id):
+            return {
+                "success": False,
+                "error": "REVOKED",
+                "message": "Kart iptal edilmiş - üyelik askıya alınmış veya silinmiş",
+                "revocationVersion": revocation_registry.version
+            }
+        
+        # 8) Başarılı - offline doğrulama tamamlandı
         
         # Offline başarılı doğrulama kaydını log'la
         log_nfc_reading(
@@ -2144,30 +2951,9 @@ async def verify_offline_nfc(request: OfflineVerifyRequest, db: Session = Depend
 def _decrypt_nfc_data_offline(encrypted_data: str) -> Optional[str]:
     """
     Offline NFC veri şifresini çöz (XOR + Base64)
-    MauiNfcReader'daki DecryptNfcData fonksiyonunun Python karşılığı
+    MauiNfcReader'daki DecryptNfcData fonksiyonunun Python karşılığı - nfc_codec ile ortak
     """
-    try:
-        if not encrypted_data.startswith("NFC_ENC_V1:"):
-            return encrypted_data  # Şifrelenmiş değil
-        
-        # Prefix'i kaldır
-        encrypted_b64 = encrypted_data[11:]
-        
-        # Base64 decode
-        import base64
-        encrypted_bytes = base64.b64decode(encrypted_b64)
-        
-        # XOR ile çöz
-        key = "NFC_SECURE_2024_CRYPTO_KEY_ADVANCED".encode('utf-8')
-        decrypted_bytes = bytearray()
-        
-        for i in range(len(encrypted_bytes)):
-            decrypted_bytes.append(encrypted_bytes[i] ^ key[i % len(key)])
-        
-        return decrypted_bytes.decode('utf-8')
-    except Exception as e:
-        print(f"❌ Offline decryption error: {e}")
-        return None
+    return decode_nfc_v1(encrypted_data)
 
 def _verify_nfc_signature_offline(nfc_data: dict) -> bool:
     """
@@ -0,0 +1,113 @@
+"""
+Üye Değişiklik Olayları
+member_change_events tablosu üzerine küçük yardımcılar.
+
+Olaylar üyeyi değiştiren işlemle aynı transaction'da eklenir; artan olay id'si
+okuyucuların iptal listesi ve snapshot delta'larını çekerken kullandığı
+versiyon cursor'ıdır.
+
+- id insert anında verilir ama transaction'lar farklı worker'larda farklı sırada
+  commit olabilir (11 görünürken 10 henüz commit edilmemiş olabilir). Bu yüzden
+  okuyuculara sadece MEMBER_EVENT_SETTLE_SECONDS'tan eski olaylara kadar versiyon
+  verilir (latest_event_id); olay yazan transaction'ların bu süreden kısa sürdüğü
+  ve worker saatlerinin NTP ile senkron olduğu varsayılır.
+- Temizlikte budanan en büyük olay id'si id_sequences tablosunda saklanır;
+  cursor'ı bundan eski okuyucuya delta verilmez (pruned_event_id).
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import IdSequence, MemberChangeEvent
+
+EVENT_CREATED = "created"
+EVENT_UPDATED = "updated"
+EVENT_DELETED = "deleted"
+
+# Bu süreden yeni olaylar henüz okuyucu versiyonuna girmez
+MEMBER_EVENT_SETTLE_SECONDS = float(os.getenv("MEMBER_EVENT_SETTLE_SECONDS", "5"))
+
+# id_sequences satırı: next_value = budanmış en büyük olay id'si
+PRUNED_EVENTS_SEQUENCE = "member_change_events:pruned"
+
+
+def record_member_change(db: Session, member, event_type: str):
+    """Olayı session'a ekle - commit çağıran işleme aittir"""
+    db.add(MemberChangeEvent(
+        member_id=member.id,
+        membership_id=member.membership_id,
+        event_type=event_type,
+        status=member.status,
+    ))
+
+
+def newest_event_id(db: Session) -> int:
+    """Görünen en son olay id'si - sadece yerel önbelleklerin değişiklik tespiti için"""
+    return db.query(func.max(MemberChangeEvent.id)).scalar() or 0
+
+
+def latest_event_id(db: Session) -> int:
+    """
+    Okuyuculara verilebilecek versiyon cursor'ı: settle süresinden eski en son olay.
+    Bundan küçük id'li olayların hepsi commit edilmiş sayılır (hiç olay yoksa 0).
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=MEMBER_EVENT_SETTLE_SECONDS)
+    settled = db.query(MemberChangeEvent.id).filter(
+        MemberChangeEvent.created_at <= cutoff
+    ).order_by(MemberChangeEvent.id.desc()).limit(1).scalar()
+    return max(settled or 0, pruned_event_id(db))
+
+
+def pruned_event_id(db: Session) -> int:
+    """Budanmış en büyük olay id'si - cursor'ı bundan küçük okuyucuya delta verilemez"""
+    pruned = db.query(IdSequence.next_value).filter(IdSequence.name == PRUNED_EVENTS_SEQUENCE).scalar()
+    if pruned is not None:
+        return pruned
+    # Kayıt yoksa (bu sürümden önce budama yapılmış olabilir): kalan ilk silme-dışı olaydan öncesi budanmış sayılır
+    first_kept = db.query(func.min(MemberChangeEvent.id)).filter(
+        MemberChangeEvent.event_type != EVENT_DELETED
+    ).scalar()
+    return first_kept - 1 if first_kept is not None else newest_event_id(db)
+
+
+def events_since(db: Session, since: int, limit: int, until: Optional[int] = None) -> List[MemberChangeEvent]:
+    """Cursor'dan sonraki (ve verilirse until dahil öncesindeki) olaylar, id sırasıyla"""
+    query = db.query(MemberChangeEvent).filter(MemberChangeEvent.id > since)
+    if until is not None:
+        query = query.filter(MemberChangeEvent.id <= until)
+    return query.order_by(MemberChangeEvent.id).limit(limit).all()
+
+
+def _store_pruned_event_id(db: Session, event_id: int):
+    updated = db.query(IdSequence).filter(
+        IdSequence.name == PRUNED_EVENTS_SEQUENCE,
+        IdSequence.next_value < event_id
+    ).update({IdSequence.next_value: event_id, IdSequence.updated_at: datetime.utcnow()}, synchronize_session=False)
+    if not updated and db.query(IdSequence.name).filter(IdSequence.name == PRUNED_EVENTS_SEQUENCE).first() is None:
+        db.add(IdSequence(name=PRUNED_EVENTS_SEQUENCE, next_value=event_id))
+
+
+def cleanup_member_change_events(db: Session, retention_days: int) -> int:
+    """
+    Eski olayları sil ve budama sınırını kaydet. Silme olayları tutulur: silinen
+    üyelerin kartları süreleri dolana kadar iptal listesinde kalmalıdır.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    expired = db.query(MemberChangeEvent).filter(
+        MemberChangeEvent.created_at < cutoff,
+        MemberChangeEvent.event_type != EVENT_DELETED,
+        # En son olay hiç silinmez: aksi halde SQLite (ve yeniden başlatılan MySQL 5.7)
+        # yeni olaylara budama sınırının altında kalan id'leri tekrar verebilir
+        MemberChangeEvent.id < newest_event_id(db)
+    )
+    max_pruned = expired.with_entities(func.max(MemberChangeEvent.id)).scalar()
+    if max_pruned is None:
+        return 0
+    deleted = expired.filter(MemberChangeEvent.id <= max_pruned).delete(synchronize_session=False)
+    _store_pruned_event_id(db, max_pruned)
+    db.commit()
+    return deleted
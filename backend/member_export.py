@@ -0,0 +1,93 @@
+"""
+Üye Dışa Aktarma (CSV / NDJSON)
+Muhasebe ve raporlama için üye listesini tek yanıtta, sunucu tarafı cursor'dan
+okuyarak akış halinde üretir.
+
+- Satırlar stream_results + yield_per ile partiler halinde okunur ve her parti
+  hemen yanıta yazılır; worker belleği tablo boyutundan bağımsızdır
+- Kolon seçimi ve filtreler GET /api/members ile aynıdır (bkz. member_listing);
+  fotoğraflar sadece URL olarak (profilePhotoUrl) yazılır
+- CSV, Excel Türkçe karakterleri doğru göstersin diye UTF-8 BOM ile başlar
+
+Not: Akış sürerken cursor'ın bağlantısı meşgul olduğundan aynı session'da
+başka sorgu çalıştırılmaz.
+"""
+
+import io
+import csv
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from blob_store import blob_url
+from database import Member
+from member_listing import MEMBER_FIELDS
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+CSV_DELIMITERS = (",", ";")
+
+# DB'den okuma ve yanıta yazma parti büyüklüğü
+EXPORT_BATCH_SIZE = 2000
+
+# Filtre parametresi -> kolon (eşitlik)
+EXPORT_FILTERS = {"status": Member.status, "membershipType": Member.membership_type, "role": Member.role}
+
+
+def _value(field: str, value: Any) -> Any:
+    if field == "profilePhotoUrl":
+        return blob_url(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _export_query(db: Session, fields: Sequence[str], filters: Optional[Dict[str, Optional[str]]],
+                  created_from: Optional[datetime], created_to: Optional[datetime]):
+    query = db.query(*[MEMBER_FIELDS[name].label(name) for name in fields])
+    for name, value in (filters or {}).items():
+        if value is not None:
+            query = query.filter(EXPORT_FILTERS[name] == value)
+    if created_from is not None:
+        query = query.filter(Member.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(Member.created_at < created_to)
+    return query.order_by(Member.id).execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+
+
+def _iter_batches(query, fields: Sequence[str]) -> Iterator[List[List[Any]]]:
+    batch: List[List[Any]] = []
+    for row in query:
+        batch.append([_value(field, value) for field, value in zip(fields, row)])
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_members_csv(db: Session, fields: Sequence[str], filters: Optional[Dict[str, Optional[str]]] = None,
+                       created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                       delimiter: str = ",") -> Iterator[bytes]:
+    """Başlık satırı + her parti için bir CSV parçası"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\r\n")
+    writer.writerow(fields)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    for batch in _iter_batches(_export_query(db, fields, filters, created_from, created_to), fields):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_members_ndjson(db: Session, fields: Sequence[str], filters: Optional[Dict[str, Optional[str]]] = None,
+                          created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> Iterator[bytes]:
+    """Her satır bir üye nesnesi"""
+    for batch in _iter_batches(_export_query(db, fields, filters, created_from, created_to), fields):
+        yield "".join(
+            json.dumps(dict(zip(fields, values)), ensure_ascii=False, separators=(',', ':')) + "\n"
+            for values in batch
+        ).encode("utf-8")
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Toplu Üye İçe Aktarma (CSV / JSONL)
+Tablo programlarından gelen üye listelerini satır satır POST /api/members
+çağırmadan, parça parça doğrulayıp toplu INSERT ile ekler.
+
+- Dosya akış halinde okunur; bellekte aynı anda en fazla bir parça (chunk) tutulur
+- Her parçada tek sorguyla veritabanındaki email çakışmaları kontrol edilir
+- Membership ID / kart numaraları parça başına tek rezervasyonla alınır (bkz. id_allocator)
+- Üyeler ve member_change_events kayıtları executemany ile eklenir; her parça
+  kendi transaction'ında commit edilir
+- Hatalı satırlar atlanır ve satır numarasıyla raporlanır
+- QR/NFC kimlik bilgileri ilk okumada zaten üretildiği için varsayılan olarak
+  üretilmez; istenirse arka plan işi olarak toplu imzalanır
+
+CSV başlıkları API alan adları (fullName, phoneNumber, ...) veya kolon adları
+(full_name, phone_number, ...) olabilir; ayraç ',' veya ';' otomatik algılanır.
+
+CLI kullanımı:
+    python member_import.py uyeler.csv
+    python member_import.py uyeler.jsonl --dry-run
+    python member_import.py - --format csv --issue-credentials < uyeler.csv
+"""
+
+import os
+import io
+import re
+import sys
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import Member, MemberChangeEvent, SessionLocal
+from id_allocator import id_allocator
+from member_events import EVENT_CREATED
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_CHUNK_SIZE = int(os.getenv("MEMBER_IMPORT_CHUNK_SIZE", "1000"))
+MAX_IMPORT_BYTES = int(os.getenv("MAX_MEMBER_IMPORT_BYTES", str(50 * 1024 * 1024)))
+
+# Yanıtta listelenen en fazla hata (toplam sayı her zaman döner)
+MAX_REPORTED_ERRORS = 1000
+
+# API alan adı -> (kolon, en fazla uzunluk, zorunlu)
+IMPORT_FIELDS = {
+    "fullName": ("full_name", 255, True),
+    "phoneNumber": ("phone_number", 20, True),
+    "email": ("email", 255, True),
+    "address": ("address", None, True),
+    "dateOfBirth": ("date_of_birth", 10, True),
+    "emergencyContact": ("emergency_contact", 20, True),
+    "membershipType": ("membership_type", 50, True),
+    "role": ("role", 50, True),
+    "status": ("status", 20, False),
+}
+DEFAULT_IMPORT_STATUS = "active"
+
+# Başlık eşleştirme: fullName, full_name, FULLNAME -> fullName
+_FIELD_ALIASES = {}
+for _name, (_column, _, _) in IMPORT_FIELDS.items():
+    _FIELD_ALIASES[_name.lower()] = _name
+    _FIELD_ALIASES[_column.replace("_", "")] = _name
+
+_EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+$")
+_DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y")
+
+# Ertelenmiş kimlik bilgisi üretimi - import isteklerini bekletmemek için ayrı tek thread
+import_credential_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import-credentials")
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def _canonical_field(header: str) -> Optional[str]:
+    return _FIELD_ALIASES.get(re.sub(r"[\s_\-]", "", (header or "").lower()))
+
+
+def _normalize_date(value: str) -> str:
+    """Tarihi YYYY-MM-DD'ye çevir (Excel'den gelen GG.AA.YYYY de kabul edilir)"""
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ImportRowError(f"Geçersiz doğum tarihi: {value} (YYYY-MM-DD)")
+
+
+def validate_record(record: Dict[str, Any]) -> Dict[str, str]:
+    """Ham satırı kolon adlı sözlüğe çevir ve doğrula (hata: ImportRowError)"""
+    if not isinstance(record, dict):
+        raise ImportRowError("Satır bir JSON nesnesi olmalı")
+
+    values: Dict[str, str] = {}
+    for key, raw in record.items():
+        field = _canonical_field(str(key))
+        if field is None or raw is None:
+            continue
+        values[field] = str(raw).strip()
+
+    missing = [name for name, (_, _, required) in IMPORT_FIELDS.items() if required and not values.get(name)]
+    if missing:
+        raise ImportRowError(f"Eksik alan: {', '.join(missing)}")
+
+    row: Dict[str, str] = {}
+    for name, (column, max_length, _) in IMPORT_FIELDS.items():
+        value = values.get(name) or ""
+        if max_length is not None and len(value) > max_length:
+            raise ImportRowError(f"{name} en fazla {max_length} karakter olabilir")
+        row[column] = value
+
+    if not _EMAIL_PATTERN.match(row["email"]):
+        raise ImportRowError(f"Geçersiz email: {row['email']}")
+    row["date_of_birth"] = _normalize_date(row["date_of_birth"])
+    row["status"] = row["status"] or DEFAULT_IMPORT_STATUS
+    return row
+
+
+def iter_csv_records(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """(satır no, kayıt) - ayraç başlık satırından algılanır"""
+    header = stream.readline()
+    if not header.strip():
+        return
+    delimiter = ";" if header.count(";") > header.count(",") else ","
+    fieldnames = next(csv.reader([header], delimiter=delimiter))
+    reader = csv.DictReader(stream, fieldnames=fieldnames, delimiter=delimiter)
+    previous_line = 0
+    for record in reader:
+        # Tırnak içindeki satır sonları line_num'ı ilerletir; kaydın başladığı satır raporlanır (başlık = 1)
+        start_line = previous_line + 2
+        previous_line = reader.line_num
+        if not any(value.strip() for value in record.values() if isinstance(value, str)):
+            continue
+        yield start_line, record
+
+
+def iter_jsonl_records(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ImportRowError(f"Geçersiz JSON: {e.msg}")
+
+
+def iter_records(stream: TextIO, import_format: str) -> Iterator[Tuple[int, Any]]:
+    if import_format == "csv":
+        return iter_csv_records(stream)
+    if import_format == "jsonl":
+        return iter_jsonl_records(stream)
+    raise ValueError(f"Geçersiz format: {import_format} ({', '.join(IMPORT_FORMATS)})")
+
+
+class MemberImport:
+    """Tek bir içe aktarma işinin durumu ve raporu"""
+
+    def __init__(self, db: Session, chunk_size: int = IMPORT_CHUNK_SIZE, dry_run: bool = False,
+                 on_error: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.db = db
+        self.chunk_size = max(1, chunk_size)
+        self.dry_run = dry_run
+        self.on_error = on_error
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.imported_ids: List[int] = []
+        self.non_active_imported = 0
+        self._seen_emails = set()
+
+    def _error(self, line: int, message: str, email: Optional[str] = None):
+        self.failed += 1
+        error = {"line": line, "error": message}
+        if email:
+            error["email"] = email
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def run(self, records: Iterable[Tuple[int, Any]]) -> "MemberImport":
+        chunk: List[Tuple[int, Dict[str, str]]] = []
+        for line, record in records:
+            self.total += 1
+            if isinstance(record, ImportRowError):
+                self._error(line, str(record))
+                continue
+            try:
+                row = validate_record(record)
+            except ImportRowError as e:
+                self._error(line, str(e))
+                continue
+
+            email_key = row["email"].lower()
+            if email_key in self._seen_emails:
+                self._error(line, "Email dosyada birden fazla kez geçiyor", row["email"])
+                continue
+            self._seen_emails.add(email_key)
+
+            chunk.append((line, row))
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+                chunk = []
+        if chunk:
+            self._flush(chunk)
+        return self
+
+    def _flush(self, chunk: List[Tuple[int, Dict[str, str]]]):
+        existing = {
+            email.lower() for (email,) in self.db.query(Member.email).filter(
+                Member.email.in_([row["email"] for _, row in chunk])
+            )
+        }
+        pending = []
+        for line, row in chunk:
+            if row["email"].lower() in existing:
+                self._error(line, "Email already exists", row["email"])
+            else:
+                pending.append((line, row))
+        if not pending or self.dry_run:
+            self.imported += len(pending)
+            return
+
+        now = datetime.utcnow()
+        identifiers = id_allocator.reserve_member_identifiers(len(pending))
+        for (_, row), (membership_id, card_number) in zip(pending, identifiers):
+            row.update(membership_id=membership_id, card_number=card_number, created_at=now, updated_at=now)
+
+        try:
+            self._insert([row for _, row in pending])
+            self.db.commit()
+        except IntegrityError:
+            # Paralel bir kayıt aynı email'i az önce eklemiş olabilir - parçayı satır satır dene
+            self.db.rollback()
+            for line, row in pending:
+                try:
+                    self._insert([row])
+                    self.db.commit()
+                except IntegrityError:
+                    self.db.rollback()
+                    self._error(line, "Email veya kimlik numarası zaten kayıtlı", row["email"])
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        """Üyeleri ve oluşturma olaylarını executemany ile ekle (commit çağırana aittir)"""
+        self.db.execute(insert(Member), rows)
+        inserted = self.db.query(Member.id, Member.membership_id, Member.status).filter(
+            Member.membership_id.in_([row["membership_id"] for row in rows])
+        ).all()
+        self.db.execute(insert(MemberChangeEvent), [
+            {"member_id": member_id, "membership_id": membership_id, "event_type": EVENT_CREATED, "status": status}
+            for member_id, membership_id, status in inserted
+        ])
+        self.imported += len(inserted)
+        self.imported_ids.extend(member_id for member_id, _, _ in inserted)
+        self.non_active_imported += sum(1 for _, _, status in inserted if status != DEFAULT_IMPORT_STATUS)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors),
+            "dryRun": self.dry_run,
+        }
+
+
+def import_members(db: Session, stream: TextIO, import_format: str, chunk_size: int = IMPORT_CHUNK_SIZE,
+                   dry_run: bool = False, on_error: Optional[Callable[[Dict[str, Any]], None]] = None) -> MemberImport:
+    """Akıştaki tüm kayıtları içe aktar; sonuç MemberImport.report() ile alınır"""
+    return MemberImport(db, chunk_size=chunk_size, dry_run=dry_run, on_error=on_error).run(
+        iter_records(stream, import_format)
+    )
+
+
+def issue_imported_credentials(member_ids: List[int], batch_size: int = 500) -> int:
+    """İçe aktarılan üyeler için QR/NFC kimlik bilgilerini toplu üret ve kaydet"""
+    from credential_issuer import issue_credentials_bulk, load_members_for_issue
+    from credential_store import store_issued_credentials
+
+    start_time = time.time()
+    issued = 0
+    db = SessionLocal()
+    try:
+        for start in range(0, len(member_ids), batch_size):
+            members = load_members_for_issue(db, member_ids[start:start + batch_size])
+            results = list(issue_credentials_bulk(members.values()))
+            member_updated_at = {member_id: data["updatedAt"] for member_id, data in members.items()}
+            issued += store_issued_credentials(db, results, member_updated_at)
+    except Exception as e:
+        print(f"❌ İçe aktarma kimlik bilgisi üretim hatası: {e}")
+    finally:
+        db.close()
+    print(f"🔏 [IMPORT] {issued}/{len(member_ids)} üye için kimlik bilgisi üretildi - {time.time() - start_time:.2f}s")
+    return issued
+
+
+def schedule_credential_issuance(member_ids: List[int]):
+    """Kimlik bilgisi üretimini arka planda başlat (beklenmez)"""
+    if member_ids:
+        import_credential_executor.submit(issue_imported_credentials, list(member_ids))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CSV/JSONL dosyasından toplu üye içe aktarma")
+    parser.add_argument("path", help="Girdi dosyası ('-' = stdin)")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Varsayılan: dosya uzantısından")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Parça başına satır")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece doğrula, kaydetme")
+    parser.add_argument("--issue-credentials", action="store_true", help="İçe aktarılan üyeler için QR/NFC üret")
+    args = parser.parse_args(argv)
+
+    import_format = args.format
+    if import_format is None:
+        extension = os.path.splitext(args.path)[1].lower().lstrip(".")
+        import_format = "jsonl" if extension in ("jsonl", "ndjson") else "csv" if extension == "csv" else None
+    if import_format is None:
+        parser.error("--format belirtilmeli")
+
+    def print_error(error: Dict[str, Any]):
+        print(json.dumps(error, ensure_ascii=False), file=sys.stderr)
+
+    stream = (io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="") if args.path == "-"
+              else open(args.path, "r", encoding="utf-8-sig", newline=""))
+    start_time = time.time()
+    db = SessionLocal()
+    try:
+        result = import_members(db, stream, import_format, chunk_size=args.chunk_size,
+                                dry_run=args.dry_run, on_error=print_error)
+    finally:
+        db.close()
+        if args.path != "-":
+            stream.close()
+
+    elapsed = time.time() - start_time
+    print(f"✅ {result.imported}/{result.total} üye {'doğrulandı' if args.dry_run else 'içe aktarıldı'}, "
+          f"{result.failed} hata - {elapsed:.2f}s", file=sys.stderr)
+    if args.issue_credentials and result.imported_ids:
+        issue_imported_credentials(result.imported_ids)
+    return 0 if result.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Üye Listeleme
+GET /api/members için keyset (cursor) sayfalama, alan seçimi (projection),
+sıralama ve filtreleme.
+
+- Sadece istenen kolonlar sorgulanır; fotoğraflar blob deposundadır, listede
+  sadece URL'leri döner (fields=...,profilePhotoUrl ile istenebilir)
+- Cursor, son satırın (sıralama değeri, id) çiftidir; OFFSET kullanılmadığı için
+  her sayfa indeks üzerinden sabit maliyetle okunur
+- Sıralama sabit olsun diye her zaman id ikincil anahtar olarak eklenir
+"""
+
+import json
+import base64
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from blob_store import blob_url
+from database import Member
+
+DEFAULT_MEMBER_PAGE_SIZE = 100
+MAX_MEMBER_PAGE_SIZE = 500
+
+# API alan adı -> kolon
+MEMBER_FIELDS = {
+    "id": Member.id,
+    "fullName": Member.full_name,
+    "membershipId": Member.membership_id,
+    "cardNumber": Member.card_number,
+    "phoneNumber": Member.phone_number,
+    "email": Member.email,
+    "address": Member.address,
+    "dateOfBirth": Member.date_of_birth,
+    "emergencyContact": Member.emergency_contact,
+    "membershipType": Member.membership_type,
+    "role": Member.role,
+    "status": Member.status,
+    "profilePhotoUrl": Member.photo_hash,
+    "createdAt": Member.created_at,
+    "updatedAt": Member.updated_at,
+}
+DEFAULT_MEMBER_FIELDS = [name for name in MEMBER_FIELDS if name != "profilePhotoUrl"]
+
+# Sıralanabilir alanlar - updatedAt dışındakiler indeksli (bkz. database.Member)
+SORT_FIELDS = ("id", "fullName", "membershipId", "createdAt", "updatedAt")
+DATETIME_SORT_FIELDS = ("createdAt", "updatedAt")
+DEFAULT_SORT = "id"
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """fields=fullName,status -> doğrulanmış alan listesi (id her zaman dahil)"""
+    if not fields:
+        return list(DEFAULT_MEMBER_FIELDS)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in MEMBER_FIELDS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen alan: {', '.join(unknown)}")
+    return ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[str, bool]:
+    """sort=-createdAt -> ("createdAt", azalan=True)"""
+    sort = sort or DEFAULT_SORT
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in SORT_FIELDS:
+        raise ValueError(f"Geçersiz sıralama alanı: {field} ({', '.join(SORT_FIELDS)})")
+    return field, descending
+
+
+def encode_cursor(sort_field: str, value, member_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort_field, value, member_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_field: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, member_id = json.loads(raw)
+        if cursor_sort != sort_field or not isinstance(member_id, int):
+            raise ValueError
+        if value is not None and sort_field in DATETIME_SORT_FIELDS:
+            value = datetime.fromisoformat(value)
+        return value, member_id
+    except (ValueError, TypeError):
+        raise ValueError("Geçersiz cursor (sıralama değiştiyse ilk sayfadan başlayın)")
+
+
+def _keyset_condition(column, value, last_id: int, descending: bool):
+    """
+    (kolon, id) sırasında cursor'dan sonraki satırlar.
+    NULL'lar MySQL'deki gibi en küçük değer kabul edilir (artan sırada başta).
+    """
+    nullable = column.nullable
+    if not descending:
+        if value is None:
+            return or_(column.isnot(None), and_(column.is_(None), Member.id > last_id))
+        return or_(column > value, and_(column == value, Member.id > last_id))
+    if value is None:
+        return and_(column.is_(None), Member.id < last_id)
+    condition = or_(column < value, and_(column == value, Member.id < last_id))
+    return or_(condition, column.is_(None)) if nullable else condition
+
+
+def list_members(
+    db: Session,
+    fields: Sequence[str],
+    sort_field: str = DEFAULT_SORT,
+    descending: bool = False,
+    limit: int = DEFAULT_MEMBER_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    filters: Optional[Dict[str, Optional[str]]] = None,
+) -> Dict[str, Any]:
+    """Bir sayfa üye + sonraki sayfanın cursor'ı"""
+    sort_column = MEMBER_FIELDS[sort_field]
+    columns = [MEMBER_FIELDS[name].label(name) for name in fields]
+    if sort_field not in fields:
+        columns.append(sort_column.label("_sort"))
+    query = db.query(*columns)
+
+    for field, value in (filters or {}).items():
+        if value is not None:
+            query = query.filter(MEMBER_FIELDS[field] == value)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_field)
+        query = query.filter(_keyset_condition(sort_column, value, last_id, descending))
+
+    if sort_field == "id":
+        order = [Member.id.desc() if descending else Member.id.asc()]
+    else:
+        order = [sort_column.desc(), Member.id.desc()] if descending else [sort_column.asc(), Member.id.asc()]
+
+    rows = query.order_by(*order).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(
+            sort_field, last[sort_field] if sort_field in fields else last["_sort"], last["id"]
+        )
+
+    members = [{name: row._mapping[name] for name in fields} for row in rows]
+    if "profilePhotoUrl" in fields:
+        for member in members:
+            member["profilePhotoUrl"] = blob_url(member["profilePhotoUrl"])
+
+    return {
+        "members": members,
+        "count": len(rows),
+        "limit": limit,
+        "sort": f"-{sort_field}" if descending else sort_field,
+        "nextCursor": next_cursor,
+        "hasMore": has_more,
+    }
@@ -0,0 +1,429 @@
+"""
+Üye Arama İndeksi
+MAUI okuyucu uygulamasının üye arama sayfası ve panel için bellek içi
+typeahead indeksi.
+
+- Aranan alanlar: ad soyad, membership_id, kart numarası, email ve telefon
+- Metin Türkçe karakterlerden arındırılıp küçük harfe çevrilir ve token'lara
+  bölünür ("Şükrü Öztürk" -> "sukru", "ozturk"); telefonda sadece rakamlar tutulur
+- Önek araması: sıralı token sözlüğünde bisect ile aralık taraması
+- Bulanık (fuzzy) arama: ad ve email token'ları için trigram -> token indeksi,
+  adaylar sınırlı Damerau-Levenshtein mesafesiyle doğrulanır ("mehmte" -> "mehmet")
+- Versiyon = member_change_events tablosundaki son yerleşmiş olay id'si; yenilemede
+  sadece o versiyondan bu yana değişen üyeler tekrar okunur. Görünen daha yeni
+  olaylar da hemen uygulanır ama cursor yerleşene kadar ilerlemez (bkz. member_events)
+
+Sıralama: tam eşleşme > önek (token sırasıyla) > bulanık; eşitlikte ada göre.
+"""
+
+import os
+import re
+import asyncio
+import bisect
+import heapq
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from database import Member, SessionLocal
+from member_events import latest_event_id, newest_event_id, pruned_event_id, events_since
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Sorguda dikkate alınan en fazla token
+MAX_QUERY_TOKENS = 6
+
+# Tek yenilemede işlenecek en fazla olay - daha fazlası için indeks baştan kurulur
+MAX_INCREMENTAL_EVENTS = 20000
+
+# Bulanık aramada mesafesi hesaplanan en fazla aday token
+MAX_FUZZY_CANDIDATES = 200
+
+MEMBER_SEARCH_REFRESH_SECONDS = float(os.getenv("MEMBER_SEARCH_REFRESH_SECONDS", "30"))
+
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_FUZZY = "fuzzy"
+
+_FOLD_TABLE = str.maketrans("çğıİöşüÇĞÖŞÜâîûÂÎÛ", "cgiiosucgosuaiuaiu")
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_DIGITS_PATTERN = re.compile(r"\D+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Türkçe karakterleri ASCII'ye indir ve küçük harfe çevir"""
+    return (text or "").translate(_FOLD_TABLE).lower()
+
+
+def split_tokens(text: Optional[str]) -> List[str]:
+    return _TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def _trigrams(token: str) -> Set[str]:
+    """Baş tarafı '^' ile işaretli trigramlar (önek benzerliği ağırlık kazanır)"""
+    padded = "^" + token
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def fuzzy_distance(query: str, token: str, max_distance: int) -> int:
+    """
+    Sorgu ile token (veya token'ın sorgu uzunluğundaki öneki) arasındaki
+    Damerau-Levenshtein (OSA) mesafesi. max_distance aşılınca max_distance + 1 döner.
+    """
+    if abs(len(query) - len(token)) > max_distance:
+        # Yazılmakta olan kelime - sadece öneki karşılaştır
+        token = token[:len(query) + max_distance]
+    best = max_distance + 1
+    previous2: List[int] = []
+    previous = list(range(len(token) + 1))
+    for i in range(1, len(query) + 1):
+        current = [i] + [0] * len(token)
+        row_min = current[0]
+        for j in range(1, len(token) + 1):
+            cost = 0 if query[i - 1] == token[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and query[i - 1] == token[j - 2] and query[i - 2] == token[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    # Token'ın herhangi bir önekiyle en iyi eşleşme (typeahead)
+    for j in range(len(query) - max_distance, len(token) + 1):
+        if j >= 0:
+            best = min(best, previous[j])
+    return best
+
+
+def _max_fuzzy_distance(token: str) -> int:
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 7 else 2
+
+
+class SearchDocument(NamedTuple):
+    member_id: int
+    membership_id: str
+    name: str
+    status: Optional[str]
+    tokens: Tuple[str, ...]
+    sort_key: str
+
+
+def build_document(member_id: int, full_name: Optional[str], membership_id: Optional[str],
+                   card_number: Optional[str], email: Optional[str], phone_number: Optional[str],
+                   status: Optional[str]) -> Tuple[SearchDocument, Set[str]]:
+    """Üye satırından indeks dokümanı + bulanık aramaya açık token'lar"""
+    text_tokens = set(split_tokens(full_name)) | set(split_tokens(email))
+    tokens = set(text_tokens)
+
+    # "CC-2026-000123" -> cc, 2026, 000123 (sorgu da aynı şekilde bölünür)
+    tokens.update(split_tokens(membership_id))
+    tokens.update(split_tokens(card_number))
+
+    phone = _DIGITS_PATTERN.sub("", phone_number or "")
+    if phone:
+        tokens.add(phone)
+        # +90 555..., 0555... ve 555... yazımlarının hepsi bulunabilsin
+        if len(phone) >= 10:
+            national = phone[-10:]
+            tokens.update((national, "0" + national))
+
+    document = SearchDocument(
+        member_id=member_id,
+        membership_id=membership_id or "",
+        name=full_name or "",
+        status=status,
+        tokens=tuple(sorted(tokens)),
+        sort_key=normalize_text(full_name),
+    )
+    return document, {token for token in text_tokens if len(token) >= 3}
+
+
+class MemberSearchIndex:
+    """Bellek içi önek + trigram indeksi (thread-safe)"""
+
+    def __init__(self):
+        self.version = 0
+        self.loaded = False
+        self._newest_event_id = 0  # İndekse uygulanan son görünen olay
+        self.refreshed_at: Optional[datetime] = None
+        self._documents: Dict[int, SearchDocument] = {}
+        # token -> üye id'si; çoğu token (kart no, telefon) tek üyeye ait olduğundan
+        # tekil değerler set yerine int olarak tutulur
+        self._postings: Dict[str, Union[int, Set[int]]] = {}
+        self._vocabulary: List[str] = []
+        self._fuzzy_tokens: Dict[str, Set[int]] = {}
+        self._trigram_tokens: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self._documents)
+
+    # --- İndeks bakımı (çağıran _lock'u tutar) ---
+
+    def _members_for(self, token: str) -> Iterable[int]:
+        posting = self._postings.get(token)
+        if posting is None:
+            return ()
+        return (posting,) if isinstance(posting, int) else posting
+
+    def _add(self, document: SearchDocument, fuzzy_tokens: Set[str]):
+        member_id = document.member_id
+        self._documents[member_id] = document
+        for token in document.tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                self._postings[token] = member_id
+                bisect.insort(self._vocabulary, token)
+            elif isinstance(posting, int):
+                if posting != member_id:
+                    self._postings[token] = {posting, member_id}
+            else:
+                posting.add(member_id)
+        for token in fuzzy_tokens:
+            owners = self._fuzzy_tokens.get(token)
+            if owners is None:
+                self._fuzzy_tokens[token] = {member_id}
+                for gram in _trigrams(token):
+                    self._trigram_tokens.setdefault(gram, set()).add(token)
+            else:
+                owners.add(member_id)
+
+    def _remove(self, member_id: int):
+        document = self._documents.pop(member_id, None)
+        if document is None:
+            return
+        for token in document.tokens:
+            posting = self._postings.get(token)
+            if isinstance(posting, set):
+                posting.discard(member_id)
+                if len(posting) == 1:
+                    self._postings[token] = next(iter(posting))
+            elif posting == member_id:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+
+            owners = self._fuzzy_tokens.get(token)
+            if owners is not None:
+                owners.discard(member_id)
+                if not owners:
+                    del self._fuzzy_tokens[token]
+                    for gram in _trigrams(token):
+                        grams = self._trigram_tokens.get(gram)
+                        if grams is not None:
+                            grams.discard(token)
+                            if not grams:
+                                del self._trigram_tokens[gram]
+
+    # --- Yükleme ---
+
+    @staticmethod
+    def _member_query(db: Session):
+        return db.query(
+            Member.id, Member.full_name, Member.membership_id, Member.card_number,
+            Member.email, Member.phone_number, Member.status
+        )
+
+    def _rebuild(self, db: Session, version: int):
+        """İndeksi baştan kur ve tek seferde yerine koy"""
+        documents: Dict[int, SearchDocument] = {}
+        postings: Dict[str, Union[int, Set[int]]] = {}
+        fuzzy_owners: Dict[str, Set[int]] = {}
+        trigram_tokens: Dict[str, Set[str]] = {}
+        for row in self._member_query(db).yield_per(5000):
+            document, fuzzy_tokens = build_document(*row)
+            documents[document.member_id] = document
+            # Sözlük sonda bir kez sıralanır; insort yerine doğrudan posting eklenir
+            for token in document.tokens:
+                posting = postings.get(token)
+                if posting is None:
+                    postings[token] = document.member_id
+                elif isinstance(posting, int):
+                    postings[token] = {posting, document.member_id}
+                else:
+                    posting.add(document.member_id)
+            for token in fuzzy_tokens:
+                fuzzy_owners.setdefault(token, set()).add(document.member_id)
+        for token in fuzzy_owners:
+            for gram in _trigrams(token):
+                trigram_tokens.setdefault(gram, set()).add(token)
+
+        with self._lock:
+            self._documents = documents
+            self._postings = postings
+            self._vocabulary = sorted(postings)
+            self._fuzzy_tokens = fuzzy_owners
+            self._trigram_tokens = trigram_tokens
+            self.version = version
+            self.loaded = True
+            self.refreshed_at = datetime.utcnow()
+
+    def _apply_events(self, db: Session, version: int) -> bool:
+        """Versiyondan bu yana değişen üyeleri yeniden oku. Olaylar yetmiyorsa False döner."""
+        if self.version < pruned_event_id(db):
+            return False
+        events = events_since(db, self.version, MAX_INCREMENTAL_EVENTS + 1)
+        if len(events) > MAX_INCREMENTAL_EVENTS:
+            return False
+
+        # Yerleşmemiş olaylar da uygulanır; cursor version'da kalır, sonraki yenilemede tekrar okunurlar
+        changed_ids = {event.member_id for event in events}
+        rows = self._member_query(db).filter(Member.id.in_(changed_ids)).all() if changed_ids else []
+        documents = [build_document(*row) for row in rows]
+
+        with self._lock:
+            for member_id in changed_ids:
+                self._remove(member_id)
+            for document, fuzzy_tokens in documents:
+                self._add(document, fuzzy_tokens)
+            self.version = version
+            self.refreshed_at = datetime.utcnow()
+        return True
+
+    def refresh(self, db: Session, force: bool = False) -> bool:
+        """Yeni olay görüldüyse veya cursor yerleştiyse indeksi güncelle. Değişiklik olduysa True döner."""
+        with self._refresh_lock:
+            newest = newest_event_id(db)
+            version = latest_event_id(db)
+            if self.loaded and newest == self._newest_event_id and version == self.version and not force:
+                self.refreshed_at = datetime.utcnow()
+                return False
+            if force or not self.loaded or not self._apply_events(db, version):
+                self._rebuild(db, version)
+            self._newest_event_id = newest
+            return True
+
+    # --- Arama ---
+
+    @staticmethod
+    def _matches_rest(document: SearchDocument, rest: List[str]) -> bool:
+        """Diğer sorgu token'larının her biri dokümanda bir token'ın öneki mi (tokens sıralı)"""
+        tokens = document.tokens
+        for query in rest:
+            index = bisect.bisect_left(tokens, query)
+            if index == len(tokens) or not tokens[index].startswith(query):
+                return False
+        return True
+
+    def _estimated_cost(self, token: str) -> int:
+        """Token'ın tam eşleşen üye sayısı + önekle başlayan sözlük token'ı sayısı"""
+        posting = self._postings.get(token)
+        exact = 0 if posting is None else (1 if isinstance(posting, int) else len(posting))
+        # Token'lar [a-z0-9] içerir; '{' hepsinden büyüktür
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_left(self._vocabulary, token + "{", start)
+        return exact + (end - start)
+
+    def _fuzzy_vocabulary(self, query: str) -> List[Tuple[int, str]]:
+        """Sorguya yakın ad/email token'ları (mesafe, token) sırasıyla"""
+        max_distance = _max_fuzzy_distance(query)
+        if max_distance == 0:
+            return []
+        shared = Counter()
+        for gram in _trigrams(query):
+            shared.update(self._trigram_tokens.get(gram, ()))
+        close = []
+        for token, _ in shared.most_common(MAX_FUZZY_CANDIDATES):
+            distance = fuzzy_distance(query, token, max_distance)
+            if distance <= max_distance:
+                close.append((distance, token))
+        close.sort()
+        return close
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Tuple[SearchDocument, str]]:
+        """Sorguya uyan en fazla limit üye ve eşleşme türü"""
+        query_tokens = list(dict.fromkeys(split_tokens(query)))[:MAX_QUERY_TOKENS]
+        if not query_tokens or limit < 1:
+            return []
+        sort_key = lambda member_id: (documents[member_id].sort_key, member_id)
+
+        results: Dict[int, str] = {}
+
+        def collect(member_ids: Iterable[int], match: str):
+            if rest:
+                candidates = [
+                    member_id for member_id in member_ids
+                    if member_id not in results and self._matches_rest(documents[member_id], rest)
+                ]
+            elif results:
+                candidates = [member_id for member_id in member_ids if member_id not in results]
+            else:
+                candidates = member_ids
+            for member_id in heapq.nsmallest(limit - len(results), candidates, key=sort_key):
+                results[member_id] = match
+
+        with self._lock:
+            # _rebuild sözlükleri kilit altında değiştirir; dokümanlar postings ile aynı anda okunmalı
+            documents = self._documents
+
+            # En seçici token aramayı sürer, diğerleri önek filtresidir
+            # ("CC-2026-0005" sorgusunda herkeste olan "cc" ve "2026" değil "0005")
+            query_tokens.sort(key=lambda token: (self._estimated_cost(token), -len(token)))
+            driver, rest = query_tokens[0], query_tokens[1:]
+
+            collect(self._members_for(driver), MATCH_EXACT)
+
+            index = bisect.bisect_right(self._vocabulary, driver)
+            while len(results) < limit and index < len(self._vocabulary):
+                token = self._vocabulary[index]
+                if not token.startswith(driver):
+                    break
+                collect(self._members_for(token), MATCH_PREFIX)
+                index += 1
+
+            if len(results) < limit:
+                for _, token in self._fuzzy_vocabulary(driver):
+                    if len(results) >= limit:
+                        break
+                    if token.startswith(driver):
+                        continue  # Önek aşamasında zaten tarandı
+                    collect(self._fuzzy_tokens.get(token, ()), MATCH_FUZZY)
+
+            return [(documents[member_id], match) for member_id, match in results.items()]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "loaded": self.loaded,
+            "members": self.count,
+            "tokens": len(self._vocabulary),
+            "fuzzyTokens": len(self._fuzzy_tokens),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
+
+
+# Global instance
+member_search_index = MemberSearchIndex()
+
+
+def refresh_member_search(force: bool = False) -> bool:
+    """Kendi session'ı ile arama indeksini yenile (arka plan görevi ve yazma işlemleri için)"""
+    db = SessionLocal()
+    try:
+        was_loaded = member_search_index.loaded
+        changed = member_search_index.refresh(db, force=force)
+        if changed and not was_loaded:
+            print(f"🔎 Üye arama indeksi kuruldu - {member_search_index.count} üye, versiyon {member_search_index.version}")
+        return changed
+    except Exception as e:
+        print(f"❌ Üye arama indeksi yenileme hatası: {e}")
+        return False
+    finally:
+        db.close()
+
+
+async def member_search_refresh_loop():
+    """Diğer worker'lardaki değişiklikleri yakalamak için periyodik yenileme"""
+    loop = asyncio.get_event_loop()
+    while True:
+        await loop.run_in_executor(None, refresh_member_search)
+        await asyncio.sleep(MEMBER_SEARCH_REFRESH_SECONDS)
@@ -0,0 +1,169 @@
+"""
+Offline Üye Snapshot'ı
+Okuyucuların bağlantı yokken gerçek üye durumuyla doğrulama yapabilmesi için
+doğrulamaya ilişkin alanların (membership_id, isim, durum, üyelik tipi) imzalı
+ve kompakt bir kopyasını NDJSON akışı olarak üretir.
+
+Akış formatı (her satır bir JSON değeri):
+    {"type":"header","format":"member-snapshot/1","kind":"full|delta","version":V,...}
+    ["u","CC-2026-000001","Ali Veli","active","standard"]   # ekle/güncelle
+    ["d","CC-2026-000002"]                                   # sil (sadece delta)
+    {"type":"trailer","count":N,"sha256":"...","signature":"..."}
+
+- version: member_change_events'teki son yerleşmiş olay id'si (iptal listesi ile aynı cursor)
+- sha256: trailer'dan önceki tüm byte'ların özeti; signature bu 32 byte özetin
+  NFC ECDSA P-256 key ile imzasıdır (64 byte r||s, base64)
+- Delta verilemiyorsa (olaylar budanmış veya çok fazla) tam snapshot gönderilir;
+  okuyucu header'daki kind alanına göre yerel kopyasını değiştirir ya da günceller
+"""
+
+import json
+import base64
+import hashlib
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from crypto_utils import secure_qr
+from database import Member
+from member_events import EVENT_DELETED, latest_event_id, pruned_event_id, events_since
+
+SNAPSHOT_FORMAT = "member-snapshot/1"
+SNAPSHOT_FIELDS = ["op", "membershipId", "name", "status", "membershipType"]
+
+# DB'den okuma ve akışa yazma parti büyüklüğü
+SNAPSHOT_BATCH_SIZE = 5000
+
+# Tek delta'da işlenecek en fazla olay - daha fazlası için tam snapshot gönderilir
+MAX_SNAPSHOT_DELTA_EVENTS = 50000
+
+
+def _line(value) -> bytes:
+    return (json.dumps(value, ensure_ascii=False, separators=(',', ':')) + "\n").encode("utf-8")
+
+
+def _upsert_row(row) -> List[Any]:
+    return ["u", row.membership_id, row.full_name, row.status, row.membership_type]
+
+
+def _member_columns(db: Session):
+    return db.query(Member.membership_id, Member.full_name, Member.status, Member.membership_type)
+
+
+class _SignedStream:
+    """Yazılan byte'ların SHA-256 özetini tutar, sonunda imzalı trailer üretir"""
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+        self.count = 0
+
+    def chunk(self, lines: List[bytes]) -> bytes:
+        data = b"".join(lines)
+        self._digest.update(data)
+        return data
+
+    def trailer(self) -> bytes:
+        digest = self._digest.digest()
+        return _line({
+            "type": "trailer",
+            "count": self.count,
+            "sha256": digest.hex(),
+            "signature": base64.b64encode(secure_qr.sign_p256_raw(digest)).decode("ascii"),
+            "signatureAlgorithm": "ECDSA-P256-SHA256-RAW",
+        })
+
+
+def _header(kind: str, version: int, since: Optional[int] = None) -> Dict[str, Any]:
+    header = {
+        "type": "header",
+        "format": SNAPSHOT_FORMAT,
+        "kind": kind,
+        "version": version,
+        "fields": SNAPSHOT_FIELDS,
+        "generatedAt": datetime.utcnow().isoformat(),
+    }
+    if since is not None:
+        header["fromVersion"] = since
+    return header
+
+
+def stream_full_snapshot(db: Session) -> Iterator[bytes]:
+    """
+    Tüm üyelerin snapshot'ı - satırlar sunucu tarafı cursor ile partiler halinde
+    okunur ve yazılır, bellekte tüm liste tutulmaz.
+    Cursor okuma başlamadan alınır; okuma sırasında değişen üyeler bir sonraki delta'da tekrar gelir.
+    """
+    version = latest_event_id(db)
+    stream = _SignedStream()
+    yield stream.chunk([_line(_header("full", version))])
+
+    query = _member_columns(db).order_by(Member.id).execution_options(
+        stream_results=True, yield_per=SNAPSHOT_BATCH_SIZE
+    )
+    lines: List[bytes] = []
+    for row in query:
+        lines.append(_line(_upsert_row(row)))
+        if len(lines) >= SNAPSHOT_BATCH_SIZE:
+            stream.count += len(lines)
+            yield stream.chunk(lines)
+            lines = []
+    if lines:
+        stream.count += len(lines)
+        yield stream.chunk(lines)
+
+    yield stream.trailer()
+
+
+def can_build_delta(db: Session, since: int) -> bool:
+    """since cursor'ından delta üretilebilir mi? (arada budanmış olay olmamalı)"""
+    if since < 0 or since > latest_event_id(db):
+        return False
+    return since >= pruned_event_id(db)
+
+
+def stream_delta_snapshot(db: Session, since: int) -> Iterator[bytes]:
+    """
+    since cursor'ından bu yana değişen üyeler. Üye başına son olay belirleyicidir;
+    güncel alanlar members tablosundan partiler halinde okunur.
+    Çok fazla olay varsa tam snapshot'a düşer.
+    """
+    # Yerleşmemiş olaylar bu delta'ya girmez; bir sonraki delta'da gelirler
+    version = latest_event_id(db)
+    events = events_since(db, since, MAX_SNAPSHOT_DELTA_EVENTS + 1, until=version)
+    if len(events) > MAX_SNAPSHOT_DELTA_EVENTS:
+        yield from stream_full_snapshot(db)
+        return
+
+    latest_event: Dict[str, str] = {}
+    for event in events:
+        latest_event[event.membership_id] = event.event_type
+
+    stream = _SignedStream()
+    yield stream.chunk([_line(_header("delta", version, since))])
+
+    deleted = [mid for mid, event_type in latest_event.items() if event_type == EVENT_DELETED]
+    changed = [mid for mid, event_type in latest_event.items() if event_type != EVENT_DELETED]
+
+    for start in range(0, len(changed), SNAPSHOT_BATCH_SIZE):
+        batch = changed[start:start + SNAPSHOT_BATCH_SIZE]
+        rows = _member_columns(db).filter(Member.membership_id.in_(batch)).all()
+        found = {row.membership_id for row in rows}
+        # Olay sonrası silinmiş ama silme olayı henüz cursor'a girmemiş üyeler
+        lines = [_line(_upsert_row(row)) for row in rows]
+        lines.extend(_line(["d", mid]) for mid in batch if mid not in found)
+        stream.count += len(lines)
+        yield stream.chunk(lines)
+
+    if deleted:
+        stream.count += len(deleted)
+        yield stream.chunk([_line(["d", mid]) for mid in deleted])
+
+    yield stream.trailer()
+
+
+def stream_member_snapshot(db: Session, since: Optional[int] = None) -> Iterator[bytes]:
+    """since verilirse ve mümkünse delta, değilse tam snapshot"""
+    if since is not None and can_build_delta(db, since):
+        return stream_delta_snapshot(db, since)
+    return stream_full_snapshot(db)
@@ -0,0 +1,79 @@
+"""
+Metrik Kayıt Defteri
+Sıcak yollarda print() yerine kullanılan hafif, thread-safe sayaç ve süre ölçümleri.
+
+- Sayaçlar: increment("db.sessions")
+- Süreler: observe("db.session_ms", 12.5) - adet, toplam, max ve son
+  METRICS_WINDOW ölçüm üzerinden p50/p95
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Any
+
+# Yüzdelikler için saklanan son ölçüm sayısı (süre metriği başına)
+METRICS_WINDOW = 1024
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "p50": round(recent[len(recent) // 2], 3) if recent else 0.0,
+            "p95": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3) if recent else 0.0,
+        }
+
+
+class MetricsRegistry:
+    """İsimle adreslenen sayaç ve süre metrikleri"""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.window = window
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, _Timing] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing(self.window)
+            timing.add(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timings": {name: timing.summary() for name, timing in self._timings.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+# Global instance
+metrics = MetricsRegistry()
@@ -0,0 +1,145 @@
+"""
+NDEF Ön Kodlayıcı
+Üyenin NFC payload'ını etikete yazılacak birebir NDEF mesaj byte'larına çevirir
+ve NTAG213/215/216 kapasitesine göre donanıma dokunmadan kontrol eder.
+
+- v1 (NFC_ENC_V1 metni): NFC Forum Text kaydı ('en' dil kodu) - MAUI okuyucu ile aynı
+- v2 (NFC2: metni): ham 116 byte, NFC_V2_MIME_TYPE tipinde MIME kaydı
+- Toplu ön kodlama: kodlama istasyonunda her dokunuşta sadece hazır byte'lar yazılır
+"""
+
+import base64
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from nfc_codec import (
+    NFC_TAG_CAPACITIES,
+    NFC_V2_MIME_TYPE,
+    decode_nfc_v2,
+    decode_nfc_v2_transport,
+    is_nfc_v2,
+    nfc_byte_budgets
+)
+
+# NDEF kayıt başlığı bayrakları
+NDEF_MB = 0x80  # Message Begin
+NDEF_ME = 0x40  # Message End
+NDEF_SR = 0x10  # Short Record (payload <= 255 byte)
+NDEF_TNF_WELL_KNOWN = 0x01
+NDEF_TNF_MIME = 0x02
+
+# Type 2 Tag TLV blokları
+TLV_NDEF_MESSAGE = 0x03
+TLV_TERMINATOR = 0xFE
+
+DEFAULT_TAG_TYPE = "NTAG215"
+
+
+class NdefCapacityError(ValueError):
+    """NDEF mesajı hedef etikete sığmıyor"""
+
+
+def encode_record(tnf: int, record_type: bytes, payload: bytes) -> bytes:
+    """Tek kayıtlı NDEF mesajı (MB ve ME set) oluştur"""
+    if len(record_type) > 255:
+        raise ValueError("NDEF kayıt tipi 255 byte'ı aşıyor")
+    header = NDEF_MB | NDEF_ME | tnf
+    if len(payload) <= 255:
+        return bytes([header | NDEF_SR, len(record_type), len(payload)]) + record_type + payload
+    return bytes([header, len(record_type)]) + len(payload).to_bytes(4, "big") + record_type + payload
+
+
+def encode_text_record(text: str, language: str = "en") -> bytes:
+    """NFC Forum Text kaydı (UTF-8) - ndef.TextRecord ile aynı byte'lar"""
+    lang = language.encode("ascii")
+    return encode_record(NDEF_TNF_WELL_KNOWN, b"T", bytes([len(lang)]) + lang + text.encode("utf-8"))
+
+
+def encode_mime_record(mime_type: str, payload: bytes) -> bytes:
+    return encode_record(NDEF_TNF_MIME, mime_type.encode("ascii"), payload)
+
+
+def wrap_tlv(message: bytes) -> bytes:
+    """NDEF mesajını etiket belleğindeki TLV formatına sar (terminator dahil)"""
+    if len(message) < 0xFF:
+        length = bytes([len(message)])
+    else:
+        length = b"\xff" + len(message).to_bytes(2, "big")
+    return bytes([TLV_NDEF_MESSAGE]) + length + message + bytes([TLV_TERMINATOR])
+
+
+def encode_nfc_payload_message(nfc_payload: str) -> Tuple[str, bytes]:
+    """
+    Üye NFC payload'ını NDEF mesajına çevir.
+    Dönüş: (format, mesaj byte'ları) - format 'text' (v1) veya 'mime' (v2)
+    """
+    if is_nfc_v2(nfc_payload):
+        raw = decode_nfc_v2_transport(nfc_payload)
+        if raw is None or decode_nfc_v2(raw) is None:
+            raise ValueError("Geçersiz NFC v2 payload")
+        return "mime", encode_mime_record(NFC_V2_MIME_TYPE, raw)
+    return "text", encode_text_record(nfc_payload)
+
+
+def check_capacity(message: bytes, tag_type: str = DEFAULT_TAG_TYPE) -> int:
+    """
+    Mesajın etikete sığdığını kontrol et, kalan byte sayısını döndür.
+    Sığmıyorsa NdefCapacityError fırlatılır.
+    """
+    capacity = NFC_TAG_CAPACITIES.get(tag_type)
+    if capacity is None:
+        raise ValueError(f"Bilinmeyen etiket tipi: {tag_type}")
+    used = len(wrap_tlv(message))
+    if used > capacity:
+        raise NdefCapacityError(f"NDEF mesajı {used} byte, {tag_type} kapasitesi {capacity} byte")
+    return capacity - used
+
+
+def smallest_fitting_tag(message: bytes) -> Optional[str]:
+    used = len(wrap_tlv(message))
+    for tag_type, capacity in sorted(NFC_TAG_CAPACITIES.items(), key=lambda item: item[1]):
+        if used <= capacity:
+            return tag_type
+    return None
+
+
+def pre_encode_member(member_id: int, membership_id: str, nfc_payload: str, tag_type: str = DEFAULT_TAG_TYPE) -> Dict[str, Any]:
+    """Tek üye için etikete yazılmaya hazır NDEF mesajı ve kapasite raporu"""
+    try:
+        payload_format, message = encode_nfc_payload_message(nfc_payload)
+    except ValueError as e:
+        return {
+            "memberId": member_id,
+            "membershipId": membership_id,
+            "success": False,
+            "error": str(e),
+        }
+
+    tlv_size = len(wrap_tlv(message))
+    result = {
+        "memberId": member_id,
+        "membershipId": membership_id,
+        "format": payload_format,
+        "ndefMessage": base64.b64encode(message).decode("ascii"),
+        "messageBytes": len(message),
+        "tlvBytes": tlv_size,
+        "smallestTag": smallest_fitting_tag(message),
+        "tags": nfc_byte_budgets(tlv_size),
+        "success": True,
+    }
+    try:
+        check_capacity(message, tag_type)
+    except NdefCapacityError as e:
+        result["success"] = False
+        result["error"] = str(e)
+    return result
+
+
+def pre_encode_batch(
+    members: Iterable[Tuple[int, str, str]],
+    tag_type: str = DEFAULT_TAG_TYPE
+) -> List[Dict[str, Any]]:
+    """(member_id, membership_id, nfc_payload) listesini giriş sırasıyla ön kodla"""
+    return [
+        pre_encode_member(member_id, membership_id, nfc_payload, tag_type)
+        for member_id, membership_id, nfc_payload in members
+    ]
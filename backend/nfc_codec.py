@@ -0,0 +1,237 @@
+"""
+NFC Codec
+NFC kompakt verisinin kodlama katmanları için tek ortak implementasyon.
+Online (/api/nfc/decrypt) ve offline (/api/nfc/verify-offline) yollar ile
+SecureQRManager aynı fonksiyonları kullanır.
+
+- NFC_ENC_V1: imzalı JSON'un XOR + Base64 hali.
+  XOR işlemi byte byte Python döngüsü yerine tüm buffer üzerinde tek seferde
+  yapılır: anahtar önceden tekrarlanarak bir key stream oluşturulur ve iki buffer
+  int.from_bytes ile büyük tamsayıya çevrilip XOR'lanır.
+- NFC v2: sabit genişlikli binary alanlar + 64 byte ham r||s ECDSA imzası.
+  Etikete MIME kaydı olarak ham byte'lar yazılır; API taşımasında tek bir
+  base64url katmanı (NFC2: prefix) kullanılır. Çözme yolunda JSON yoktur.
+"""
+
+import base64
+import binascii
+import struct
+from datetime import date
+from typing import Dict, Any, List, NamedTuple, Optional, Union
+
+NFC_ENC_V1_PREFIX = "NFC_ENC_V1:"
+NFC_XOR_KEY = b"NFC_SECURE_2024_CRYPTO_KEY_ADVANCED"
+
+# Önceden hesaplanmış key stream - NTAG216 kapasitesinin rahatça üzerinde
+_KEYSTREAM_LENGTH = 4096
+_KEYSTREAM = (NFC_XOR_KEY * (_KEYSTREAM_LENGTH // len(NFC_XOR_KEY) + 1))[:_KEYSTREAM_LENGTH]
+
+
+def _keystream(length: int) -> bytes:
+    """Verilen uzunlukta tekrarlanan anahtar akışı"""
+    if length <= _KEYSTREAM_LENGTH:
+        return _KEYSTREAM[:length]
+    return (NFC_XOR_KEY * (length // len(NFC_XOR_KEY) + 1))[:length]
+
+
+def xor_bytes(data: bytes) -> bytes:
+    """Buffer'ı tekrarlanan NFC anahtarı ile tek seferde XOR'la (simetrik)"""
+    length = len(data)
+    if length == 0:
+        return b""
+    mixed = int.from_bytes(data, "big") ^ int.from_bytes(_keystream(length), "big")
+    return mixed.to_bytes(length, "big")
+
+
+def encode_nfc_v1(data: str) -> str:
+    """Düz NFC JSON verisini NFC_ENC_V1 formatına çevir"""
+    encrypted_b64 = base64.b64encode(xor_bytes(data.encode("utf-8"))).decode("ascii")
+    return f"{NFC_ENC_V1_PREFIX}{encrypted_b64}"
+
+
+def decode_nfc_v1(encrypted_data: str) -> Optional[str]:
+    """
+    NFC_ENC_V1 verisini çöz.
+    Prefix yoksa veri şifrelenmemiş kabul edilir ve olduğu gibi döner;
+    bozuk base64 veya UTF-8 durumunda None döner.
+    """
+    if not encrypted_data.startswith(NFC_ENC_V1_PREFIX):
+        return encrypted_data
+    try:
+        encrypted_bytes = base64.b64decode(encrypted_data[len(NFC_ENC_V1_PREFIX):])
+        return xor_bytes(encrypted_bytes).decode("utf-8")
+    except (binascii.Error, ValueError):
+        return None
+
+
+def decode_nfc_v1_batch(payloads: List[str]) -> List[Optional[str]]:
+    """Birden fazla NFC_ENC_V1 verisini çöz - sonuçlar giriş sırasıyla"""
+    return [decode_nfc_v1(payload) for payload in payloads]
+
+
+# ---------------------------------------------------------------------------
+# NFC v2 - kompakt binary format
+#
+#   [version:1][flags:1] | [exp:2][membership_id:16][name:32] | [r||s:64]
+#   └──── açık başlık ───┘ └──── flags & XOR ise XOR'lanır (imza dahil) ────┘
+#
+# İmzalanan mesaj: açık başlık + düz (XOR'lanmamış) alanlar
+# ---------------------------------------------------------------------------
+
+NFC_V2_PREFIX = "NFC2:"
+NFC_V2_VERSION = 2
+NFC_V2_FLAG_XOR = 0x01
+NFC_V2_HEADER = struct.Struct(">BB")  # version, flags
+NFC_V2_FIELDS = struct.Struct(">H16s32s")  # exp (NFC_V2_EPOCH'tan gün), membership_id (ASCII), isim (UTF-8)
+NFC_V2_SIGNATURE_LENGTH = 64
+NFC_V2_LENGTH = NFC_V2_HEADER.size + NFC_V2_FIELDS.size + NFC_V2_SIGNATURE_LENGTH
+NFC_V2_EPOCH = date(2000, 1, 1)
+_NFC_V2_EPOCH_ORDINAL = NFC_V2_EPOCH.toordinal()
+
+# Etikete yazılan NDEF MIME kaydının tipi (kısa tutuldu - NTAG213'e sığması için)
+NFC_V2_MIME_TYPE = "application/x-qrvc2"
+
+# NDEF için kullanılabilir kullanıcı belleği (byte)
+NFC_TAG_CAPACITIES = {
+    "NTAG213": 144,
+    "NTAG215": 504,
+    "NTAG216": 888,
+}
+
+
+class NfcV2Payload(NamedTuple):
+    membership_id: str
+    name: str
+    expires: date
+    signed_message: bytes
+    signature: bytes
+
+    def as_nfc_data(self) -> Dict[str, Any]:
+        """v1 JSON ile aynı alan adlarına sahip sözlük"""
+        return {
+            "v": NFC_V2_VERSION,
+            "mid": self.membership_id,
+            "name": self.name,
+            "exp": self.expires.strftime("%Y%m%d"),
+        }
+
+
+def _fit_utf8(value: str, width: int) -> bytes:
+    """UTF-8 kodla ve karakter sınırını bozmadan width byte'a kırp"""
+    return value.encode("utf-8")[:width].decode("utf-8", "ignore").encode("utf-8")
+
+
+def pack_nfc_v2_message(membership_id: str, name: str, expires: date, obfuscate: bool = True) -> bytes:
+    """İmzalanacak v2 mesajını (açık başlık + düz alanlar) oluştur"""
+    mid_bytes = membership_id.encode("ascii")
+    if len(mid_bytes) > 16:
+        raise ValueError("membership_id 16 byte'ı aşıyor")
+    flags = NFC_V2_FLAG_XOR if obfuscate else 0
+    return NFC_V2_HEADER.pack(NFC_V2_VERSION, flags) + NFC_V2_FIELDS.pack(
+        expires.toordinal() - _NFC_V2_EPOCH_ORDINAL,
+        mid_bytes,
+        _fit_utf8(name, 32),
+    )
+
+
+def build_nfc_v2(message: bytes, signature: bytes) -> bytes:
+    """İmzalı mesajdan etikete yazılacak ham v2 byte'larını oluştur"""
+    if len(signature) != NFC_V2_SIGNATURE_LENGTH:
+        raise ValueError("v2 imzası 64 byte ham r||s olmalı")
+    header = message[:NFC_V2_HEADER.size]
+    body = message[NFC_V2_HEADER.size:] + signature
+    if header[1] & NFC_V2_FLAG_XOR:
+        body = xor_bytes(body)
+    return header + body
+
+
+def encode_nfc_v2(raw: bytes) -> str:
+    """Ham v2 byte'larını API taşıması için metne çevir (tek base64url katmanı)"""
+    return NFC_V2_PREFIX + base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def is_nfc_v2(data: str) -> bool:
+    return data.startswith(NFC_V2_PREFIX)
+
+
+def decode_nfc_v2_transport(data: str) -> Optional[bytes]:
+    """NFC2: metnini etikete yazılan ham byte'lara çevir (hatalıysa None)"""
+    if not is_nfc_v2(data):
+        return None
+    encoded = data[len(NFC_V2_PREFIX):]
+    try:
+        return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    except (binascii.Error, ValueError):
+        return None
+
+
+def decode_nfc_v2(data: Union[str, bytes]) -> Optional[NfcV2Payload]:
+    """
+    v2 verisini çöz - NFC2: metni veya etiketten okunan ham byte'lar kabul edilir.
+    Format hatalıysa None döner; imza burada doğrulanmaz.
+    """
+    if isinstance(data, str):
+        data = decode_nfc_v2_transport(data)
+
+    if data is None or len(data) != NFC_V2_LENGTH:
+        return None
+    version, flags = NFC_V2_HEADER.unpack_from(data)
+    if version != NFC_V2_VERSION:
+        return None
+
+    body = data[NFC_V2_HEADER.size:]
+    if flags & NFC_V2_FLAG_XOR:
+        body = xor_bytes(body)
+    fields = body[:NFC_V2_FIELDS.size]
+    exp_days, mid_bytes, name_bytes = NFC_V2_FIELDS.unpack(fields)
+    try:
+        membership_id = mid_bytes.rstrip(b"\x00").decode("ascii")
+        name = name_bytes.rstrip(b"\x00").decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+    return NfcV2Payload(
+        membership_id,
+        name,
+        date.fromordinal(_NFC_V2_EPOCH_ORDINAL + exp_days),
+        data[:NFC_V2_HEADER.size] + fields,
+        body[NFC_V2_FIELDS.size:],
+    )
+
+
+def ndef_record_size(type_length: int, payload_length: int) -> int:
+    """Tek kayıtlı NDEF mesajının boyutu (kısa kayıt: payload <= 255)"""
+    payload_length_field = 1 if payload_length <= 255 else 4
+    return 2 + payload_length_field + type_length + payload_length
+
+
+def ndef_tlv_size(message_length: int) -> int:
+    """NDEF mesajının etikette kapladığı alan (TLV başlığı + terminator dahil)"""
+    length_field = 1 if message_length < 255 else 3
+    return 1 + length_field + message_length + 1
+
+
+def nfc_byte_budgets(tlv_size: int) -> Dict[str, Dict[str, Any]]:
+    """Etiket tipi başına kapasite, kullanılan ve kalan byte"""
+    return {
+        tag: {
+            "capacity": capacity,
+            "used": tlv_size,
+            "remaining": capacity - tlv_size,
+            "fits": tlv_size <= capacity,
+        }
+        for tag, capacity in NFC_TAG_CAPACITIES.items()
+    }
+
+
+def nfc_v2_byte_budgets() -> Dict[str, Dict[str, Any]]:
+    """v2 MIME kaydı için etiket bütçeleri (v2 sabit uzunlukta olduğundan kesin)"""
+    record_size = ndef_record_size(len(NFC_V2_MIME_TYPE), NFC_V2_LENGTH)
+    return nfc_byte_budgets(ndef_tlv_size(record_size))
+
+
+def nfc_v1_byte_budgets(encoded_payload: str) -> Dict[str, Dict[str, Any]]:
+    """v1 metin kaydı (Text RTD, 'en' dil kodu) için etiket bütçeleri"""
+    payload_length = 1 + 2 + len(encoded_payload.encode("utf-8"))
+    record_size = ndef_record_size(1, payload_length)
+    return nfc_byte_budgets(ndef_tlv_size(record_size))
@@ -10,6 +10,8 @@ from datetime import datetime
 import asyncio
 import threading
 
+from ndef_encoder import encode_text_record, encode_nfc_payload_message, smallest_fitting_tag, wrap_tlv
+
 logger = logging.getLogger(__name__)
 
 class NFCReaderService:
@@ -140,43 +142,76 @@ class NFCReaderService:
                 "error": f"NFC okuma hatası: {str(e)}"
             }
     
-    def write_nfc_card(self, data: str, card_type: str = "text") -> Dict[str, Any]:
-        """NFC kartına veri yazma"""
+    def write_nfc_card(self, data: str, card_type: str = "text", ndef_message: Optional[bytes] = None) -> Dict[str, Any]:
+        """
+        NFC kartına veri yazma
+        NDEF mesajı donanıma dokunmadan önce kodlanır ve kapasite kontrol edilir;
+        ndef_message verilirse (toplu ön kodlama) doğrudan o byte'lar yazılır.
+        card_type: "text" (Text kaydı) veya "nfc" (üye payload'ı - v1 Text, v2 MIME)
+        """
+        if ndef_message is None:
+            if card_type == "text":
+                ndef_message = encode_text_record(data)
+            elif card_type == "nfc":
+                try:
+                    _, ndef_message = encode_nfc_payload_message(data)
+                except ValueError as e:
+                    return {
+                        "success": False,
+                        "error": f"Kodlama hatası: {str(e)}"
+                    }
+            else:
+                return {
+                    "success": False,
+                    "error": "Desteklenmeyen veri tipi"
+                }
+        
+        # En büyük desteklenen etikete bile sığmıyorsa kart beklemeden reddet
+        if smallest_fitting_tag(ndef_message) is None:
+            return {
+                "success": False,
+                "error": f"Veri hiçbir desteklenen etikete sığmıyor ({len(wrap_tlv(ndef_message))} byte)",
+                "data_size": len(ndef_message)
+            }
+        
         if not self.nfc_available:
             return {
                 "success": True,
                 "message": "Simülasyon modu - veri yazıldı (gerçek NFC yok)",
-                "data_written": len(data),
+                "data_written": len(ndef_message),
                 "card_type": "SIMULATION"
             }
         
         try:
             import nfc
-            import ndef
             
             def on_connect(tag):
                 """Kart bağlandığında yazma işlemi"""
                 try:
                     if not tag.ndef:
                         # NDEF formatı yok, formatla
-                        tag.ndef = []
+                        if not tag.format() or not tag.ndef:
+                            return {
+                                "success": False,
+                                "error": "Kart NDEF formatına getirilemedi"
+                            }
                     
-                    if card_type == "text":
-                        # Text record oluştur
-                        record = ndef.TextRecord(data, language='en')
-                        tag.ndef.records = [record]
-                        
+                    # Etiketin gerçek kapasitesi ile son kontrol - I/O hatası yerine net mesaj
+                    if len(ndef_message) > tag.ndef.capacity:
                         return {
-                            "success": True,
-                            "message": "Text verisi yazıldı",
-                            "data_written": len(data),
-                            "card_type": "NDEF_TEXT",
+                            "success": False,
+                            "error": f"Veri karta sığmıyor: {len(ndef_message)} byte, kart kapasitesi {tag.ndef.capacity} byte",
                             "card_id": tag.identifier.hex()
                         }
                     
+                    tag.ndef.octets = ndef_message
+                    
                     return {
-                        "success": False,
-                        "error": "Desteklenmeyen veri tipi"
+                        "success": True,
+                        "message": "NDEF verisi yazıldı",
+                        "data_written": len(ndef_message),
+                        "card_type": "NDEF_TEXT" if card_type == "text" else "NDEF",
+                        "card_id": tag.identifier.hex()
                     }
                         
                 except Exception as e:
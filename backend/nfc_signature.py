@@ -0,0 +1,127 @@
+"""
+NFC İmza Doğrulayıcı
+NFC kompakt verisinin ECDSA P-256 imzasını tek geçişte doğrular.
+
+- İmza formatı (DER veya 64 byte ham r||s / P1363) bir kez tespit edilir,
+  ham format DER'e çevrilir ve public key ile tek bir verify çağrısı yapılır.
+- Son reddedilen (mesaj, imza) özetleri sınırlı bir önbellekte tutulur; bozuk
+  veya sahte bir kart okuyucuya tekrar tekrar okutulduğunda imza doğrulaması
+  yeniden yapılmaz.
+"""
+
+import json
+import base64
+import hashlib
+import binascii
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
+P256_RAW_SIGNATURE_LENGTH = 64
+
+
+def signature_to_der(signature: bytes) -> Optional[bytes]:
+    """
+    İmzayı DER formatına getir.
+    DER SEQUENCE ise olduğu gibi, 64 byte ham r||s ise DER'e çevrilmiş hali,
+    tanınmayan formatta None döner.
+    """
+    if len(signature) >= 8 and signature[0] == 0x30 and signature[1] == len(signature) - 2:
+        return signature
+    if len(signature) == P256_RAW_SIGNATURE_LENGTH:
+        r = int.from_bytes(signature[:32], "big")
+        s = int.from_bytes(signature[32:], "big")
+        return encode_dss_signature(r, s)
+    return None
+
+
+def decode_b64url(value: str) -> Optional[bytes]:
+    """Padding'siz base64url çöz (hatalıysa None)"""
+    try:
+        return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+    except (binascii.Error, ValueError):
+        return None
+
+
+class NfcSignatureVerifier:
+    """Tek geçişli ECDSA P-256 doğrulayıcı + reddedilen imza önbelleği"""
+
+    def __init__(self, public_key, rejected_cache_size: int = 4096):
+        self.public_key = public_key
+        self.rejected_cache_size = rejected_cache_size
+        self._rejected: "OrderedDict[bytes, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.verified = 0
+        self.rejected = 0
+        self.rejected_cache_hits = 0
+
+    @staticmethod
+    def _digest(message: bytes, signature: bytes) -> bytes:
+        return hashlib.sha256(len(message).to_bytes(4, "big") + message + signature).digest()
+
+    def _remember_rejection(self, digest: bytes):
+        with self._lock:
+            self.rejected += 1
+            self._rejected[digest] = None
+            self._rejected.move_to_end(digest)
+            while len(self._rejected) > self.rejected_cache_size:
+                self._rejected.popitem(last=False)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        """Mesaj imzasını doğrula - format bir kez çözülür, verify bir kez çağrılır"""
+        if self.public_key is None:
+            return False
+
+        digest = self._digest(message, signature)
+        with self._lock:
+            if digest in self._rejected:
+                self._rejected.move_to_end(digest)
+                self.rejected_cache_hits += 1
+                return False
+
+        der_signature = signature_to_der(signature)
+        if der_signature is None:
+            self._remember_rejection(digest)
+            return False
+
+        try:
+            self.public_key.verify(der_signature, message, ec.ECDSA(hashes.SHA256()))
+        except (InvalidSignature, ValueError):
+            self._remember_rejection(digest)
+            return False
+
+        with self._lock:
+            self.verified += 1
+        return True
+
+    def verify_nfc_json(self, nfc_data: Dict[str, Any]) -> bool:
+        """
+        v1 NFC JSON verisini doğrula: 'sig' alanı çıkarılmış kompakt JSON
+        imzalanan mesajdır, imza base64url (padding'siz) kodludur
+        """
+        signature_b64 = nfc_data.get("sig")
+        if not signature_b64 or not isinstance(signature_b64, str):
+            return False
+
+        signature = decode_b64url(signature_b64)
+        if signature is None:
+            return False
+
+        verify_data = {key: value for key, value in nfc_data.items() if key != "sig"}
+        message = json.dumps(verify_data, separators=(',', ':')).encode("utf-8")
+        return self.verify(message, signature)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "verified": self.verified,
+                "rejected": self.rejected,
+                "rejected_cache_hits": self.rejected_cache_hits,
+                "rejected_cache_entries": len(self._rejected),
+                "rejected_cache_size": self.rejected_cache_size,
+            }
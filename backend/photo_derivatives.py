@@ -0,0 +1,146 @@
+"""
+Profil Fotoğrafı Türevleri
+Avatar gösterimleri (MAUI üye popup'ı, panel listesi) için orijinal fotoğraftan
+sabit boyutlu küçük kopyalar üretir ve diskte saklar.
+
+- Boyutlar: 64 ve 256 px kare (ortadan kırpılır) veya original (yeniden kodlanmış tam boyut)
+- Formatlar: JPEG ve WebP
+- Türev dosya adı kaynak blob özetini içerir; fotoğraf değişince yeni özet yeni
+  türevler demektir, eski türevler günlük temizlikte silinir
+- Üretim paylaşılan thread havuzunda yapılır (Pillow decode/resize GIL'i bırakır);
+  aynı türev için eşzamanlı istekler tek üretimi bekler
+"""
+
+import os
+import io
+import time
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+
+from blob_store import BLOB_GC_GRACE_SECONDS, blob_store, is_valid_digest
+
+PHOTO_SIZES = ("64", "256", "original")
+PHOTO_FORMATS = {"jpeg": ("JPEG", "image/jpeg", "jpg"), "webp": ("WEBP", "image/webp", "webp")}
+DEFAULT_PHOTO_FORMAT = "jpeg"
+
+# Yükleme sonrası önceden üretilen türevler
+EAGER_DERIVATIVES = (("64", "jpeg"), ("256", "jpeg"))
+
+PHOTO_QUALITY = 85
+
+DERIVATIVE_DIR = os.path.join(blob_store.root, "derived")
+
+# Türev üretim havuzu
+derivative_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PHOTO_DERIVATIVE_WORKERS", str(min(4, os.cpu_count() or 2)))),
+    thread_name_prefix="photo-derivative"
+)
+
+_in_flight: Dict[Tuple[str, str, str], Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+def validate_derivative_params(size: str, fmt: str):
+    if size not in PHOTO_SIZES:
+        raise ValueError(f"Geçersiz boyut: {size} ({', '.join(PHOTO_SIZES)})")
+    if fmt not in PHOTO_FORMATS:
+        raise ValueError(f"Geçersiz format: {fmt} ({', '.join(PHOTO_FORMATS)})")
+
+
+def derivative_path(digest: str, size: str, fmt: str) -> str:
+    return os.path.join(DERIVATIVE_DIR, digest[:2], f"{digest}_{size}.{PHOTO_FORMATS[fmt][2]}")
+
+
+def derivative_media_type(fmt: str) -> str:
+    return PHOTO_FORMATS[fmt][1]
+
+
+def render_derivative(source_path: str, size: str, fmt: str) -> bytes:
+    """Kaynak dosyadan türev byte'ları üret"""
+    with Image.open(source_path) as source:
+        if size != "original":
+            # JPEG'leri hedef boyuta yakın çözünürlükte decode et
+            source.draft("RGB", (int(size) * 2, int(size) * 2))
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGB")
+    if size != "original":
+        edge = int(size)
+        image = ImageOps.fit(image, (edge, edge), Image.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, PHOTO_FORMATS[fmt][0], quality=PHOTO_QUALITY)
+    return output.getvalue()
+
+
+def _generate(digest: str, size: str, fmt: str) -> str:
+    path = derivative_path(digest, size, fmt)
+    if os.path.isfile(path):
+        return path
+    data = render_derivative(blob_store.path(digest), size, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return path
+
+
+def _finish(key: Tuple[str, str, str]):
+    with _in_flight_lock:
+        _in_flight.pop(key, None)
+
+
+def submit_derivative(digest: str, size: str, fmt: str) -> Future:
+    """Türevi havuzda üret (zaten üretiliyorsa aynı future döner). Sonuç dosya yoludur."""
+    key = (digest, size, fmt)
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is None:
+            future = derivative_executor.submit(_generate, digest, size, fmt)
+            _in_flight[key] = future
+            future.add_done_callback(lambda _: _finish(key))
+    return future
+
+
+def get_derivative_path(digest: str, size: str, fmt: str) -> Optional[str]:
+    """Hazır türev varsa yolunu döndür (üretim tetiklemez)"""
+    path = derivative_path(digest, size, fmt)
+    return path if os.path.isfile(path) else None
+
+
+def schedule_eager_derivatives(digest: Optional[str]):
+    """Yükleme sonrası yaygın avatar boyutlarını arka planda üret (beklenmez)"""
+    if not digest or not is_valid_digest(digest):
+        return
+    for size, fmt in EAGER_DERIVATIVES:
+        if get_derivative_path(digest, size, fmt) is None:
+            submit_derivative(digest, size, fmt)
+
+
+def collect_orphan_derivatives(referenced: Set[str], grace_seconds: int = BLOB_GC_GRACE_SECONDS) -> int:
+    """
+    Kaynak fotoğrafı artık kullanılmayan türevleri sil.
+    Blob GC ile aynı süre beklenir: referans anlık görüntüsünden sonra yüklenen
+    fotoğrafların türevleri ve devam eden yazımlar (.tmp-) silinmez.
+    """
+    if not os.path.isdir(DERIVATIVE_DIR):
+        return 0
+    cutoff = time.time() - grace_seconds
+    deleted = 0
+    for directory, _, files in os.walk(DERIVATIVE_DIR):
+        for file_name in files:
+            path = os.path.join(directory, file_name)
+            try:
+                if not file_name.startswith(".tmp-") and file_name.split("_", 1)[0] in referenced:
+                    continue
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                os.remove(path)
+                deleted += 1
+            except FileNotFoundError:
+                continue
+    return deleted
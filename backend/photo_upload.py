@@ -0,0 +1,204 @@
+"""
+Akış Halinde Fotoğraf Yükleme
+Base64 JSON yerine ham (image/*) veya multipart/form-data gövdeyle gelen
+fotoğrafları belleğe almadan geçici dosyaya yazar.
+
+- Gövde parça parça okunur; boyut sınırı aşıldığı anda yükleme kesilir (413)
+- İlk byte'lar gelir gelmez dosya tipi imzadan kontrol edilir (415)
+- Boyutlar Pillow ile sadece başlık okunarak doğrulanır; piksel verisi decode edilmez
+- SHA-256 yazarken hesaplanır; dosya blob deposuna tekrar okunmadan taşınır
+
+İstek başına bellek kullanımı fotoğraf boyutundan bağımsız olarak tek bir parça
+(~64 KB) ile sınırlıdır.
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import Optional
+
+from PIL import Image
+from starlette.requests import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+from blob_store import blob_store, sniff_content_type
+
+MAX_PHOTO_UPLOAD_BYTES = int(os.getenv("MAX_PHOTO_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+MAX_PHOTO_DIMENSION = int(os.getenv("MAX_PHOTO_DIMENSION", "6000"))
+ALLOWED_PHOTO_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+# Tip tespiti için gereken en az byte (WebP: RIFF....WEBP)
+_SNIFF_BYTES = 12
+
+# Multipart gövdede fotoğrafın beklendiği alan adları
+PHOTO_FIELD_NAMES = (b"file", b"photo", b"profile_photo")
+
+
+class PhotoUploadError(ValueError):
+    """Yükleme reddedildi - status_code HTTP yanıtında kullanılır"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StagedPhoto:
+    """
+    Sınır ve tip kontrolüyle geçici dosyaya yazılan fotoğraf.
+    Geçici dosya blob deposuyla aynı dosya sisteminde açılır (taşıma = rename).
+    """
+
+    def __init__(self, max_bytes: int = MAX_PHOTO_UPLOAD_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.content_type: Optional[str] = None
+        self.width = 0
+        self.height = 0
+        self._digest = hashlib.sha256()
+        self._header = b""
+        os.makedirs(blob_store.root, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=blob_store.root, prefix=".upload-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise PhotoUploadError(f"Fotoğraf en fazla {self.max_bytes // 1024} KB olabilir", 413)
+        if self.content_type is None:
+            self._header += chunk[:_SNIFF_BYTES]
+            if len(self._header) >= _SNIFF_BYTES:
+                self._check_type()
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def _check_type(self):
+        content_type = sniff_content_type(self._header)
+        if content_type not in ALLOWED_PHOTO_TYPES:
+            raise PhotoUploadError("Desteklenmeyen resim formatı (JPEG, PNG veya WebP)", 415)
+        self.content_type = content_type
+
+    def finish(self) -> "StagedPhoto":
+        """Yazımı bitir ve görsel başlığını doğrula"""
+        self._file.close()
+        if self.size == 0:
+            raise PhotoUploadError("Profil fotoğrafı verisi gerekli")
+        if self.content_type is None:
+            self._check_type()
+
+        try:
+            # Image.open sadece başlığı okur - piksel verisi decode edilmez
+            with Image.open(self.path) as image:
+                self.width, self.height = image.size
+                image_format = image.format
+        except (OSError, ValueError, Image.DecompressionBombError):
+            raise PhotoUploadError("Resim dosyası okunamadı")
+        if Image.MIME.get(image_format) != self.content_type:
+            raise PhotoUploadError("Resim içeriği dosya tipiyle uyuşmuyor")
+        if max(self.width, self.height) > MAX_PHOTO_DIMENSION:
+            raise PhotoUploadError(f"Fotoğraf en fazla {MAX_PHOTO_DIMENSION}x{MAX_PHOTO_DIMENSION} piksel olabilir")
+        return self
+
+    @property
+    def digest(self) -> str:
+        return self._digest.hexdigest()
+
+    def store(self) -> str:
+        """Blob deposuna taşı, özeti döndür"""
+        return blob_store.put_file(self.path, self.digest)
+
+    def discard(self):
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _MultipartPhotoReader:
+    """python-multipart callback'leri ile sadece fotoğraf parçasını StagedPhoto'ya aktarır"""
+
+    def __init__(self, boundary: bytes, staged: StagedPhoto):
+        self.staged = staged
+        self.found = False
+        self._in_photo = False
+        self._header_field = b""
+        self._header_value = b""
+        self._part_headers = {}
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def _on_part_begin(self):
+        self._part_headers = {}
+        self._in_photo = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._part_headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._part_headers.get(b"content-disposition", b""))
+        is_photo = options.get(b"name") in PHOTO_FIELD_NAMES or b"filename" in options
+        # İlk fotoğraf parçası alınır, diğer alanlar yok sayılır
+        self._in_photo = is_photo and not self.found
+        if self._in_photo:
+            self.found = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_photo:
+            self.staged.write(data[start:end])
+
+    def _on_part_end(self):
+        self._in_photo = False
+
+    def write(self, chunk: bytes):
+        self.parser.write(chunk)
+
+
+async def receive_photo_upload(request: Request, max_bytes: int = MAX_PHOTO_UPLOAD_BYTES) -> StagedPhoto:
+    """
+    İstek gövdesini akış halinde geçici dosyaya al ve doğrula.
+    Ham gövde (Content-Type: image/* veya application/octet-stream) ya da
+    multipart/form-data ('file' / 'photo' alanı) kabul edilir.
+    Hata durumunda geçici dosya silinir ve PhotoUploadError fırlatılır.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + 64 * 1024:
+        # Multipart başlıkları için küçük bir pay bırakılır
+        raise PhotoUploadError(f"Fotoğraf en fazla {max_bytes // 1024} KB olabilir", 413)
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    staged = StagedPhoto(max_bytes)
+    try:
+        if content_type == b"multipart/form-data":
+            boundary = options.get(b"boundary")
+            if not boundary:
+                raise PhotoUploadError("Multipart boundary eksik")
+            reader = _MultipartPhotoReader(boundary, staged)
+            async for chunk in request.stream():
+                reader.write(chunk)
+            if not reader.found:
+                raise PhotoUploadError("Multipart gövdede 'file' alanı bulunamadı")
+        elif content_type.startswith(b"image/") or content_type == b"application/octet-stream":
+            async for chunk in request.stream():
+                staged.write(chunk)
+        else:
+            raise PhotoUploadError("Content-Type image/* veya multipart/form-data olmalı", 415)
+        return staged.finish()
+    except Exception:
+        staged.discard()
+        raise
@@ -0,0 +1,161 @@
+"""
+QR Görsel Render Servisi
+Üyenin saklanan güvenli QR verisini PNG veya SVG olarak render eder.
+
+- QR matrisi qrcode ile üretilir; PNG çıktısı Pillow ile modül matrisinden
+  tek seferde ölçeklenir, SVG çıktısı tek bir path olarak yazılır
+- Render sonuçları (credential versiyonu, boyut, format, hata düzeltme)
+  anahtarıyla byte bütçeli bir LRU önbellekte tutulur
+- ETag render girdilerinden türetilir; böylece önbellek soğukken bile
+  If-None-Match kontrolü render yapmadan cevaplanabilir
+"""
+
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+RENDER_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+ERROR_CORRECTION_LEVELS = ("L", "M", "Q", "H")
+MIN_RENDER_SIZE = 64
+MAX_RENDER_SIZE = 2048
+QR_BORDER_MODULES = 4
+
+# Render çıktısını etkileyen bir değişiklik yapıldığında artırılmalı (ETag'leri geçersiz kılar)
+RENDERER_VERSION = 1
+
+RenderKey = Tuple[int, int, str, str]  # (credential_id, size, format, error_correction)
+
+
+def render_etag(key: RenderKey) -> str:
+    """Render girdilerinden güçlü ETag üret (render deterministik olduğu için)"""
+    raw = f"{RENDERER_VERSION}:{key[0]}:{key[1]}:{key[2]}:{key[3]}".encode("ascii")
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+def _qr_matrix(data: str, error_correction: str):
+    import qrcode
+    from qrcode import constants
+
+    levels = {
+        "L": constants.ERROR_CORRECT_L,
+        "M": constants.ERROR_CORRECT_M,
+        "Q": constants.ERROR_CORRECT_Q,
+        "H": constants.ERROR_CORRECT_H,
+    }
+    qr = qrcode.QRCode(error_correction=levels[error_correction], border=QR_BORDER_MODULES, box_size=1)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()  # Sınır (quiet zone) dahil bool matris
+
+
+def _render_png(matrix, size: int) -> bytes:
+    from PIL import Image
+
+    modules = len(matrix)
+    image = Image.new("1", (modules, modules), 1)
+    image.putdata([0 if dark else 1 for row in matrix for dark in row])
+    image = image.resize((size, size), Image.NEAREST)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _render_svg(matrix, size: int) -> bytes:
+    modules = len(matrix)
+    # Yatayda ardışık koyu modüller tek dikdörtgen olarak yazılır
+    segments = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < modules:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < modules and row[x]:
+                x += 1
+            run = x - start
+            segments.append(f"M{start} {y}h{run}v1h-{run}z")
+    path = "".join(segments)
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+        f'<rect width="{modules}" height="{modules}" fill="#fff"/>'
+        f'<path d="{path}" fill="#000"/></svg>'
+    )
+    return svg.encode("utf-8")
+
+
+def render_qr_image(data: str, image_format: str = "png", size: int = 512, error_correction: str = "M") -> bytes:
+    """QR verisini istenen formatta ve piksel boyutunda render et"""
+    matrix = _qr_matrix(data, error_correction)
+    if image_format == "svg":
+        return _render_svg(matrix, size)
+    return _render_png(matrix, size)
+
+
+class RenderCache:
+    """Toplam byte bütçesiyle sınırlı, thread-safe LRU render önbelleği"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[RenderKey, bytes]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: RenderKey) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def put(self, key: RenderKey, content: bytes):
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+            self._entries[key] = content
+            self._total_bytes += len(content)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Global instance
+qr_render_cache = RenderCache(max_bytes=int(os.getenv("QR_RENDER_CACHE_BYTES", str(32 * 1024 * 1024))))
+
+
+def get_or_render_qr_image(key: RenderKey, data: str) -> bytes:
+    """Önbellekten getir, yoksa render edip önbelleğe koy"""
+    content = qr_render_cache.get(key)
+    if content is None:
+        _, size, image_format, error_correction = key
+        content = render_qr_image(data, image_format, size, error_correction)
+        qr_render_cache.put(key, content)
+    return content
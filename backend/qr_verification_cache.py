@@ -0,0 +1,167 @@
+"""
+QR Doğrulama Sonuç Önbelleği
+Aynı kartın kısa süre içinde tekrar tekrar okutulması durumunda base64 çözme,
+JSON parse ve imza doğrulamasını atlamak için sınırlı boyutlu LRU önbellek.
+
+- Anahtar: QR string'in SHA-256 özeti (QR verisinin kendisi saklanmaz)
+- Süre: en fazla max_ttl_seconds, ve hiçbir zaman payload'ın expires_at'inden sonra değil
+- Önbellek sadece imza doğrulamasının sonucunu tutar. Üye durumu imzalı
+  payload'ın içinde olduğundan askıya alınan üyenin eski QR'ı imza olarak
+  geçerli kalır; bu yüzden her sonuç (önbellekten gelse de) iptal listesiyle
+  (revocation_registry.is_revoked) karşılaştırılır
+- İptal listesi her worker'da periyodik (REVOCATION_REFRESH_SECONDS) ve yerel
+  değişiklikten hemen sonra yenilenir; durum değişikliği diğer worker'lara en
+  geç bu süre içinde yansır
+- invalidate_member sadece çağrıldığı worker'ın önbelleğindeki kayıtları siler
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from crypto_utils import verify_member_qr
+from revocation import revocation_registry
+
+VerifyResult = Tuple[bool, Optional[Dict[str, Any]], Optional[str]]
+
+
+class QrVerificationCache:
+    """Thread-safe, süre sınırlı LRU doğrulama önbelleği"""
+
+    def __init__(self, max_entries: int = 10000, max_ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[VerifyResult, float, Optional[int]]]" = OrderedDict()
+        self._member_keys: Dict[int, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(qr_data: str) -> bytes:
+        return hashlib.sha256(qr_data.encode("utf-8")).digest()
+
+    def _remove(self, key: bytes):
+        """Kilit altında çağrılmalı"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        member_id = entry[2]
+        if member_id is not None:
+            keys = self._member_keys.get(member_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._member_keys[member_id]
+
+    def get(self, qr_data: str) -> Optional[VerifyResult]:
+        key = self._key(qr_data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            result, deadline, _ = entry
+            if time.time() >= deadline:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, qr_data: str, result: VerifyResult):
+        """Sadece geçerli sonuçları sakla - süre payload'ın expires_at'i ile sınırlanır"""
+        is_valid, payload, _ = result
+        if not is_valid or not payload:
+            return
+
+        deadline = time.time() + self.max_ttl_seconds
+        try:
+            expires_at = datetime.fromisoformat(payload.get("expires_at", ""))
+            deadline = min(deadline, (expires_at - datetime(1970, 1, 1)).total_seconds())
+        except (TypeError, ValueError):
+            return  # Süresi bilinmeyen sonuç önbelleğe alınmaz
+
+        member_id = payload.get("member_id")
+        key = self._key(qr_data)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (result, deadline, member_id)
+            if member_id is not None:
+                self._member_keys.setdefault(member_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate_member(self, member_id: int) -> int:
+        """Üyeye ait tüm önbellek kayıtlarını sil (durum değişikliği, silme vb.)"""
+        with self._lock:
+            keys = list(self._member_keys.get(member_id, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._member_keys.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_ttl_seconds": self.max_ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Global instance
+qr_verification_cache = QrVerificationCache(
+    max_entries=int(os.getenv("QR_VERIFY_CACHE_SIZE", "10000")),
+    max_ttl_seconds=float(os.getenv("QR_VERIFY_CACHE_TTL", "300")),
+)
+
+
+def verify_member_qr_cached(qr_data: str) -> VerifyResult:
+    """Üye QR kodunu önbellek üzerinden doğrula, sonucu iptal listesiyle karşılaştır"""
+    result = qr_verification_cache.get(qr_data)
+    if result is None:
+        result = verify_member_qr(qr_data)
+        qr_verification_cache.put(qr_data, result)
+    is_valid, payload, _ = result
+    if is_valid and payload and revocation_registry.is_revoked(payload.get("membership_id") or ""):
+        return False, None, "Kart iptal edilmiş - üyelik askıya alınmış veya silinmiş"
+    return result
+
+
+# Toplu doğrulama için worker havuzu (imza doğrulaması GIL'i bırakır)
+verification_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("QR_VERIFY_WORKERS", str(os.cpu_count() or 4))),
+    thread_name_prefix="qr-verifier"
+)
+
+
+def verify_member_qr_batch(qr_codes: List[str]) -> List[VerifyResult]:
+    """
+    QR listesini paralel doğrula, sonuçları giriş sırasıyla döndür.
+    Aynı QR batch içinde birden fazla geçiyorsa sadece bir kez doğrulanır.
+    """
+    unique_codes = list(dict.fromkeys(qr_codes))
+    results = dict(zip(unique_codes, verification_executor.map(verify_member_qr_cached, unique_codes)))
+    return [results[qr_code] for qr_code in qr_codes]
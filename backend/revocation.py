@@ -0,0 +1,216 @@
+"""
+Offline İptal Listesi (Revocation Filter)
+Kart verildikten sonra askıya alınan, pasifleştirilen veya silinen üyeleri
+okuyuculara kompakt ve imzalı bir yapı olarak yayınlar.
+
+- Her iptal edilmiş membership_id için 8 byte'lık SHA-256 özeti; sıralı dizi
+  (10k iptal ≈ 80 KB). Sıralı olduğu için okuyucu ikili arama da yapabilir.
+- Versiyon = member_change_events tablosundaki son yerleşmiş olay id'si (bkz.
+  member_events.latest_event_id); okuyucu ?since=<versiyon> ile sadece
+  eklenen/çıkarılan özetleri çeker.
+- Tam liste ve delta'lar NFC ECDSA P-256 key ile imzalanır (64 byte r||s).
+- Sunucu tarafında özetler bellekteki bir set'te tutulur; offline doğrulama
+  yolu O(1) kontrol yapar ve veritabanına dokunmaz. Set arka planda
+  periyodik olarak ve yerel değişikliklerden hemen sonra yenilenir.
+
+Tam liste formatı:  "RVK1" | version:u64 | count:u32 | count x 8 byte özet
+Delta formatı:      "RVD1" | from:u64 | to:u64 | added:u32 | removed:u32 | eklenen özetler | çıkarılan özetler
+"""
+
+import os
+import base64
+import asyncio
+import struct
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from crypto_utils import secure_qr
+from database import Member, MemberChangeEvent, SessionLocal
+from member_events import EVENT_DELETED, latest_event_id, newest_event_id, pruned_event_id, events_since
+
+REVOCATION_HASH_LENGTH = 8
+REVOCATION_HEADER = struct.Struct(">4sQI")  # magic, version, count
+REVOCATION_DELTA_HEADER = struct.Struct(">4sQQII")  # magic, from, to, added, removed
+REVOCATION_MAGIC = b"RVK1"
+REVOCATION_DELTA_MAGIC = b"RVD1"
+SIGNATURE_ALGORITHM = "ECDSA-P256-SHA256-RAW"
+
+# Bu durumlardaki üyelerin kartları geçerlidir; diğer tüm durumlar iptal sayılır
+ACTIVE_STATUSES = ("active",)
+
+# Tek delta'da işlenecek en fazla olay - daha fazlası için tam liste gönderilir
+MAX_DELTA_EVENTS = 50000
+
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "60"))
+
+
+def membership_hash(membership_id: str) -> bytes:
+    """membership_id için 8 byte'lık iptal listesi özeti"""
+    return hashlib.sha256(b"qrvc-revocation:" + membership_id.encode("utf-8")).digest()[:REVOCATION_HASH_LENGTH]
+
+
+def is_revoked_status(status: Optional[str]) -> bool:
+    return status not in ACTIVE_STATUSES
+
+
+def _signed_payload(payload: bytes) -> Dict[str, str]:
+    return {
+        "data": base64.b64encode(payload).decode("ascii"),
+        "signature": base64.b64encode(secure_qr.sign_p256_raw(payload)).decode("ascii"),
+        "signatureAlgorithm": SIGNATURE_ALGORITHM,
+    }
+
+
+class RevocationRegistry:
+    """Bellekteki iptal seti + imzalı tam liste önbelleği (thread-safe)"""
+
+    def __init__(self):
+        self.version = 0
+        self.loaded = False
+        self._newest_event_id = 0  # Set yüklendiğinde görünen son olay
+        self.refreshed_at: Optional[datetime] = None
+        self._hashes: Set[bytes] = set()
+        self._full_payload: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self._hashes)
+
+    def is_revoked(self, membership_id: str) -> bool:
+        """O(1) kontrol - veritabanına dokunmaz"""
+        return membership_hash(membership_id) in self._hashes
+
+    def _load_hashes(self, db: Session) -> Set[bytes]:
+        revoked_ids: Iterable[str] = (
+            row.membership_id
+            for row in db.query(Member.membership_id).filter(
+                (Member.status.is_(None)) | (Member.status.notin_(ACTIVE_STATUSES))
+            )
+        )
+        hashes = {membership_hash(membership_id) for membership_id in revoked_ids}
+        # Silinen üyelerin kartları da iptal edilmiş sayılır
+        hashes.update(
+            membership_hash(row.membership_id)
+            for row in db.query(MemberChangeEvent.membership_id).filter(
+                MemberChangeEvent.event_type == EVENT_DELETED
+            ).distinct()
+        )
+        return hashes
+
+    def refresh(self, db: Session, force: bool = False) -> bool:
+        """
+        Yeni olay görüldüyse seti yeniden yükle. Değişiklik olduysa True döner.
+        Set görünen en son durumu içerir; yayınlanan versiyon yerleşmiş cursor'dır,
+        aradaki olaylar okuyucunun sonraki delta'sında tekrar gelir (üye başına son durum).
+        """
+        newest = newest_event_id(db)
+        version = latest_event_id(db)
+        if self.loaded and newest == self._newest_event_id and not force:
+            with self._lock:
+                if version != self.version:
+                    self.version = version
+                    self._full_payload = None
+                self.refreshed_at = datetime.utcnow()
+            return False
+
+        hashes = self._load_hashes(db)
+        with self._lock:
+            self._hashes = hashes
+            self.version = version
+            self._newest_event_id = newest
+            self._full_payload = None  # İmzalı liste ilk istekte yeniden üretilir
+            self.loaded = True
+            self.refreshed_at = datetime.utcnow()
+        return True
+
+    def full_payload(self) -> Dict[str, Any]:
+        """İmzalı tam iptal listesi (versiyon başına bir kez imzalanır)"""
+        with self._lock:
+            if self._full_payload is None:
+                hashes = sorted(self._hashes)
+                payload = REVOCATION_HEADER.pack(REVOCATION_MAGIC, self.version, len(hashes)) + b"".join(hashes)
+                self._full_payload = {
+                    "type": "full",
+                    "version": self.version,
+                    "count": len(hashes),
+                    "hashLength": REVOCATION_HASH_LENGTH,
+                    **_signed_payload(payload),
+                }
+            return self._full_payload
+
+    def delta_payload(self, db: Session, since: int) -> Optional[Dict[str, Any]]:
+        """
+        since versiyonundan bu yana değişen özetler. Olaylar budanmış veya çok
+        fazlaysa None döner (okuyucu tam listeyi almalı).
+        """
+        to_version = self.version
+        if since > to_version:
+            return None
+        if since < pruned_event_id(db):
+            return None
+
+        events = events_since(db, since, MAX_DELTA_EVENTS + 1, until=to_version)
+        if len(events) > MAX_DELTA_EVENTS:
+            return None
+
+        # Üye başına son olay belirleyicidir
+        latest_state: Dict[str, bool] = {}
+        for event in events:
+            latest_state[event.membership_id] = (
+                event.event_type == EVENT_DELETED or is_revoked_status(event.status)
+            )
+
+        added = sorted(membership_hash(mid) for mid, revoked in latest_state.items() if revoked)
+        removed = sorted(membership_hash(mid) for mid, revoked in latest_state.items() if not revoked)
+        payload = REVOCATION_DELTA_HEADER.pack(
+            REVOCATION_DELTA_MAGIC, since, to_version, len(added), len(removed)
+        ) + b"".join(added) + b"".join(removed)
+        return {
+            "type": "delta",
+            "fromVersion": since,
+            "version": to_version,
+            "added": len(added),
+            "removed": len(removed),
+            "hashLength": REVOCATION_HASH_LENGTH,
+            **_signed_payload(payload),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "loaded": self.loaded,
+            "revoked": self.count,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
+
+
+# Global instance
+revocation_registry = RevocationRegistry()
+
+
+def refresh_revocations(force: bool = False) -> bool:
+    """Kendi session'ı ile iptal setini yenile (arka plan görevi ve yazma işlemleri için)"""
+    db = SessionLocal()
+    try:
+        changed = revocation_registry.refresh(db, force=force)
+        if changed:
+            print(f"🚫 İptal listesi yenilendi - versiyon {revocation_registry.version}, {revocation_registry.count} kayıt")
+        return changed
+    except Exception as e:
+        print(f"❌ İptal listesi yenileme hatası: {e}")
+        return False
+    finally:
+        db.close()
+
+
+async def revocation_refresh_loop():
+    """Diğer worker'lardaki değişiklikleri yakalamak için periyodik yenileme"""
+    loop = asyncio.get_event_loop()
+    while True:
+        await loop.run_in_executor(None, refresh_revocations)
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+QR imzalama anahtarı rotasyonu (sadece komut satırından)
+Mevcut RSA public key emekli klasörüne taşınır, yeni key çifti diske yazılır.
+Çalışan worker'lar yeni anahtarı imzalama sırasında (en geç 30 sn içinde) veya
+bilinmeyen bir key_id ile karşılaştıklarında hemen diskten yükler.
+
+Kullanım (backend klasöründen, sunucu ile aynı kullanıcıyla):
+    python rotate_qr_key.py
+"""
+
+import sys
+import os
+
+# Backend modüllerini import et
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from crypto_utils import secure_qr
+
+
+def main() -> int:
+    try:
+        result = secure_qr.rotate_rsa_keys()
+    except Exception as e:
+        print(f"❌ Key rotasyon hatası: {e}")
+        return 1
+    print(f"✅ QR imzalama anahtarı döndürüldü: {result['old_key_id']} -> {result['new_key_id']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
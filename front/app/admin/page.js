@@ -315,18 +315,33 @@ export default function AdminPage() {
     return 'https://qrvirtualcardgenerator.onrender.com';
   };
 
-  // Fetch all members from database
+  // Fetch all members from database (sayfa sayfa, cursor ile)
   const fetchMembers = async () => {
     try {
       setLoading(true);
-      const response = await fetch(`${getApiUrl()}/api/members`);
-      const data = await response.json();
-      
-      if (data.success) {
-        setMembers(data.members || []);
-      } else {
-        console.error('Failed to fetch members');
-      }
+      const fields = [
+        'id', 'fullName', 'membershipId', 'cardNumber', 'phoneNumber', 'email', 'address',
+        'dateOfBirth', 'emergencyContact', 'membershipType', 'role', 'status',
+        'profilePhotoUrl', 'createdAt', 'updatedAt'
+      ].join(',');
+      const allMembers = [];
+      let cursor = null;
+
+      do {
+        const params = new URLSearchParams({ limit: '200', fields });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${getApiUrl()}/api/members?${params}`);
+        const data = await response.json();
+
+        if (!data.success) {
+          console.error('Failed to fetch members');
+          return;
+        }
+        allMembers.push(...(data.members || []));
+        cursor = data.nextCursor;
+      } while (cursor);
+
+      setMembers(allMembers);
     } catch (error) {
       console.error('Error fetching members:', error);
     } finally {
@@ -1666,9 +1681,9 @@ export default function AdminPage() {
                           onClick={() => window.open(`/member/${member.id}`, '_blank')}
                         >
                           <div className="flex items-center gap-4 mb-4">
-                            {member.profilePhoto ? (
+                            {member.profilePhotoUrl ? (
                               <img
-                                src={`data:image/png;base64,${member.profilePhoto}`}
+                                src={`${getApiUrl()}${member.profilePhotoUrl}?size=64`}
                                 alt={member.fullName}
                                 className="w-12 h-12 rounded-xl object-cover object-center border-2 border-white shadow-lg flex-shrink-0"
                                 style={{ aspectRatio: '1 / 1' }}